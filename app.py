@@ -1,47 +1,166 @@
 # main file
 import discord
+from discord import app_commands
 from discord.ext import commands
+import asyncio
+import math
 import os
+import signal
+import sys
+import time
 
 # other py files
 import config
 import utils
+import locations_store
+import metrics
+import commandsync
 
 # define intents
 intents = discord.Intents.default()
 
+# command tree that times every app command
+class MetricsCommandTree(app_commands.CommandTree):
+    async def interaction_check(self, interaction: discord.Interaction):
+        interaction.extras["started_at"] = time.perf_counter()
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        record_command(interaction, "error")
+        await super().on_error(interaction, error)
+
+# records one finished app command
+def record_command(interaction: discord.Interaction, outcome: str):
+    command_name = interaction.command.qualified_name if interaction.command else "unknown"
+    metrics.registry.inc("bot_command_total", (("command", command_name), ("outcome", outcome)))
+    started_at = interaction.extras.get("started_at")
+    if started_at is not None:
+        metrics.registry.observe("bot_command_seconds", time.perf_counter() - started_at, (("command", command_name),))
+
 # bot instance
-class MyBot(commands.Bot):
+class MyBot(commands.AutoShardedBot):
     def __init__(self):
-        super().__init__(command_prefix='e!', intents=intents)
+        # worker processes get their shard ids from the launcher; otherwise one process runs every shard
+        super().__init__(
+            command_prefix='e!', intents=intents, tree_cls=MetricsCommandTree,
+            shard_count=config.SHARD_COUNT or None, shard_ids=config.SHARD_IDS
+        )
         # attach config to bot instance
         self.config = config
         self.server_locations_cache = {}
+        self.location_store = locations_store.LocationStore(self.config.LOCATIONS_DB_FILE)
+        self.location_writer = None
+        self.loop_lag_monitor = metrics.EventLoopLagMonitor(metrics.registry, self.config.LOOP_LAG_INTERVAL)
+        self.metrics_runner = None
+        self.command_sync_state = commandsync.CommandSyncState(self.config.COMMAND_SYNC_FILE)
+        metrics.registry.add_collector(self._collect_metrics)
+
+    # whether a guild is handled by one of this process's shards
+    def owns_guild(self, guild_id: int):
+        if self.shard_ids is None or not self.shard_count:
+            return True
+        return (guild_id >> 22) % self.shard_count in self.shard_ids
+
+    # gauges owned by the bot itself
+    def _collect_metrics(self):
+        gauges = [
+            # latency is NaN until the first heartbeat
+            ("discord_gateway_latency_seconds", (), 0.0 if math.isnan(self.latency) else self.latency),
+            ("bot_guilds", (), len(self.guilds)),
+            ("server_locations", (), len(self.server_locations_cache))
+        ]
+        if self.location_writer is not None:
+            writer_stats = self.location_writer.stats()
+            gauges.append(("location_writes_pending", (), writer_stats["pending"]))
+            gauges.append(("location_write_failures", (), writer_stats["failed_flushes"]))
+            gauges.append(("location_flush_seconds", (), writer_stats["last_flush_seconds"]))
+            gauges.append(("location_oldest_pending_seconds", (), writer_stats["oldest_pending_seconds"]))
+        return gauges
 
     async def setup_hook(self):
-        # Load server locations early
-        self.server_locations_cache = utils.load_server_locations_from_file(self.config.LOCATIONS_FILE)
-        print(f"Loaded server locations: {self.server_locations_cache}")
-
-        # load cogs
-        for filename in os.listdir('./cogs'):
-            if filename.endswith('.py') and not filename.startswith('_'):
-                try:
-                    await self.load_extension(f'cogs.{filename[:-3]}')
-                    print(f"Successfully loaded extension: cogs.{filename[:-3]}")
-                except Exception as e:
-                    print(f"Failed to load extension cogs.{filename[:-3]}: {e}")
-
-        # sync commands !!!!!
+        # open the shared HTTP session used for all API requests
+        await utils.open_http_session()
+
+        # metrics: event loop lag sampling and the local Prometheus endpoint
+        self.loop_lag_monitor.start()
+        if self.config.METRICS_PORT:
+            self.metrics_runner = await metrics.start_metrics_server(self.config.METRICS_HOST, self.config.METRICS_PORT)
+
+        # names geocoded in earlier runs become autocomplete suggestions
+        print(f"Place index holds {await utils.load_geocoded_places()} place(s).")
+
+        # Load server locations early (with several processes the launcher has already migrated them)
+        if self.config.SHARD_PROCESSES == 1:
+            await self.location_store.migrate_from_json(self.config.LOCATIONS_FILE)
+        self.server_locations_cache = await self.location_store.load_all()
+        self.location_writer = locations_store.LocationWriteBehind(
+            self.location_store, self.server_locations_cache, self.config.LOCATIONS_WRITE_DELAY
+        )
+        print(f"Loaded {len(self.server_locations_cache)} server location(s).")
+
+        # load cogs concurrently
+        extensions = [
+            f'cogs.{filename[:-3]}' for filename in sorted(os.listdir('./cogs'))
+            if filename.endswith('.py') and not filename.startswith('_')
+        ]
+        await asyncio.gather(*(self._load_cog(extension) for extension in extensions))
+
+        # sync commands, only when they changed since the last successful sync
+        guild = None
         if self.config.TEST_GUILD_ID:
             guild = discord.Object(id=self.config.TEST_GUILD_ID)
             self.tree.copy_global_to(guild=guild)
+        if self.shard_ids is None or 0 in self.shard_ids:
+            await self._sync_commands(guild)
+        else:
+            print("Command sync is left to the process running shard 0.")
+
+    # loads one extension, logging instead of raising so one broken cog doesn't stop the others
+    async def _load_cog(self, extension: str):
+        try:
+            await self.load_extension(extension)
+            print(f"Successfully loaded extension: {extension}")
+        except Exception as e:
+            print(f"Failed to load extension {extension}: {e}")
+
+    # syncs the command tree to Discord if its hash differs from the last synced one
+    async def _sync_commands(self, guild):
+        target_name = f"test guild: {guild.id}" if guild is not None else "global"
+        target = commandsync.sync_target(self.application_id, guild)
+        tree_hash = commandsync.command_tree_hash(self.tree, guild)
+        if not self.config.FORCE_COMMAND_SYNC and self.command_sync_state.is_current(target, tree_hash):
+            print(f"Commands unchanged since last sync ({target_name}), skipping sync.")
+            return
+
+        try:
             synced = await self.tree.sync(guild=guild)
-            print(f"Synced {len(synced)} command(s) to test guild: {self.config.TEST_GUILD_ID}")
+        except discord.HTTPException as e:
+            print(f"Failed to sync commands ({target_name}): {e}")
+            return
+        await self.command_sync_state.save(target, tree_hash)
+        if guild is not None:
+            print(f"Synced {len(synced)} command(s) to test guild: {guild.id}")
         else:
-            synced = await self.tree.sync()
             print(f"Synced {len(synced)} command(s) globally.")
 
+    # bot shutting down
+    async def close(self):
+        await super().close()
+        self.loop_lag_monitor.stop()
+        if self.metrics_runner is not None:
+            await self.metrics_runner.cleanup()
+        await utils.close_http_session()
+        await utils.api_quota.save()
+        await utils.close_shared_cache()
+        utils.geocode_cache.close()
+        if self.location_writer is not None:
+            await self.location_writer.close()
+        self.location_store.close()
+
+    # app command finished without raising
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        record_command(interaction, "ok")
+
     # bot connected
     async def on_ready(self):
         print(f'{self.user.name} has connected to Discord!')
@@ -58,10 +177,100 @@ class MyBot(commands.Bot):
 # bot
 bot = MyBot()
 
+# MULTI-PROCESS LAUNCHER
+# Discord allows max_concurrency shard logins per 5 seconds
+IDENTIFY_INTERVAL = 5.0
+
+# splits shard ids round-robin over the worker processes
+def split_shards(shard_count: int, processes: int):
+    return [list(range(index, shard_count, processes)) for index in range(processes)]
+
+# asks Discord how many shards to run and how many may log in at once
+async def fetch_shard_plan(token: str):
+    client = discord.Client(intents=intents)
+    async with client:
+        await client.login(token)
+        shard_count, _, session_start_limit = await client.http.get_bot_gateway()
+    return shard_count, session_start_limit.get("max_concurrency", 1)
+
+# runs one worker process, restarting it if it crashes
+async def supervise_worker(index: int, shard_ids: list, shard_count: int, start_delay: float, stopping: asyncio.Event):
+    env = dict(os.environ, SHARD_IDS=",".join(map(str, shard_ids)), SHARD_COUNT=str(shard_count))
+    if config.METRICS_PORT:
+        env["METRICS_PORT"] = str(config.METRICS_PORT + index)
+    name = f"Worker {index} (shards {', '.join(map(str, shard_ids))})"
+
+    delay = start_delay
+    while True:
+        try:
+            await asyncio.wait_for(stopping.wait(), delay)
+            return
+        except asyncio.TimeoutError:
+            pass
+
+        process = await asyncio.create_subprocess_exec(sys.executable, os.path.abspath(__file__), env=env)
+        print(f"Started {name}, pid {process.pid}.")
+        exited = asyncio.ensure_future(process.wait())
+        stop_requested = asyncio.ensure_future(stopping.wait())
+        await asyncio.wait({exited, stop_requested}, return_when=asyncio.FIRST_COMPLETED)
+
+        if not exited.done():
+            # SIGINT lets the worker close cleanly (flush locations, save quota) like Ctrl+C would
+            try:
+                process.send_signal(signal.SIGINT)
+                await asyncio.wait_for(exited, 30)
+            except ProcessLookupError:
+                pass
+            except asyncio.TimeoutError:
+                process.kill()
+                await exited
+            print(f"{name} stopped.")
+            return
+        stop_requested.cancel()
+
+        if process.returncode == 0:
+            print(f"{name} exited.")
+            return
+        print(f"{name} exited with code {process.returncode}, restarting in {config.WORKER_RESTART_DELAY:.0f}s.")
+        delay = config.WORKER_RESTART_DELAY
+
+# starts SHARD_PROCESSES workers, each running an AutoShardedBot for its share of the shards
+async def run_workers():
+    shard_count = config.SHARD_COUNT
+    max_concurrency = 1
+    if not shard_count:
+        shard_count, max_concurrency = await fetch_shard_plan(config.TOKEN)
+    processes = min(config.SHARD_PROCESSES, shard_count)
+    print(f"Running {shard_count} shard(s) in {processes} process(es).")
+
+    # one-time import of the legacy JSON file, before any worker opens the store
+    await bot.location_store.migrate_from_json(config.LOCATIONS_FILE)
+    bot.location_store.close()
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for stop_signal in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(stop_signal, stopping.set)
+        except NotImplementedError:
+            # Windows: Ctrl+C reaches the workers directly
+            pass
+
+    # stagger workers so their shards don't all try to log in at the same time
+    workers = []
+    start_delay = 0.0
+    for index, shard_ids in enumerate(split_shards(shard_count, processes)):
+        workers.append(supervise_worker(index, shard_ids, shard_count, start_delay, stopping))
+        start_delay += IDENTIFY_INTERVAL * math.ceil(len(shard_ids) / max_concurrency)
+    await asyncio.gather(*workers)
+
 # run bot
 if __name__ == "__main__":
     if not config.TOKEN:
         print("CRITICAL ERROR: DISCORD_BOT_TOKEN is not set in config.py or .env file. Bot cannot start.")
         exit()
-    
-    bot.run(config.TOKEN)
\ No newline at end of file
+
+    if config.SHARD_PROCESSES > 1 and config.SHARD_IDS is None:
+        asyncio.run(run_workers())
+    else:
+        bot.run(config.TOKEN)
\ No newline at end of file
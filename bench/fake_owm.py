@@ -0,0 +1,347 @@
+# bench/fake_owm.py
+# LOCAL OPENWEATHERMAP STAND-IN
+# Serves geocoding, weather, forecast and air pollution payloads shaped like the real API, with
+# configurable latency and error rate, and counts every call so benchmarks can report API usage.
+#
+#   python bench/fake_owm.py --port 8765 --latency 0.08 --jitter 0.04 --error-rate 0.01
+#
+# then point the bot at it (see bench/loadtest.py, which can also run it in-process).
+# Imports
+import argparse
+import asyncio
+import csv
+import hashlib
+import math
+import os
+import random
+import time
+import zlib
+
+from aiohttp import web
+
+CITIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "cities.csv")
+
+# URL paths of each endpoint, relative to the server root
+ENDPOINT_PATHS = {
+    "direct_geocoding": "/geo/1.0/direct",
+    "reverse_geocoding": "/geo/1.0/reverse",
+    "weather": "/data/2.5/weather",
+    "weather_forecast": "/data/2.5/forecast",
+    "air_pollution": "/data/2.5/air_pollution",
+    "air_pollution_forecast": "/data/2.5/air_pollution/forecast",
+}
+
+# config.py environment variable for each endpoint
+ENDPOINT_ENV_VARS = {
+    "direct_geocoding": "DIRECT_GEOCODING_API_URL",
+    "reverse_geocoding": "REVERSE_GEOCODING_API_URL",
+    "weather": "WEATHER_API_URL",
+    "weather_forecast": "WEATHER_FORECAST_API_URL",
+    "air_pollution": "AIR_POLLUTION_CURRENT_API_URL",
+    "air_pollution_forecast": "AIR_POLLUTION_FORECAST_API_URL",
+}
+
+# (id, main, description, icon) picked per location and hour
+WEATHER_CONDITIONS = (
+    (800, "Clear", "clear sky", "01"),
+    (801, "Clouds", "few clouds", "02"),
+    (802, "Clouds", "scattered clouds", "03"),
+    (804, "Clouds", "overcast clouds", "04"),
+    (500, "Rain", "light rain", "10"),
+    (501, "Rain", "moderate rain", "10"),
+    (211, "Thunderstorm", "thunderstorm", "11"),
+    (600, "Snow", "light snow", "13"),
+    (741, "Fog", "fog", "50"),
+)
+
+# PM2.5 upper bounds (µg/m³) of OpenWeatherMap's AQI 1-4, used to keep aqi and pm2_5 consistent
+PM2_5_AQI_BOUNDS = (10, 25, 50, 75)
+
+
+# BUILDS ENV FOR THE BOT
+def endpoint_env(base_url: str):
+    """Returns {env var: url} pointing every config.py API URL at a server running on base_url."""
+    base_url = base_url.rstrip("/")
+    return {ENDPOINT_ENV_VARS[name]: base_url + path for name, path in ENDPOINT_PATHS.items()}
+
+
+# LOADS CITY LIST
+def load_cities(path: str = CITIES_FILE):
+    """Returns [(name, state, country, lat, lon)] from the bundled city list."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [
+            (row["name"], row["state"] or None, row["country"], float(row["lat"]), float(row["lon"]))
+            for row in csv.DictReader(f)
+        ]
+
+
+# FAKE OPENWEATHERMAP
+class FakeOpenWeatherMap:
+    """
+    Deterministic payloads: values depend only on the coordinates and the hour, so repeated
+    runs see the same data. Names in the bundled city list geocode to their real coordinates,
+    other names to a stable pseudo-random point, and names starting with "Nowhere" to no result.
+    """
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 500, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._cities = load_cities()
+        self._by_name = {}
+        for city in self._cities:
+            self._by_name.setdefault(city[0].casefold(), []).append(city)
+        self.calls = {name: 0 for name in ENDPOINT_PATHS}
+        self.errors = {name: 0 for name in ENDPOINT_PATHS}
+
+    def reset_counts(self):
+        for name in ENDPOINT_PATHS:
+            self.calls[name] = 0
+            self.errors[name] = 0
+
+    def snapshot(self):
+        """Returns {"calls": {...}, "errors": {...}} copies of the per-endpoint counters."""
+        return {"calls": dict(self.calls), "errors": dict(self.errors)}
+
+    # APP
+    def make_app(self):
+        app = web.Application()
+        handlers = {
+            "direct_geocoding": self._direct_geocoding,
+            "reverse_geocoding": self._reverse_geocoding,
+            "weather": self._weather,
+            "weather_forecast": self._weather_forecast,
+            "air_pollution": self._air_pollution,
+            "air_pollution_forecast": self._air_pollution_forecast,
+        }
+        for name, path in ENDPOINT_PATHS.items():
+            app.router.add_get(path, self._wrap(name, handlers[name]))
+        app.router.add_get("/_bench/stats", self._stats)
+        app.router.add_post("/_bench/reset", self._reset)
+        return app
+
+    def _wrap(self, name: str, handler):
+        async def handle(request: web.Request):
+            self.calls[name] += 1
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors[name] += 1
+                return web.json_response({"cod": self.error_status, "message": "injected error"}, status=self.error_status)
+            if request.query.get("appid") is None:
+                return web.json_response({"cod": 401, "message": "Invalid API key."}, status=401)
+            try:
+                return web.json_response(handler(request.query))
+            except (KeyError, ValueError):
+                return web.json_response({"cod": "400", "message": "bad query"}, status=400)
+        return handle
+
+    async def _stats(self, request: web.Request):
+        return web.json_response(self.snapshot())
+
+    async def _reset(self, request: web.Request):
+        self.reset_counts()
+        return web.json_response({"ok": True})
+
+    # GEOCODING
+    def _direct_geocoding(self, query):
+        parts = [part.strip() for part in query["q"].split(",")]
+        name = parts[0]
+        country = parts[-1].upper() if len(parts) > 1 else None
+        state = parts[1] if len(parts) > 2 else None
+        limit = int(query.get("limit", 5))
+        if name.casefold().startswith("nowhere"):
+            return []
+
+        matches = [
+            city for city in self._by_name.get(name.casefold(), [])
+            if (country is None or city[2] == country) and (state is None or (city[1] or "").casefold() == state.casefold())
+        ]
+        if not matches:
+            # any other name is a small town at a stable pseudo-random spot
+            digest = hashlib.sha1(query["q"].casefold().encode("utf-8")).digest()
+            lat = (int.from_bytes(digest[:4], "big") / 2 ** 32) * 120 - 55
+            lon = (int.from_bytes(digest[4:8], "big") / 2 ** 32) * 360 - 180
+            matches = [(name.title(), state, country or "US", round(lat, 4), round(lon, 4))]
+        return [self._geo_entry(city) for city in matches[:limit]]
+
+    def _reverse_geocoding(self, query):
+        lat, lon = float(query["lat"]), float(query["lon"])
+        limit = int(query.get("limit", 5))
+        nearest = sorted(self._cities, key=lambda city: _distance_km(lat, lon, city[3], city[4]))
+        return [self._geo_entry(city) for city in nearest[:limit]]
+
+    def _geo_entry(self, city):
+        name, state, country, lat, lon = city
+        entry = {"name": name, "local_names": {"en": name}, "lat": lat, "lon": lon, "country": country}
+        if state:
+            entry["state"] = state
+        return entry
+
+    # WEATHER
+    def _weather_entry(self, lat: float, lon: float, timestamp: int):
+        rng = _location_random(lat, lon, timestamp // 3600)
+        # warmer near the equator, with a day/night swing around local 3pm
+        utc_offset = _utc_offset(lon)
+        local_hour = ((timestamp + utc_offset) % 86400) / 3600
+        temp = 30 - abs(lat) * 0.45 + 6 * math.cos((local_hour - 15) / 24 * 2 * math.pi) + rng.uniform(-2, 2)
+        humidity = rng.randint(20, 95)
+        condition = WEATHER_CONDITIONS[rng.randrange(len(WEATHER_CONDITIONS))]
+        pod = "d" if 6 <= local_hour < 18 else "n"
+        wind_speed = round(rng.uniform(0, 12), 2)
+        return {
+            "weather": [{"id": condition[0], "main": condition[1], "description": condition[2], "icon": condition[3] + pod}],
+            "main": {
+                "temp": round(temp + 273.15, 2),
+                "feels_like": round(temp + 273.15 - wind_speed * 0.3 + (humidity - 50) * 0.02, 2),
+                "temp_min": round(temp + 273.15 - rng.uniform(0, 2), 2),
+                "temp_max": round(temp + 273.15 + rng.uniform(0, 2), 2),
+                "pressure": rng.randint(995, 1030),
+                "humidity": humidity,
+                "sea_level": rng.randint(995, 1030),
+                "grnd_level": rng.randint(950, 1020)
+            },
+            "visibility": 10000 if condition[1] not in ("Fog", "Rain") else rng.randint(800, 9000),
+            "wind": {"speed": wind_speed, "deg": rng.randrange(360), "gust": round(wind_speed * 1.4, 2)},
+            "clouds": {"all": rng.randint(0, 100)},
+            "dt": timestamp
+        }, pod
+
+    def _weather(self, query):
+        lat, lon = float(query["lat"]), float(query["lon"])
+        now = int(time.time())
+        entry, _ = self._weather_entry(lat, lon, now)
+        utc_offset = _utc_offset(lon)
+        day_start = now - (now + utc_offset) % 86400
+        entry.update({
+            "coord": {"lon": lon, "lat": lat},
+            "base": "stations",
+            "sys": {"country": "XX", "sunrise": day_start + 6 * 3600, "sunset": day_start + 18 * 3600},
+            "timezone": utc_offset,
+            "id": zlib.crc32(f"{lat:.2f},{lon:.2f}".encode()),
+            "name": "",
+            "cod": 200
+        })
+        return entry
+
+    def _weather_forecast(self, query):
+        lat, lon = float(query["lat"]), float(query["lon"])
+        start = int(time.time()) // 10800 * 10800 + 10800
+        entries = []
+        for index in range(40):
+            timestamp = start + index * 10800
+            entry, pod = self._weather_entry(lat, lon, timestamp)
+            entry["pop"] = round(_location_random(lat, lon, timestamp).random(), 2)
+            entry["sys"] = {"pod": pod}
+            entry["dt_txt"] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(timestamp))
+            entries.append(entry)
+        utc_offset = _utc_offset(lon)
+        day_start = start - (start + utc_offset) % 86400
+        return {
+            "cod": "200",
+            "message": 0,
+            "cnt": len(entries),
+            "list": entries,
+            "city": {
+                "id": zlib.crc32(f"{lat:.2f},{lon:.2f}".encode()),
+                "name": "",
+                "coord": {"lat": lat, "lon": lon},
+                "country": "XX",
+                "population": 0,
+                "timezone": utc_offset,
+                "sunrise": day_start + 6 * 3600,
+                "sunset": day_start + 18 * 3600
+            }
+        }
+
+    # AIR POLLUTION
+    def _air_pollution_entry(self, lat: float, lon: float, timestamp: int):
+        rng = _location_random(lat, lon, timestamp // 3600)
+        pm2_5 = round(rng.lognormvariate(2.6, 0.7), 2)
+        aqi = 1 + sum(pm2_5 > bound for bound in PM2_5_AQI_BOUNDS)
+        return {
+            "main": {"aqi": aqi},
+            "components": {
+                "co": round(rng.uniform(150, 900), 2),
+                "no": round(rng.uniform(0, 20), 2),
+                "no2": round(rng.uniform(1, 80), 2),
+                "o3": round(rng.uniform(10, 180), 2),
+                "so2": round(rng.uniform(0.5, 40), 2),
+                "pm2_5": pm2_5,
+                "pm10": round(pm2_5 * rng.uniform(1.1, 1.9), 2),
+                "nh3": round(rng.uniform(0, 15), 2)
+            },
+            "dt": timestamp
+        }
+
+    def _air_pollution(self, query):
+        lat, lon = float(query["lat"]), float(query["lon"])
+        now = int(time.time()) // 3600 * 3600
+        return {"coord": {"lon": lon, "lat": lat}, "list": [self._air_pollution_entry(lat, lon, now)]}
+
+    def _air_pollution_forecast(self, query):
+        lat, lon = float(query["lat"]), float(query["lon"])
+        start = int(time.time()) // 3600 * 3600 + 3600
+        return {
+            "coord": {"lon": lon, "lat": lat},
+            "list": [self._air_pollution_entry(lat, lon, start + index * 3600) for index in range(96)]
+        }
+
+
+# Helpers
+def _location_random(lat: float, lon: float, bucket: int):
+    return random.Random(zlib.crc32(f"{lat:.2f},{lon:.2f},{bucket}".encode()))
+
+def _utc_offset(lon: float):
+    # solar time zone, good enough for day boundaries
+    return int(round(lon / 15)) * 3600
+
+def _distance_km(lat1: float, lon1: float, lat2: float, lon2: float):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(min(1.0, math.sqrt(a)))
+
+
+# STARTS SERVER
+async def start_server(fake: FakeOpenWeatherMap, host: str = "127.0.0.1", port: int = 8765):
+    """Starts the fake API on host:port and returns the AppRunner (call cleanup() to stop it)."""
+    runner = web.AppRunner(fake.make_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenWeatherMap stand-in for benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.08, help="mean response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.04, help="delay varies uniformly by +/- this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fake = FakeOpenWeatherMap(args.latency, args.jitter, args.error_rate, args.error_status, args.seed)
+
+    async def serve():
+        runner = await start_server(fake, args.host, args.port)
+        base_url = f"http://{args.host}:{args.port}"
+        print(f"Fake OpenWeatherMap listening on {base_url}")
+        for env_var, url in endpoint_env(base_url).items():
+            print(f"  {env_var}={url}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
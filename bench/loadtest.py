@@ -0,0 +1,369 @@
+# bench/loadtest.py
+# LOAD TEST DRIVER
+# Runs WeatherCog / SettingsCog command callbacks with mock interactions for N concurrent users
+# against the fake OpenWeatherMap server and reports throughput, latency percentiles, API calls
+# and Discord round-trips per command. Nothing talks to Discord; responses are recorded on the mock interaction.
+#
+#   python bench/loadtest.py --users 50 --requests 20 --latency 0.08 --save baseline.json
+#   python bench/loadtest.py --users 50 --requests 20 --latency 0.08 --baseline baseline.json
+#
+# By default the fake server runs in the same event loop as the bot code. For cleaner numbers run
+# bench/fake_owm.py in another process and pass --owm-url http://127.0.0.1:8765.
+# Imports
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path[:0] = [REPO_DIR, BENCH_DIR]
+
+import fake_owm
+
+COMMANDS = ("setlocation", "aqi_c", "aqi_f", "weather", "weather_f", "dashboard")
+# commands answered with embeds; a reply without one means the lookup failed
+EMBED_COMMANDS = ("aqi_c", "aqi_f", "weather", "weather_f", "dashboard")
+
+
+# MOCK INTERACTION
+class MockResponse:
+    def __init__(self, interaction):
+        self._interaction = interaction
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def send_message(self, content=None, **kwargs):
+        self._done = True
+        self._interaction.record("response", content, kwargs)
+
+    async def defer(self, **kwargs):
+        self._done = True
+        self._interaction.record("defer", None, kwargs)
+
+
+class MockFollowup:
+    def __init__(self, interaction):
+        self._interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        self._interaction.record("followup", content, kwargs)
+
+
+class MockInteraction:
+    """
+    The parts of discord.Interaction the cogs use; records every Discord API round-trip (responses, defers,
+    followups, deletes) and when the first reply was sent.
+    """
+    def __init__(self, guild_id: int, user_id: int):
+        self.guild_id = guild_id
+        self.user = types.SimpleNamespace(id=user_id, name=f"bench-user-{user_id}", mention=f"<@{user_id}>")
+        self.extras = {}
+        self.command = None
+        self.response = MockResponse(self)
+        self.followup = MockFollowup(self)
+        self.created_at = time.perf_counter()
+        self.first_reply_at = None
+        self.replies = []
+
+    async def delete_original_response(self):
+        self.record("delete", None, {})
+
+    def record(self, kind: str, content, kwargs: dict):
+        if self.first_reply_at is None:
+            self.first_reply_at = time.perf_counter()
+        self.replies.append((kind, content, kwargs))
+
+    def has_embed(self):
+        return any(kwargs.get("embed") or kwargs.get("embeds") for _, _, kwargs in self.replies)
+
+
+# PERCENTILE
+def percentile(sorted_values: list, q: float):
+    """Nearest-rank percentile of an already sorted list, or None if it is empty."""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(q * len(sorted_values)) - 1)]
+
+
+# BUILDS LOCATION POOL
+def build_locations(count: int, unlisted_share: float, rng: random.Random):
+    """
+    Returns [(city, state_code, country_code)]. Bundled cities resolve from the local place index,
+    "unlisted" ones are made-up towns that have to go through the geocoding API.
+    """
+    cities = fake_owm.load_cities()
+    unlisted = round(count * unlisted_share)
+    pool = [(name, state, country) for name, state, country, _, _ in rng.sample(cities, min(count - unlisted, len(cities)))]
+    pool += [(f"Benchtown {index}", None, "US") for index in range(unlisted)]
+    rng.shuffle(pool)
+    return pool
+
+
+# LOAD TEST
+class LoadTest:
+    def __init__(self, args, bot, fake=None):
+        self.args = args
+        self.bot = bot
+        self.fake = fake
+        self.rng = random.Random(args.seed)
+        self.locations = build_locations(args.locations, args.unlisted, self.rng)
+
+        from cogs import settings_cog, weather_cog
+        self.weather = weather_cog.WeatherCog(bot)
+        self.settings = settings_cog.SettingsCog(bot)
+        self.callbacks = {
+            "setlocation": (self.settings, self.settings.set_location_slash),
+            "aqi_c": (self.weather, self.weather.aqi_slash_current),
+            "aqi_f": (self.weather, self.weather.aqi_slash_forecast),
+            "weather": (self.weather, self.weather.weather_slash),
+            "weather_f": (self.weather, self.weather.weather_forecast_slash),
+            "dashboard": (self.weather, self.weather.dashboard_slash),
+        }
+
+    # API call counters, from the in-process server or the external one's stats route
+    async def api_calls(self):
+        if self.fake is not None:
+            return self.fake.snapshot()["calls"]
+        import utils
+        session = await utils.open_http_session()
+        async with session.get(self.args.owm_url.rstrip("/") + "/_bench/stats") as response:
+            return (await response.json())["calls"]
+
+    def clear_caches(self):
+        import render
+        import utils
+        utils.response_cache.clear()
+        utils.forecast_cache.clear()
+        render.render_cache.clear()
+
+    # picks the arguments for one command
+    def pick_arguments(self, command: str):
+        if command != "setlocation" and self.rng.random() < self.args.default_share:
+            return {}
+        if self.rng.random() < self.args.not_found:
+            city, state_code, country_code = f"Nowhere {self.rng.randrange(1000)}", None, None
+        else:
+            city, state_code, country_code = self.rng.choice(self.locations)
+        return {"city": city, "state_code": state_code, "country_code": country_code}
+
+    async def run_command(self, command: str, user_id: int, samples: list):
+        cog, app_command = self.callbacks[command]
+        # one guild per user, so /setlocation gives later commands a server default to fall back to
+        interaction = MockInteraction(guild_id=user_id, user_id=user_id)
+        interaction.command = app_command
+        kwargs = self.pick_arguments(command)
+        started_at = time.perf_counter()
+        error = None
+        try:
+            await app_command.callback(cog, interaction, **kwargs)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finished_at = time.perf_counter()
+        samples.append({
+            "command": command,
+            "seconds": finished_at - started_at,
+            "first_reply_seconds": (interaction.first_reply_at or finished_at) - started_at,
+            "exception": error,
+            "discord_calls": len(interaction.replies),
+            "no_data": error is None and command in EMBED_COMMANDS and not interaction.has_embed()
+        })
+
+    async def user(self, user_id: int, commands: tuple, samples: list):
+        for _ in range(self.args.requests):
+            await self.run_command(self.rng.choice(commands), user_id, samples)
+            if self.args.think:
+                await asyncio.sleep(self.rng.uniform(0, 2 * self.args.think))
+
+    # RUNS ONE PHASE
+    async def run_phase(self, name: str, commands: tuple):
+        if self.args.cold:
+            self.clear_caches()
+        calls_before = await self.api_calls()
+        samples = []
+        started_at = time.perf_counter()
+        await asyncio.gather(*(self.user(user_id, commands, samples) for user_id in range(1, self.args.users + 1)))
+        wall_seconds = time.perf_counter() - started_at
+        calls_after = await self.api_calls()
+        api_calls = {endpoint: calls_after[endpoint] - calls_before.get(endpoint, 0) for endpoint in calls_after}
+        return summarize(name, samples, wall_seconds, api_calls)
+
+
+# SUMMARIZES A PHASE
+def summarize(name: str, samples: list, wall_seconds: float, api_calls: dict):
+    latencies = sorted(sample["seconds"] for sample in samples)
+    first_replies = sorted(sample["first_reply_seconds"] for sample in samples)
+    exceptions = [sample["exception"] for sample in samples if sample["exception"]]
+    count = len(samples)
+    return {
+        "phase": name,
+        "commands": count,
+        "seconds": wall_seconds,
+        "throughput": count / wall_seconds if wall_seconds else 0.0,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "max": latencies[-1] if latencies else None,
+        "first_reply_p95": percentile(first_replies, 0.95),
+        "exceptions": len(exceptions),
+        "exception_examples": sorted(set(exceptions))[:3],
+        "no_data": sum(1 for sample in samples if sample["no_data"]),
+        "api_calls": {endpoint: calls for endpoint, calls in api_calls.items() if calls},
+        "api_calls_per_command": sum(api_calls.values()) / count if count else 0.0,
+        "discord_calls_per_command": sum(sample["discord_calls"] for sample in samples) / count if count else 0.0
+    }
+
+
+# PRINTS RESULTS
+def print_results(results: list, baseline: dict = None):
+    def ms(seconds):
+        return f"{seconds * 1000:.1f}" if seconds is not None else "-"
+
+    header = f"{'phase':<12} {'cmds':>6} {'cmd/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'1st p95':>8} {'api/cmd':>8} {'dsc/cmd':>8} {'exc':>5} {'nodata':>6}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result['phase']:<12} {result['commands']:>6} {result['throughput']:>8.1f} {ms(result['p50']):>8} "
+            f"{ms(result['p95']):>8} {ms(result['p99']):>8} {ms(result['first_reply_p95']):>8} "
+            f"{result['api_calls_per_command']:>8.2f} {result.get('discord_calls_per_command', 0.0):>8.2f} "
+            f"{result['exceptions']:>5} {result['no_data']:>6}"
+        )
+    print()
+    for result in results:
+        calls = ", ".join(f"{endpoint}={calls}" for endpoint, calls in sorted(result["api_calls"].items())) or "none"
+        print(f"{result['phase']:<12} API calls: {calls}")
+        for example in result["exception_examples"]:
+            print(f"{'':<12} exception: {example}")
+
+    if baseline:
+        base_by_phase = {result["phase"]: result for result in baseline.get("results", [])}
+        print()
+        print(f"Compared with baseline from {baseline.get('created', '?')}:")
+        for result in results:
+            base = base_by_phase.get(result["phase"])
+            if not base:
+                continue
+            def change(key):
+                if not base.get(key) or result.get(key) is None:
+                    return "-"
+                return f"{(result[key] - base[key]) / base[key]:+.0%}"
+            print(
+                f"{result['phase']:<12} cmd/s {change('throughput'):>6}  p50 {change('p50'):>6}  "
+                f"p95 {change('p95'):>6}  p99 {change('p99'):>6}  api/cmd {change('api_calls_per_command'):>6}  "
+                f"dsc/cmd {change('discord_calls_per_command'):>6}"
+            )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load test the bot's command handlers against a fake OpenWeatherMap.")
+    parser.add_argument("--users", type=int, default=20, help="concurrent simulated users")
+    parser.add_argument("--requests", type=int, default=10, help="commands each user runs per phase")
+    parser.add_argument("--commands", default=",".join(COMMANDS), help="comma separated commands, each gets its own phase")
+    parser.add_argument("--no-mixed", action="store_true", help="skip the final phase that mixes all commands")
+    parser.add_argument("--locations", type=int, default=50, help="distinct locations users ask about")
+    parser.add_argument("--unlisted", type=float, default=0.3, help="share of locations not in the bundled city list")
+    parser.add_argument("--not-found", type=float, default=0.02, help="share of lookups for places that don't exist")
+    parser.add_argument("--default-share", type=float, default=0.2, help="share of weather commands run without a city")
+    parser.add_argument("--think", type=float, default=0.0, help="mean pause between a user's commands, in seconds")
+    parser.add_argument("--cold", action="store_true", help="clear the response, forecast and render caches before each phase")
+    parser.add_argument("--latency", type=float, default=0.08, help="fake API mean delay in seconds (in-process server)")
+    parser.add_argument("--jitter", type=float, default=0.04, help="fake API delay spread in seconds (in-process server)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake API error share (in-process server)")
+    parser.add_argument("--owm-url", help="use an already running bench/fake_owm.py at this base URL")
+    parser.add_argument("--port", type=int, default=8765, help="port for the in-process fake server")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against results saved earlier with --save")
+    return parser.parse_args()
+
+
+# POINTS CONFIG AT THE FAKE SERVER
+def configure_environment(args, data_dir: str):
+    """Sets the env vars config.py reads. Must run before the bot's modules are imported."""
+    base_url = args.owm_url or f"http://127.0.0.1:{args.port}"
+    os.environ.update(fake_owm.endpoint_env(base_url))
+    os.environ["API_KEY"] = os.environ.get("BENCH_API_KEY", "bench")
+    os.environ["GEOCODE_CACHE_FILE"] = os.path.join(data_dir, "geocode_cache.sqlite3")
+    os.environ["LOCATIONS_DB_FILE"] = os.path.join(data_dir, "server_locations.sqlite3")
+    os.environ["METRICS_PORT"] = "0"
+    # the real client-side limits would measure the rate limiter, not the code; export these to test them
+    os.environ.setdefault("OWM_CALLS_PER_MINUTE", "1000000")
+    os.environ.setdefault("OWM_BURST", "100000")
+    os.environ.setdefault("OWM_CALLS_PER_DAY", "1000000000")
+
+
+async def run(args):
+    import app
+    import utils
+    import locations_store
+
+    fake = None
+    runner = None
+    if not args.owm_url:
+        fake = fake_owm.FakeOpenWeatherMap(args.latency, args.jitter, args.error_rate, seed=args.seed)
+        runner = await fake_owm.start_server(fake, "127.0.0.1", args.port)
+
+    # the parts of MyBot.setup_hook the commands depend on, without logging in to Discord
+    bot = app.bot
+    await utils.open_http_session()
+    await utils.load_geocoded_places()
+    bot.server_locations_cache = await bot.location_store.load_all()
+    bot.location_writer = locations_store.LocationWriteBehind(
+        bot.location_store, bot.server_locations_cache, bot.config.LOCATIONS_WRITE_DELAY
+    )
+
+    load_test = LoadTest(args, bot, fake)
+    commands = tuple(command.strip() for command in args.commands.split(",") if command.strip())
+    unknown = [command for command in commands if command not in load_test.callbacks]
+    if unknown:
+        raise SystemExit(f"Unknown command(s): {', '.join(unknown)}. Choose from {', '.join(COMMANDS)}.")
+
+    results = []
+    try:
+        for command in commands:
+            results.append(await load_test.run_phase(command, (command,)))
+        if not args.no_mixed and len(commands) > 1:
+            results.append(await load_test.run_phase("mixed", commands))
+    finally:
+        await bot.location_writer.close()
+        bot.location_store.close()
+        await utils.close_http_session()
+        if runner is not None:
+            await runner.cleanup()
+    return results
+
+
+def main():
+    args = parse_args()
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory(prefix="aqbot-bench-") as data_dir:
+        configure_environment(args, data_dir)
+        print(
+            f"{args.users} users x {args.requests} commands per phase, {args.locations} locations, "
+            f"{'cold' if args.cold else 'warm'} caches, API at {args.owm_url or 'in-process fake'}"
+        )
+        results = asyncio.run(run(args))
+
+    print()
+    print_results(results, baseline)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "args": vars(args), "results": results}, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# IN-PROCESS RESPONSE CACHE
+# Imports
+import time
+from collections import OrderedDict
+
+
+# TTL + LRU CACHE
+class TTLCache:
+    """
+    Small LRU cache where every entry carries its own expiry time.
+    Bounded by entry count and by an approximate byte size supplied by the caller.
+    """
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.evictions = 0
+        # key -> (value, expires_at, size)
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the cached value for key, or None if it is missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def get_stale(self, key):
+        """Returns the cached value for key even if it has expired, or None if it was evicted."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self.stale_hits += 1
+        return entry[0]
+
+    def peek(self, key):
+        """Returns the cached value for key, expired or not, without touching LRU order or counters."""
+        entry = self._entries.get(key)
+        return entry[0] if entry is not None else None
+
+    def expires_in(self, key):
+        """Returns seconds until key expires (negative if already expired), or None if it isn't cached."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry[1] - time.monotonic()
+
+    def set(self, key, value, ttl: float, size: int = 0):
+        """Stores value under key for ttl seconds, evicting least recently used entries if over the cap."""
+        if size > self.max_bytes:
+            return
+        old_entry = self._entries.pop(key, None)
+        if old_entry is not None:
+            self.current_bytes -= old_entry[2]
+        self._entries[key] = (value, time.monotonic() + ttl, size)
+        self.current_bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self.current_bytes -= evicted[2]
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self):
+        """Returns counters for logging / diagnostics."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+# BUILDS RESPONSE CACHE KEY
+def make_location_key(url: str, lat, lon, precision: int):
+    """Builds a cache key from the endpoint and coordinates rounded to the given precision."""
+    return (url, round(float(lat), precision), round(float(lon), precision))
@@ -0,0 +1,65 @@
+# RETRY BACKOFF AND CIRCUIT BREAKER
+# Imports
+import random
+import time
+
+
+# GETS BACKOFF DELAY
+def backoff_delay(attempt: int, base: float, cap: float):
+    """Exponential backoff with full jitter: a random delay in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+# CIRCUIT BREAKER
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+    After failure_threshold consecutive failed requests the circuit opens and requests fail fast
+    for reset_timeout seconds. After that a single trial request is let through (half-open);
+    success closes the circuit, failure opens it again.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_progress = False
+
+    def allow_request(self):
+        """Returns True if a request may be sent now."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._trial_in_progress = False
+        # half-open: only one trial request at a time
+        if self._trial_in_progress:
+            return False
+        self._trial_in_progress = True
+        return True
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_progress = False
+
+    def cancel_request(self):
+        """Releases the half-open trial slot for a request that was never sent."""
+        self._trial_in_progress = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_progress = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                print(f"Circuit for {self.name} opened after {self.failures} consecutive failure(s).")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
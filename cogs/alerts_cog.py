@@ -0,0 +1,204 @@
+# cogs/alerts_cog.py
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+from discord.app_commands import MissingPermissions
+from discord.app_commands.checks import has_permissions
+import asyncio
+import datetime
+import sqlite3
+
+import utils
+import config
+import render
+from models import AirQualitySample
+
+# AlertsCog class
+class AlertsCog(commands.Cog):
+    """
+    Lets servers subscribe a channel to AQI threshold alerts for their /setlocation location.
+    One scheduler polls each distinct (rounded) location once and fans the result out to every subscription.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        # loaded from the location store in cog_load
+        self.subscriptions = {}
+        # guild ids whose last check was over threshold, so we only post when conditions first cross it
+        self.alerting_guilds = set()
+        self.alert_loop.start()
+
+    async def cog_load(self):
+        self.subscriptions = await self.bot.location_store.load_alert_subscriptions()
+
+    def cog_unload(self):
+        self.alert_loop.cancel()
+
+    # writes one guild's subscription (or its removal) to the location store
+    async def _save_subscription(self, guild_id: int):
+        try:
+            await self.bot.location_store.save_alert_subscription(guild_id, self.subscriptions.get(guild_id))
+        except sqlite3.Error as e:
+            print(f"Error saving alert subscription for guild {guild_id}: {e}")
+
+    # SUBSCRIBE TO ALERTS
+    @app_commands.command(name="aqi_alert_set", description="Posts an alert in a channel when air quality crosses a threshold.")
+    @has_permissions(manage_guild=True)
+    async def aqi_alert_set_slash(self, interaction: discord.Interaction, channel: discord.TextChannel,
+                                  aqi_threshold: app_commands.Range[int, 1, 5] = 4, pm2_5_threshold: float = None):
+        if not interaction.guild_id:
+            await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+            return
+
+        if interaction.guild_id not in self.bot.server_locations_cache:
+            await interaction.response.send_message("Please set a location for this server with /setlocation first.", ephemeral=True)
+            return
+
+        self.subscriptions[interaction.guild_id] = {
+            "channel_id": channel.id,
+            "aqi_threshold": aqi_threshold,
+            "pm2_5_threshold": pm2_5_threshold,
+            "set_by_user_id": interaction.user.id,
+            "set_at": datetime.datetime.now().isoformat()
+        }
+        self.alerting_guilds.discard(interaction.guild_id)
+        await self._save_subscription(interaction.guild_id)
+
+        conditions = f"AQI ≥ {aqi_threshold}"
+        if pm2_5_threshold is not None:
+            conditions += f" or PM₂.₅ ≥ {pm2_5_threshold:.1f} µg/m³"
+        await interaction.response.send_message(f"Air quality alerts will be posted in {channel.mention} when {conditions}.")
+
+    # UNSUBSCRIBE FROM ALERTS
+    @app_commands.command(name="aqi_alert_remove", description="Stops air quality alerts for this server.")
+    @has_permissions(manage_guild=True)
+    async def aqi_alert_remove_slash(self, interaction: discord.Interaction):
+        if not interaction.guild_id:
+            await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+            return
+
+        if self.subscriptions.pop(interaction.guild_id, None) is None:
+            await interaction.response.send_message("This server has no air quality alerts set up.", ephemeral=True)
+            return
+
+        self.alerting_guilds.discard(interaction.guild_id)
+        await self._save_subscription(interaction.guild_id)
+        await interaction.response.send_message("Air quality alerts for this server have been removed.")
+
+    @aqi_alert_set_slash.error
+    @aqi_alert_remove_slash.error
+    async def aqi_alert_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        if isinstance(error, MissingPermissions):
+            await interaction.response.send_message("You do not have permission to use this command.", ephemeral=True)
+        else:
+            print(f"An unexpected error occurred with AQI alerts: {error}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message("An unexpected error occurred. Please try again later.", ephemeral=True)
+            else:
+                await interaction.followup.send("An unexpected error occurred. Please try again later.", ephemeral=True)
+
+    # groups subscriptions by the response cache key of their location
+    def _group_subscriptions(self):
+        groups = {}
+        for guild_id, subscription in list(self.subscriptions.items()):
+            # guilds on other shard processes are checked there
+            if not self.bot.owns_guild(guild_id):
+                continue
+            location = self.bot.server_locations_cache.get(guild_id)
+            if not location:
+                continue
+            params = {
+                "lat": location.lat,
+                "lon": location.lon,
+                "appid": self.bot.config.OPENWEATHERMAP_API_KEY
+            }
+            cache_key = utils.get_response_cache_key(self.bot.config.AIR_POLLUTION_CURRENT_API_URL, params)
+            group = groups.setdefault(cache_key, {"params": params, "guilds": []})
+            group["guilds"].append((guild_id, subscription, location.display_name))
+        return groups
+
+    # checks a subscription against a reading
+    def _is_triggered(self, subscription: dict, sample: AirQualitySample):
+        if sample.aqi is not None and sample.aqi >= subscription["aqi_threshold"]:
+            return True
+        pm2_5_threshold = subscription.get("pm2_5_threshold")
+        return pm2_5_threshold is not None and sample.pm2_5 is not None and sample.pm2_5 >= pm2_5_threshold
+
+    # builds the alert message embed
+    def _build_alert_embed(self, display_name: str, sample: AirQualitySample):
+        embed = discord.Embed(
+            title=f"⚠️ Air Quality Alert for {display_name}",
+            description=f"Air quality is currently **{sample.aqi} - {utils.get_aqi_category(sample.aqi)}**.",
+            color=render.AQI_COLORS.get(sample.aqi, discord.Color.red())
+        )
+        if sample.pm2_5 is not None:
+            embed.add_field(name="PM₂.₅", value=f"{sample.pm2_5:.2f} µg/m³", inline=True)
+        if sample.pm10 is not None:
+            embed.add_field(name="PM₁₀", value=f"{sample.pm10:.2f} µg/m³", inline=True)
+        embed.set_footer(text="Air quality data provided by OpenWeatherMap • /aqi_alert_remove to stop alerts")
+        return embed
+
+    # sends one alert, bounded by the shared semaphore
+    async def _send_alert(self, semaphore: asyncio.Semaphore, guild_id: int, channel_id: int, embed: discord.Embed):
+        async with semaphore:
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                print(f"Alert channel {channel_id} for guild {guild_id} not found.")
+                return
+            try:
+                await channel.send(embed=embed)
+            except discord.HTTPException as e:
+                print(f"Failed to send AQI alert to channel {channel_id} in guild {guild_id}: {e}")
+
+    # fetches one location's reading, bounded by the shared semaphore
+    async def _fetch_group(self, semaphore: asyncio.Semaphore, params: dict):
+        async with semaphore:
+            return await utils.make_api_request(self.bot.config.AIR_POLLUTION_CURRENT_API_URL, params)
+
+    @tasks.loop(seconds=config.ALERT_CHECK_INTERVAL)
+    async def alert_loop(self):
+        if not self.bot.config.OPENWEATHERMAP_API_KEY or not self.subscriptions:
+            return
+        try:
+            await self._check_alerts_once()
+        except Exception as e:
+            # keep the loop alive, the next pass will try again
+            print(f"An unexpected error occurred while checking AQI alerts: {e}")
+
+    async def _check_alerts_once(self):
+        groups = list(self._group_subscriptions().values())
+        fetch_semaphore = asyncio.Semaphore(self.bot.config.ALERT_FETCH_CONCURRENCY)
+        results = await asyncio.gather(*(self._fetch_group(fetch_semaphore, group["params"]) for group in groups))
+
+        send_semaphore = asyncio.Semaphore(self.bot.config.ALERT_SEND_CONCURRENCY)
+        sends = []
+        for group, sample in zip(groups, results):
+            if sample is None:
+                continue
+
+            # guilds sharing a location usually share a display name, so build each embed once
+            embeds = {}
+            for guild_id, subscription, display_name in group["guilds"]:
+                if not self._is_triggered(subscription, sample):
+                    self.alerting_guilds.discard(guild_id)
+                    continue
+                if guild_id in self.alerting_guilds:
+                    continue
+                self.alerting_guilds.add(guild_id)
+                embed = embeds.get(display_name)
+                if embed is None:
+                    embed = self._build_alert_embed(display_name, sample)
+                    embeds[display_name] = embed
+                sends.append(self._send_alert(send_semaphore, guild_id, subscription["channel_id"], embed))
+
+        if sends:
+            await asyncio.gather(*sends)
+            print(f"Sent {len(sends)} AQI alert(s) for {len(groups)} location(s).")
+
+    @alert_loop.before_loop
+    async def before_alert_loop(self):
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(AlertsCog(bot))
+    print("AlertsCog loaded.")
@@ -0,0 +1,197 @@
+# cogs/compare_cog.py
+import discord
+from discord import app_commands
+from discord.ext import commands
+import asyncio
+import time
+
+import utils
+
+# CompareCog class
+class CompareCog(commands.Cog):
+    """
+    Compares air quality and weather across several locations in one table.
+    Locations are geocoded and fetched concurrently (bounded by COMPARE_CONCURRENCY) through the shared
+    client and caches, so comparing N cities takes about as long as the slowest single lookup.
+    The owner-only comparison of every guild location reads cached responses only (this process's cache, then
+    the shared cache), so it costs no API calls however many guilds there are.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    # splits "city[,state][,country]; city..." into (city, state_code, country_code) tuples
+    def _parse_locations(self, locations: str):
+        parsed = []
+        for location in locations.split(";"):
+            parts = [part.strip() for part in location.split(",") if part.strip()]
+            if not parts:
+                continue
+            if len(parts) == 1:
+                parsed.append((parts[0], None, None))
+            elif len(parts) == 2:
+                parsed.append((parts[0], None, parts[1]))
+            else:
+                parsed.append((parts[0], parts[1], parts[2]))
+        return parsed
+
+    # every distinct (rounded) guild location, for bot owners
+    def _guild_locations(self):
+        targets = {}
+        for location in list(self.bot.server_locations_cache.values()):
+            cache_key = utils.get_response_cache_key(
+                self.bot.config.AIR_POLLUTION_CURRENT_API_URL, {"lat": location.lat, "lon": location.lon}
+            )
+            targets.setdefault(cache_key, (location.lat, location.lon, location.display_name))
+        return list(targets.values())
+
+    # (url, cache key) of the AQI and current weather responses for a guild location
+    def _cache_requests(self, target):
+        params = {"lat": target[0], "lon": target[1]}
+        return [
+            (url, utils.get_response_cache_key(url, params))
+            for url in (self.bot.config.AIR_POLLUTION_CURRENT_API_URL, self.bot.config.CURRENT_WEATHER_API_URL)
+        ]
+
+    # builds a row from whatever is cached for a guild location (expired entries included), without calling the API
+    def _cached_row(self, target):
+        lat, lon, display_name = target
+        cached = {}
+        for url, cache_key in self._cache_requests(target):
+            cached[url] = utils.get_response_cache(url).peek(cache_key) if cache_key is not None else None
+        sample = cached[self.bot.config.AIR_POLLUTION_CURRENT_API_URL]
+        weather = cached[self.bot.config.CURRENT_WEATHER_API_URL]
+        return self._row(display_name or f"Lat: {lat:.2f}, Lon: {lon:.2f}", sample, weather)
+
+    # one table row from a location's AQI sample and current weather (either may be None)
+    def _row(self, name: str, sample, weather):
+        return {
+            "name": name,
+            "aqi": sample.aqi if sample else None,
+            "pm2_5": sample.pm2_5 if sample else None,
+            "temp": weather.temp - 273.15 if weather and weather.temp is not None else None,
+            "error": None if sample or weather else "no data"
+        }
+
+    # geocodes (if needed) and fetches one location, bounded by the shared semaphore
+    async def _lookup(self, semaphore: asyncio.Semaphore, target):
+        async with semaphore:
+            if isinstance(target[0], str):
+                lat, lon, display_name_or_error = await utils.get_coordinates_from_api(
+                    *target,
+                    self.bot.config.OPENWEATHERMAP_API_KEY,
+                    self.bot.config.GEOCODING_API_URL
+                )
+                if lat is None or lon is None:
+                    return {"name": target[0], "error": display_name_or_error}
+            else:
+                lat, lon, display_name_or_error = target
+                if not display_name_or_error:
+                    display_name_or_error = await utils.get_place_name(
+                        lat, lon,
+                        self.bot.config.OPENWEATHERMAP_API_KEY,
+                        self.bot.config.REVERSE_GEOCODING_API_URL
+                    )
+
+            params = {"lat": lat, "lon": lon, "appid": self.bot.config.OPENWEATHERMAP_API_KEY}
+            sample, weather = await asyncio.gather(
+                utils.make_api_request(self.bot.config.AIR_POLLUTION_CURRENT_API_URL, params),
+                utils.make_api_request(self.bot.config.CURRENT_WEATHER_API_URL, params)
+            )
+        return self._row(display_name_or_error or f"Lat: {lat:.2f}, Lon: {lon:.2f}", sample, weather)
+
+    # formats the ranked rows as a monospace table
+    def _build_table(self, rows: list):
+        lines = [f"{'#':>2} {'Location':<22} {'AQI':>3} {'PM2.5':>6} {'Temp':>7}"]
+        for rank, row in enumerate(rows, start=1):
+            name = row["name"] if len(row["name"]) <= 22 else row["name"][:21] + "…"
+            aqi = str(row["aqi"]) if row["aqi"] is not None else "-"
+            pm2_5 = f"{row['pm2_5']:.1f}" if row["pm2_5"] is not None else "-"
+            temp = f"{row['temp']:.1f}°C" if row["temp"] is not None else "-"
+            lines.append(f"{rank:>2} {name:<22} {aqi:>3} {pm2_5:>6} {temp:>7}")
+        return "```\n" + "\n".join(lines) + "\n```"
+
+    async def _compare(self, interaction: discord.Interaction, locations: str, all_guild_locations: bool, title: str, sort_key):
+        started_at = time.monotonic()
+        if not self.bot.config.OPENWEATHERMAP_API_KEY:
+            await interaction.response.send_message("API key not configured.", ephemeral=True)
+            return
+
+        if all_guild_locations:
+            if not await self.bot.is_owner(interaction.user):
+                await interaction.response.send_message("Only the bot owner can compare every server's location.", ephemeral=True)
+                return
+            targets = self._guild_locations()
+        else:
+            targets = self._parse_locations(locations or "")
+            if len(targets) < 2:
+                await interaction.response.send_message(
+                    "Please give at least two locations separated by `;`, e.g. `London, GB; Paris, FR`.", ephemeral=True
+                )
+                return
+            if len(targets) > self.bot.config.COMPARE_MAX_LOCATIONS:
+                await interaction.response.send_message(
+                    f"Please compare at most {self.bot.config.COMPARE_MAX_LOCATIONS} locations at a time.", ephemeral=True
+                )
+                return
+
+        if not targets:
+            await interaction.response.send_message("No server locations have been set yet.", ephemeral=True)
+            return
+
+        if all_guild_locations:
+            # locations pre-warmed by other shard processes are only in the shared cache
+            await utils.load_shared_responses([request for target in targets for request in self._cache_requests(target)])
+            results = [self._cached_row(target) for target in targets]
+        else:
+            semaphore = asyncio.Semaphore(self.bot.config.COMPARE_CONCURRENCY)
+            results = await utils.await_or_defer(interaction, started_at, asyncio.gather(
+                *(self._lookup(semaphore, target) for target in targets)
+            ))
+
+        rows = sorted((row for row in results if row["error"] is None), key=sort_key)
+        failed = [row for row in results if row["error"] is not None]
+        if not rows:
+            await utils.send_interaction_response(interaction, "Could not retrieve data for any of those locations.")
+            return
+
+        shown_rows = rows[:self.bot.config.COMPARE_MAX_ROWS]
+        embed = discord.Embed(title=title, description=self._build_table(shown_rows), color=discord.Color.blue())
+        if len(rows) > len(shown_rows):
+            embed.add_field(name="Not shown", value=f"…and {len(rows) - len(shown_rows)} more location(s).", inline=False)
+        if failed and all_guild_locations:
+            embed.add_field(name="⚠️ Skipped", value=f"{len(failed)} location(s) with no cached data.", inline=False)
+        elif failed:
+            embed.add_field(name="⚠️ Skipped", value=", ".join(row["name"] for row in failed)[:1024], inline=False)
+        embed.set_footer(text="Weather and air quality data provided by OpenWeatherMap")
+        await utils.send_interaction_response(interaction, embed=embed)
+
+    # COMPARE AIR QUALITY
+    @app_commands.command(name="aqi_compare", description="Compares current air quality across locations, cleanest first.")
+    @app_commands.describe(
+        locations="Locations separated by ';', each as city[, state][, country], e.g. London, GB; Paris, FR",
+        all_guild_locations="Bot owner only: compare every server's /setlocation location from cached data"
+    )
+    async def aqi_compare_slash(self, interaction: discord.Interaction, locations: str = None, all_guild_locations: bool = False):
+        # lowest AQI first, then lowest PM2.5; locations without a reading go last
+        await self._compare(
+            interaction, locations, all_guild_locations, "Air Quality Comparison",
+            lambda row: (row["aqi"] is None, row["aqi"] or 0, row["pm2_5"] if row["pm2_5"] is not None else float("inf"))
+        )
+
+    # COMPARE WEATHER
+    @app_commands.command(name="weather_compare", description="Compares current temperature and air quality across locations, warmest first.")
+    @app_commands.describe(
+        locations="Locations separated by ';', each as city[, state][, country], e.g. London, GB; Paris, FR",
+        all_guild_locations="Bot owner only: compare every server's /setlocation location from cached data"
+    )
+    async def weather_compare_slash(self, interaction: discord.Interaction, locations: str = None, all_guild_locations: bool = False):
+        # warmest first; locations without a temperature go last
+        await self._compare(
+            interaction, locations, all_guild_locations, "Weather Comparison",
+            lambda row: (row["temp"] is None, -(row["temp"] or 0))
+        )
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(CompareCog(bot))
+    print("CompareCog loaded.")
@@ -0,0 +1,194 @@
+# cogs/history_cog.py
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+import asyncio
+import time
+
+import utils
+import config
+import render
+import history
+from models import AirQualitySample, ForecastSeries
+
+# HistoryCog class
+class HistoryCog(commands.Cog):
+    """
+    Records every current and past air quality sample for the servers' /setlocation locations and answers
+    /aqi_history from the store's hourly / daily rollups, without calling the API.
+    Samples come from any air pollution response the bot loads plus an hourly pass over the tracked locations.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        # one directory for every process, so a guild's history survives a change of shard plan; only the
+        # process running shard 0 (like command sync) records, the others just read the rollups
+        self.store = history.HistoryStore(self.bot.config.HISTORY_DIR)
+        self.is_writer = not self.bot.config.SHARD_IDS or 0 in self.bot.config.SHARD_IDS
+        # series key -> request params for every location a guild has set
+        self.tracked = {}
+        # (series key, sample) waiting to be written by the drain task
+        self.pending = []
+        self.drain_task = None
+        if self.bot.config.HISTORY_ENABLED and self.is_writer:
+            utils.response_listeners.append(self._record_response)
+            self.history_loop.start()
+
+    async def cog_unload(self):
+        self.history_loop.cancel()
+        if self._record_response in utils.response_listeners:
+            utils.response_listeners.remove(self._record_response)
+        if self.drain_task is not None:
+            await self.drain_task
+        await asyncio.to_thread(self.store.close)
+
+    # series key for request params, from the same snapped / rounded coordinates as the response cache key
+    def _series_key(self, params: dict):
+        cache_key = utils.get_response_cache_key(self.bot.config.AIR_POLLUTION_CURRENT_API_URL, params)
+        return history.series_key(cache_key[1], cache_key[2], self.bot.config.CACHE_COORD_PRECISION)
+
+    def _location_params(self, location):
+        return {"lat": location.lat, "lon": location.lon, "appid": self.bot.config.OPENWEATHERMAP_API_KEY}
+
+    # queues samples from new air pollution responses for tracked locations
+    def _record_response(self, url, cache_key, data):
+        if url == self.bot.config.AIR_POLLUTION_CURRENT_API_URL:
+            samples = [data]
+        elif url == self.bot.config.AIR_POLLUTION_FORECAST_API_URL:
+            # only entries that already happened are history, the rest is still a forecast
+            now = time.time()
+            samples = [AirQualitySample.from_series(data, index) for index in range(len(data)) if data.timestamps[index] <= now]
+        else:
+            return
+        key = history.series_key(cache_key[1], cache_key[2], self.bot.config.CACHE_COORD_PRECISION)
+        if key not in self.tracked or not samples:
+            return
+        self.pending.extend((key, sample) for sample in samples)
+        if self.drain_task is None or self.drain_task.done():
+            self.drain_task = asyncio.ensure_future(self._drain_pending())
+
+    async def _drain_pending(self):
+        while self.pending:
+            batch, self.pending = self.pending, []
+            try:
+                await asyncio.to_thread(self._append_batch, batch)
+            except OSError as e:
+                print(f"Error writing AQI history to {self.store.directory}: {e}")
+
+    def _append_batch(self, batch):
+        for key, sample in batch:
+            self.store.append(key, sample)
+
+    # rebuilds the tracked locations from every guild's location
+    def _collect_tracked(self, locations: dict):
+        tracked = {}
+        offsets = {}
+        for location in locations.values():
+            params = self._location_params(location)
+            key = self._series_key(params)
+            if key not in tracked:
+                tracked[key] = params
+                offsets[key] = (location.lat, location.lon, utils.get_utc_offset(location.lat, location.lon, location))
+        return tracked, offsets
+
+    def _track_all(self, offsets: dict):
+        for key, (lat, lon, utc_offset) in offsets.items():
+            self.store.track(key, lat, lon, utc_offset)
+
+    @tasks.loop(seconds=config.HISTORY_RECORD_INTERVAL)
+    async def history_loop(self):
+        try:
+            await self._record_once()
+        except Exception as e:
+            # keep the loop alive, the next pass will try again
+            print(f"An unexpected error occurred while recording AQI history: {e}")
+
+    async def _record_once(self):
+        # guilds on other shard processes are only in the shared database
+        if self.bot.config.SHARD_PROCESSES > 1:
+            locations = await self.bot.location_store.load_all()
+        else:
+            locations = dict(self.bot.server_locations_cache)
+        tracked, offsets = self._collect_tracked(locations)
+        await asyncio.to_thread(self._track_all, offsets)
+        self.tracked = tracked
+
+        if self.bot.config.OPENWEATHERMAP_API_KEY and tracked:
+            semaphore = asyncio.Semaphore(max(1, self.bot.config.HISTORY_FETCH_CONCURRENCY))
+
+            async def fetch(key, params):
+                async with semaphore:
+                    # cache-first: a reading another command or the pre-warmer just loaded is recorded as is
+                    sample = await utils.make_api_request(self.bot.config.AIR_POLLUTION_CURRENT_API_URL, params)
+                if sample is not None:
+                    self.pending.append((key, sample))
+
+            await asyncio.gather(*(fetch(key, params) for key, params in tracked.items()))
+            await self._drain_pending()
+
+        retention_start = time.time() - self.bot.config.HISTORY_RAW_RETENTION_DAYS * 86400
+        await asyncio.to_thread(self.store.flush)
+        removed = await asyncio.to_thread(self.store.prune_raw, retention_start)
+        if removed:
+            print(f"Deleted {removed} expired AQI history segments.")
+
+    @history_loop.before_loop
+    async def before_history_loop(self):
+        await self.bot.wait_until_ready()
+
+    # reads the rollups for the last `days` local days of a series
+    def _read_history(self, key: str, days: int):
+        utc_offset = self.store.utc_offset(key)
+        today = ForecastSeries.day_number(time.time(), utc_offset)
+        first_day = today - days + 1
+        daily_rows = self.store.daily(key, first_day, today)
+        hourly_rows = self.store.hourly(
+            key, first_day * history.SECONDS_PER_DAY - utc_offset, (today + 1) * history.SECONDS_PER_DAY - utc_offset
+        )
+        return daily_rows, hourly_rows, first_day, today, utc_offset
+
+    # AQI HISTORY
+    @app_commands.command(name="aqi_history", description="Shows recorded air quality for this server's location.")
+    @app_commands.describe(days="How far back to look")
+    @app_commands.choices(days=[
+        app_commands.Choice(name="Last 7 days", value=7),
+        app_commands.Choice(name="Last 30 days", value=30),
+    ])
+    async def aqi_history_slash(self, interaction: discord.Interaction, days: app_commands.Choice[int] = None):
+        if not interaction.guild_id:
+            await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
+            return
+
+        location = self.bot.server_locations_cache.get(interaction.guild_id)
+        if not location:
+            await interaction.response.send_message("Please set a location for this server with /setlocation first.", ephemeral=True)
+            return
+        if not self.bot.config.HISTORY_ENABLED:
+            await interaction.response.send_message("Air quality history is not recorded on this bot.", ephemeral=True)
+            return
+
+        day_count = days.value if days is not None else 7
+        effective_display = location.display_name or f"Lat: {location.lat:.2f}, Lon: {location.lon:.2f}"
+        key = self._series_key(self._location_params(location))
+        daily_rows, hourly_rows, first_day, today, utc_offset = await asyncio.to_thread(self._read_history, key, day_count)
+        if not daily_rows:
+            await interaction.response.send_message(
+                f"No air quality history has been recorded for **{effective_display}** yet. Readings are recorded every hour.",
+                ephemeral=True
+            )
+            return
+
+        embed = render.aqi_history_embed(daily_rows, hourly_rows, effective_display, first_day, today, utc_offset)
+        await interaction.response.send_message(embed=embed)
+
+    @aqi_history_slash.error
+    async def aqi_history_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        print(f"An unexpected error occurred with /aqi_history: {error}")
+        if not interaction.response.is_done():
+            await interaction.response.send_message("An unexpected error occurred. Please try again later.", ephemeral=True)
+        else:
+            await interaction.followup.send("An unexpected error occurred. Please try again later.", ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(HistoryCog(bot))
+    print("HistoryCog loaded.")
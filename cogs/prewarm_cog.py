@@ -0,0 +1,108 @@
+# cogs/prewarm_cog.py
+from discord.ext import commands, tasks
+import asyncio
+import time
+
+import utils
+import config
+
+# PrewarmCog class
+class PrewarmCog(commands.Cog):
+    """
+    Keeps current weather / AQI for every guild's /setlocation location in the response cache,
+    so lookups for a server's default location are answered without waiting on the API.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.last_run_refreshed = 0
+        self.last_run_seconds = 0.0
+        if self.bot.config.PREWARM_ENABLED:
+            self.prewarm_loop.start()
+
+    def cog_unload(self):
+        self.prewarm_loop.cancel()
+
+    # collects one request per distinct (rounded) location and endpoint that expires before the next pass,
+    # soonest to expire first
+    def _collect_due_requests(self):
+        due_requests = []
+        seen_keys = set()
+        # entries refreshed by the previous pass still have TTL - PREWARM_INTERVAL left and wait for the next one
+        horizon = self.bot.config.PREWARM_INTERVAL
+        for guild_id, location in list(self.bot.server_locations_cache.items()):
+            # guilds on other shard processes are pre-warmed there (and shared through the shared cache)
+            if not self.bot.owns_guild(guild_id):
+                continue
+            params = {
+                "lat": location.lat,
+                "lon": location.lon,
+                "appid": self.bot.config.OPENWEATHERMAP_API_KEY
+            }
+            for url in self.bot.config.PREWARM_ENDPOINTS:
+                cache_key = utils.get_response_cache_key(url, params)
+                if cache_key is None or cache_key in seen_keys:
+                    continue
+                seen_keys.add(cache_key)
+                expires_in = utils.get_response_cache(url).expires_in(cache_key)
+                if expires_in is None or expires_in < horizon:
+                    due_requests.append((expires_in if expires_in is not None else float("-inf"), url, params))
+        due_requests.sort(key=lambda request: request[0])
+        return [(url, params) for _, url, params in due_requests]
+
+    # most calls a pass may make: PREWARM_RATE_SHARE of this process's rate over the window the pass is spread across
+    def _pass_budget(self):
+        calls_per_minute = utils.rate_limiter.rate * 60 * self.bot.config.PREWARM_RATE_SHARE
+        return max(1, int(calls_per_minute * self.bot.config.PREWARM_INTERVAL * 0.8 / 60))
+
+    @tasks.loop(seconds=config.PREWARM_INTERVAL)
+    async def prewarm_loop(self):
+        if not self.bot.config.OPENWEATHERMAP_API_KEY:
+            return
+        try:
+            await self._prewarm_once()
+        except Exception as e:
+            # keep the loop alive, the next pass will try again
+            print(f"An unexpected error occurred while pre-warming: {e}")
+
+    async def _prewarm_once(self):
+        started_at = time.monotonic()
+        # the remaining budget is kept for commands; cached data is served stale meanwhile
+        if utils.api_quota.is_nearly_exhausted():
+            print("Daily OpenWeatherMap quota nearly used up, skipping pre-warm pass.")
+            return
+        due_requests = self._collect_due_requests()
+        if not due_requests:
+            return
+        # whatever doesn't fit is due again next pass
+        due_requests = due_requests[:self._pass_budget()]
+
+        batch_size = max(1, self.bot.config.PREWARM_BATCH_SIZE)
+        batches = [due_requests[i:i + batch_size] for i in range(0, len(due_requests), batch_size)]
+        # spread batches over most of the interval so the API sees a steady request rate
+        spacing = self.bot.config.PREWARM_INTERVAL * 0.8 / len(batches)
+
+        refreshed = 0
+        for index, batch in enumerate(batches):
+            if utils.api_quota.is_nearly_exhausted():
+                print("Daily OpenWeatherMap quota nearly used up, stopping pre-warm pass.")
+                break
+            batch_started_at = time.monotonic()
+            await asyncio.gather(*(
+                utils.make_api_request(url, params, force_refresh=True) for url, params in batch
+            ))
+            refreshed += len(batch)
+            if index < len(batches) - 1:
+                await asyncio.sleep(max(0.0, spacing - (time.monotonic() - batch_started_at)))
+
+        self.last_run_refreshed = refreshed
+        self.last_run_seconds = time.monotonic() - started_at
+        print(f"Pre-warmed {self.last_run_refreshed} cache entries in {self.last_run_seconds:.1f}s.")
+
+    @prewarm_loop.before_loop
+    async def before_prewarm_loop(self):
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(PrewarmCog(bot))
+    print("PrewarmCog loaded.")
@@ -4,10 +4,11 @@ from discord import app_commands
 from discord.ext import commands
 from discord.app_commands import MissingPermissions
 from discord.app_commands.checks import has_permissions
-import datetime
+import time
 
 import utils 
 import config
+from models import GuildLocation
 
 # SettingsCog class
 class SettingsCog(commands.Cog):
@@ -17,6 +18,7 @@ class SettingsCog(commands.Cog):
     # SET SERVER LOCATION
     @app_commands.command(name="setlocation", description="Sets default location for this server.")
     @has_permissions(manage_guild=True)
+    @app_commands.autocomplete(city=utils.city_autocomplete)
     async def set_location_slash(self, interaction: discord.Interaction, city: str, state_code: str = None, country_code: str = None):
         if not interaction.guild_id:
             await interaction.response.send_message("This command can only be used in a server.", ephemeral=True)
@@ -34,14 +36,21 @@ class SettingsCog(commands.Cog):
             await interaction.followup.send(final_display_name_or_error, ephemeral=True)
             return
 
-        self.bot.server_locations_cache[interaction.guild_id] = {
-            "lat": lat,
-            "lon": lon,
-            "display_name": final_display_name_or_error, # final_display_name_or_error is display_name here
-            "set_by_user_id": interaction.user.id,
-            "set_at": datetime.datetime.now().isoformat()
-        }
-        utils.save_server_locations_to_file(self.bot.server_locations_cache, self.bot.config.LOCATIONS_FILE)
+        # current weather reports the location's UTC offset, used for forecast day boundaries
+        weather_params = {"lat": lat, "lon": lon, "appid": self.bot.config.OPENWEATHERMAP_API_KEY}
+        weather_data = await utils.make_api_request(self.bot.config.CURRENT_WEATHER_API_URL, weather_params)
+        utc_offset = weather_data.utc_offset if weather_data else None
+
+        self.bot.server_locations_cache[interaction.guild_id] = GuildLocation(
+            lat=lat,
+            lon=lon,
+            display_name=final_display_name_or_error, # final_display_name_or_error is display_name here
+            set_by_user_id=interaction.user.id,
+            set_at=time.time(),
+            utc_offset=utc_offset
+        )
+        # written to disk in the background
+        self.bot.location_writer.mark_dirty(interaction.guild_id)
 
         await interaction.followup.send(
             f"Default location for this server has been set to: {final_display_name_or_error} (Lat: {lat:.4f}, Lon: {lon:.4f})",
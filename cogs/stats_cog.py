@@ -0,0 +1,111 @@
+# cogs/stats_cog.py
+import discord
+from discord import app_commands
+from discord.ext import commands
+import math
+import time
+
+import metrics
+
+# StatsCog class
+class StatsCog(commands.Cog):
+    """
+    Owner-only summary of the metrics registry: command latency, API timings, cache hit rates and event loop lag.
+    The same numbers are exported at /metrics when METRICS_PORT is set.
+    """
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    # formats a duration in seconds as milliseconds
+    def _ms(self, seconds):
+        return f"{seconds * 1000:.0f}ms" if seconds is not None else "-"
+
+    # sums a counter per value of `label`, over the series where is_error(labels) is true
+    def _error_counts(self, counter_name: str, label: str, is_error):
+        errors = {}
+        for (name, labels), value in metrics.registry.counters.items():
+            label_values = dict(labels)
+            if name == counter_name and is_error(label_values):
+                errors[label_values.get(label)] = errors.get(label_values.get(label), 0) + value
+        return errors
+
+    # one line per label value of a histogram: count, p50, p95 and errors
+    def _histogram_lines(self, name: str, label: str, errors: dict):
+        lines = []
+        histograms = metrics.registry.histograms_named(name)
+        for labels, histogram in sorted(histograms.items(), key=lambda item: -item[1].count):
+            label_value = dict(labels).get(label, "?")
+            line = f"`{label_value}` {histogram.count}× · p50 {self._ms(histogram.quantile(0.5))} · p95 {self._ms(histogram.quantile(0.95))}"
+            if errors.get(label_value):
+                line += f" · {errors[label_value]:.0f} errors"
+            lines.append(line)
+        return lines
+
+    # joins lines into an embed field value, dropping lines past Discord's 1024 character limit
+    def _field_value(self, lines: list):
+        value = ""
+        for line in lines:
+            if len(value) + len(line) + 1 > 1024:
+                break
+            value += line + "\n"
+        return value or "No data yet."
+
+    # BOT STATS
+    @app_commands.command(name="botstats", description="Shows bot performance metrics (bot owner only).")
+    async def botstats_slash(self, interaction: discord.Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            await interaction.response.send_message("Only the bot owner can view bot stats.", ephemeral=True)
+            return
+
+        uptime = int(time.time() - metrics.registry.started_at)
+        gauges = {(name, labels): value for name, labels, value in metrics.registry.collect_gauges()}
+        latency = self.bot.latency
+
+        embed = discord.Embed(title="Bot Stats", color=discord.Color.blurple())
+        embed.add_field(name="Uptime", value=f"{uptime // 86400}d {uptime % 86400 // 3600}h {uptime % 3600 // 60}m", inline=True)
+        embed.add_field(name="Gateway Latency", value="-" if math.isnan(latency) else self._ms(latency), inline=True)
+        quota = gauges.get(("owm_quota_remaining", ()))
+        embed.add_field(name="API Quota Left", value=f"{quota:,}" if quota is not None else "-", inline=True)
+
+        embed.add_field(
+            name="Commands",
+            value=self._field_value(self._histogram_lines(
+                "bot_command_seconds", "command",
+                self._error_counts("bot_command_total", "command", lambda labels: labels.get("outcome") == "error")
+            )),
+            inline=False
+        )
+        embed.add_field(
+            name="OpenWeatherMap Requests",
+            value=self._field_value(self._histogram_lines(
+                "owm_request_seconds", "endpoint",
+                self._error_counts("owm_request_total", "endpoint", lambda labels: labels.get("status") != "200")
+            )),
+            inline=False
+        )
+
+        cache_lines = []
+        for cache_name in ("response", "forecast", "render"):
+            labels = (("cache", cache_name),)
+            hits = gauges.get(("cache_hits", labels))
+            if hits is None:
+                continue
+            hit_rate = gauges.get(("cache_hit_rate", labels), 0.0)
+            entries = gauges.get(("cache_entries", labels), 0)
+            cache_lines.append(f"`{cache_name}` {hit_rate:.0%} hit rate · {entries:,} entries")
+        embed.add_field(name="Caches", value=self._field_value(cache_lines), inline=False)
+
+        loop_lag = metrics.registry.histograms.get(("event_loop_lag_seconds", ()))
+        if loop_lag is not None:
+            embed.add_field(
+                name="Event Loop Lag",
+                value=f"p95 {self._ms(loop_lag.quantile(0.95))} · max {self._ms(loop_lag.max)}",
+                inline=False
+            )
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(StatsCog(bot))
+    print("StatsCog loaded.")
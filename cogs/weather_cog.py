@@ -2,10 +2,12 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import datetime
+import asyncio
+import time
 
 import utils
 import config
+import render
 
 class WeatherCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
@@ -38,99 +40,80 @@ class WeatherCog(commands.Cog):
                 if s_lat is not None and s_lon is not None:
                     target_lat = s_lat
                     target_lon = s_lon
+                    if not s_display_name:
+                        s_display_name = await utils.get_place_name(
+                            s_lat, s_lon,
+                            self.bot.config.OPENWEATHERMAP_API_KEY,
+                            self.bot.config.REVERSE_GEOCODING_API_URL
+                        )
                     effective_display = s_display_name if s_display_name else f"Lat: {s_lat:.2f}, Lon: {s_lon:.2f}"
                     full_location_desc = effective_display
             return target_lat, target_lon, effective_display, full_location_desc
 
+    # helper function to get the server's record when it is the location being shown
+    def _location_record(self, interaction: discord.Interaction, lat, lon):
+        if not interaction.guild_id:
+            return None
+        location_record = self.bot.server_locations_cache.get(interaction.guild_id)
+        # only use the server's stored offset when showing the server's own location
+        if location_record and (location_record.lat, location_record.lon) != (lat, lon):
+            return None
+        return location_record
+
+    # helper function to get the location's UTC offset
+    def _get_utc_offset(self, interaction: discord.Interaction, lat, lon):
+        """Returns the UTC offset (seconds) used for dates and forecast days at lat/lon."""
+        return utils.get_utc_offset(lat, lon, self._location_record(interaction, lat, lon))
+
+    # helper function to load the location's UTC offset alongside a request that doesn't carry one
+    async def _load_utc_offset(self, interaction: discord.Interaction, lat, lon):
+        """Returns the UTC offset (seconds) at lat/lon, loading current weather if nothing cached knows it."""
+        return await utils.load_utc_offset(lat, lon, self._location_record(interaction, lat, lon))
+
     # Fetches AQI info
     @app_commands.command(name="aqi_info", description="Displays the meaning of AQI numbers.")
     async def aqi_info_slash(self, interaction: discord.Interaction):
-        embed = discord.Embed(
-            title="Air Quality Index (AQI) Categories",
-            description="Understanding AQI values and their health implications.",
-            color=discord.Color.blue()
-        )
-        embed.add_field(name="1 - Good", value="Air quality is considered satisfactory, and air pollution poses little or no risk.", inline=False)
-        embed.add_field(name="2 - Fair", value="Air quality is acceptable; however, some pollutants may be a concern for a small number of people.", inline=False)
-        embed.add_field(name="3 - Moderate", value="Air quality is acceptable; however, some pollutants may be a concern for a small number of people.", inline=False)
-        embed.add_field(name="4 - Poor", value="Everyone may begin to experience health effects; members of sensitive groups may experience more serious health effects.", inline=False)
-        embed.add_field(name="5 - Very Poor", value="Everyone may begin to experience health effects; members of sensitive groups may experience more serious health effects.", inline=False)
-        embed.set_footer(text="Categories based on OpenWeatherMap AQI scale.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.response.send_message(embed=render.AQI_INFO_EMBED, ephemeral=True)
 
     # Fetches current AQI
     @app_commands.command(name="aqi_c", description="Fetches current air pollution.")
+    @app_commands.autocomplete(city=utils.city_autocomplete)
     async def aqi_slash_current(self, interaction: discord.Interaction, city: str = None, state_code: str = None, country_code: str = None):
+        started_at = time.monotonic()
         if not self.bot.config.OPENWEATHERMAP_API_KEY:
             await interaction.response.send_message("API key not configured.", ephemeral=True)
             return
 
-        target_lat, target_lon, effective_display, full_location_desc_or_error = await self._get_effective_location(
-            interaction, city, state_code, country_code
+        target_lat, target_lon, effective_display, full_location_desc_or_error = await utils.await_or_defer(
+            interaction, started_at, self._get_effective_location(interaction, city, state_code, country_code)
         )
 
         if target_lat is None or target_lon is None: # Error occurred in _get_effective_location
-            await interaction.response.send_message(full_location_desc_or_error, ephemeral=True)
+            await utils.send_interaction_response(interaction, full_location_desc_or_error, ephemeral=True)
             return
 
-        await interaction.response.send_message(f"Fetching current air pollution data for **{full_location_desc_or_error}**...", ephemeral=False)
-
         aqi_params = {"lat": target_lat, "lon": target_lon, "appid": self.bot.config.OPENWEATHERMAP_API_KEY}
-        aqi_data = await utils.make_api_request(self.bot.config.AIR_POLLUTION_CURRENT_API_URL, aqi_params)
-
-        if aqi_data and "list" in aqi_data and aqi_data["list"]:
-            current_entry = aqi_data["list"][0]
-            aqi_index = current_entry.get("main", {}).get("aqi", "N/A")
-            components = current_entry.get("components", {})
-            dt_timestamp = current_entry.get("dt")
-
-            current_date_str = "N/A"
-            if dt_timestamp:
-                local_datetime = datetime.datetime.fromtimestamp(dt_timestamp, tz=datetime.timezone.utc).astimezone()
-                current_date_str = local_datetime.strftime('%B %d, %Y')
-
-            aqi_category = utils.get_aqi_category(aqi_index)
-            
-            embed_color = discord.Color.blue()
-            if isinstance(aqi_index, int):
-                colors = {1: discord.Color.green(), 2: discord.Color.yellow(), 3: discord.Color.orange(), 4: discord.Color.red(), 5: discord.Color.purple()}
-                embed_color = colors.get(aqi_index, discord.Color.blue())
-
-            embed = discord.Embed(
-                title=f"Current Air Pollution for {effective_display}",
-                description=f"Air Quality Index for Today ({current_date_str})",
-                color=embed_color
-            )
-            embed.set_footer(text="Air quality data provided by OpenWeatherMap")
-            embed.add_field(name="💨 Air Quality Index (AQI)", value=f"{aqi_index} - {aqi_category}", inline=False)
-
-            components_text_parts = []
-            pollutants_map = {
-                "co": {"name": "CO", "unit": "µg/m³"}, "no": {"name": "NO", "unit": "µg/m³"},
-                "no2": {"name": "NO₂", "unit": "µg/m³"}, "o3": {"name": "O₃", "unit": "µg/m³"},
-                "so2": {"name": "SO₂", "unit": "µg/m³"}, "pm2_5": {"name": "PM₂.₅", "unit": "µg/m³"},
-                "pm10": {"name": "PM₁₀", "unit": "µg/m³"}, "nh3": {"name": "NH₃", "unit": "µg/m³"}
-            }
-            for key, details in pollutants_map.items():
-                value = components.get(key)
-                if value is not None:
-                    components_text_parts.append(f"**{details['name']}**: {value:.2f} {details['unit']}")
-            
-            if components_text_parts:
-                embed.add_field(name="🧪 Pollutant Components", value="\n".join(components_text_parts), inline=False)
-            else:
-                embed.add_field(name="🧪 Pollutant Components", value="No specific component data available.", inline=False)
-            await interaction.edit_original_response(content=None, embed=embed)
+        # air pollution responses have no timezone, so the location's offset is loaded at the same time
+        aqi_data, utc_offset = await utils.await_or_defer(interaction, started_at, asyncio.gather(
+            utils.make_api_request(self.bot.config.AIR_POLLUTION_CURRENT_API_URL, aqi_params),
+            self._load_utc_offset(interaction, target_lat, target_lon)
+        ))
+
+        if aqi_data:
+            embed = render.current_aqi_embed(aqi_data, effective_display, utc_offset)
+            await utils.send_interaction_response(interaction, embed=embed)
         else:
-            await interaction.edit_original_response(content=f"Could not retrieve current AQI for **{effective_display}**.", embed=None)
+            await utils.send_interaction_response(interaction, f"Could not retrieve current AQI for **{effective_display}**.")
 
     # fetch AQI forecast
     @app_commands.command(name="aqi_f", description="Fetches air pollution forecast.")
+    @app_commands.autocomplete(city=utils.city_autocomplete)
     async def aqi_slash_forecast(self, interaction: discord.Interaction, city: str = None, state_code: str = None, country_code: str = None):
         """
         Fetches and displays air pollution forecast.
         Uses server-specific location if set, then global default, or provided location.
         """
+        started_at = time.monotonic()
         if not self.bot.config.OPENWEATHERMAP_API_KEY:
             await interaction.response.send_message(
                 "Sorry, the API key for OpenWeatherMap air quality data is not configured. Please contact the bot administrator.",
@@ -138,117 +121,46 @@ class WeatherCog(commands.Cog):
             )
             return
 
-        target_lat, target_lon, effective_display, full_location_desc_or_error = await self._get_effective_location(
-            interaction, city, state_code, country_code
+        target_lat, target_lon, effective_display, full_location_desc_or_error = await utils.await_or_defer(
+            interaction, started_at, self._get_effective_location(interaction, city, state_code, country_code)
         )
 
         if target_lat is None or target_lon is None: 
-            await interaction.response.send_message(full_location_desc_or_error, ephemeral=True)
+            await utils.send_interaction_response(interaction, full_location_desc_or_error, ephemeral=True)
             return
 
-        await interaction.response.send_message(f"Fetching air pollution forecast for **{full_location_desc_or_error}**...", ephemeral=False)
-
         aqi_params = {
             "lat": target_lat,
             "lon": target_lon,
             "appid": self.bot.config.OPENWEATHERMAP_API_KEY
         }
 
-        aqi_data = await utils.make_api_request(self.bot.config.AIR_POLLUTION_FORECAST_API_URL, aqi_params)
-
-        if aqi_data and "list" in aqi_data and aqi_data["list"]:
-            selected_forecast_entry = None
-            now_local = datetime.datetime.now().astimezone()
-            tomorrow_local_date = (now_local + datetime.timedelta(days=1)).date()
-
-            # iterate through forecast entries
-            for entry in aqi_data["list"]:
-                dt_timestamp = entry.get("dt")
-                if dt_timestamp:
-                    # convert Unix timestamp to a timezone-aware datetime object in UTC, then to local timezone
-                    entry_local_datetime = datetime.datetime.fromtimestamp(dt_timestamp, tz=datetime.timezone.utc).astimezone(now_local.tzinfo)
-                    if entry_local_datetime.date() == tomorrow_local_date:
-                        # if it's the first entry for tomorrow or closer to noon than a previously selected one
-                        if selected_forecast_entry is None or \
-                           abs(entry_local_datetime.hour - 12) < \
-                           abs(datetime.datetime.fromtimestamp(selected_forecast_entry.get("dt"), tz=datetime.timezone.utc).astimezone(now_local.tzinfo).hour - 12):
-                            selected_forecast_entry = entry
-            
-            # if no entry found for tomorrow, find the next available future entry
-            if not selected_forecast_entry:
-                now_ts = datetime.datetime.now(datetime.timezone.utc).timestamp()
-                future_entries = [e for e in aqi_data["list"] if e.get("dt", 0) > now_ts]
-                if future_entries:
-                    selected_forecast_entry = future_entries[0] 
-
-            if not selected_forecast_entry:
-                await interaction.edit_original_response(content=f"Could not find a suitable air quality forecast for **{effective_display}** in the API response.")
-                return
-
-            aqi_index = selected_forecast_entry.get("main", {}).get("aqi", "N/A")
-            components = selected_forecast_entry.get("components", {})
-            dt_timestamp = selected_forecast_entry.get("dt")
-
-            forecast_date_str = "N/A"
-            if dt_timestamp:
-                # Convert to local time for display
-                utc_datetime = datetime.datetime.fromtimestamp(dt_timestamp, tz=datetime.timezone.utc)
-                local_datetime_display = utc_datetime.astimezone(now_local.tzinfo) 
-                forecast_date_str = local_datetime_display.strftime('%B %d, %Y at %I:%M %p %Z')
+        # forecast days follow the location's local dates, and air pollution responses have no timezone
+        aqi_data, utc_offset = await utils.await_or_defer(interaction, started_at, asyncio.gather(
+            utils.make_api_request(self.bot.config.AIR_POLLUTION_FORECAST_API_URL, aqi_params),
+            self._load_utc_offset(interaction, target_lat, target_lon)
+        ))
 
-            aqi_category = utils.get_aqi_category(aqi_index)
-            
-            embed_color = discord.Color.blue()
-            if isinstance(aqi_index, int):
-                colors = {1: discord.Color.green(), 2: discord.Color.yellow(), 3: discord.Color.orange(), 4: discord.Color.red(), 5: discord.Color.purple()}
-                embed_color = colors.get(aqi_index, discord.Color.blue())
-
-            embed = discord.Embed(
-                title=f"Air Pollution Forecast for {effective_display}",
-                description=f"Forecast for: {forecast_date_str}",
-                color=embed_color
-            )
-            embed.set_footer(text="Air quality data provided by OpenWeatherMap")
-            embed.add_field(name="💨 Air Quality Index (AQI)", value=f"{aqi_index} - {aqi_category}", inline=False)
-
-            components_text_parts = []
-            # Using the same pollutant map as aqi_c for consistency
-            pollutants_map = {
-                "co": {"name": "CO (Carbon Monoxide)", "unit": "µg/m³"},
-                "no": {"name": "NO (Nitrogen Monoxide)", "unit": "µg/m³"},
-                "no2": {"name": "NO₂ (Nitrogen Dioxide)", "unit": "µg/m³"},
-                "o3": {"name": "O₃ (Ozone)", "unit": "µg/m³"},
-                "so2": {"name": "SO₂ (Sulphur Dioxide)", "unit": "µg/m³"},
-                "pm2_5": {"name": "PM₂.₅ (Fine Particles)", "unit": "µg/m³"},
-                "pm10": {"name": "PM₁₀ (Coarse Particles)", "unit": "µg/m³"},
-                "nh3": {"name": "NH₃ (Ammonia)", "unit": "µg/m³"}
-            }
-            for key, details in pollutants_map.items():
-                value = components.get(key)
-                if value is not None:
-                    components_text_parts.append(f"**{details['name']}**: {value:.2f} {details['unit']}")
-            
-            if components_text_parts:
-                embed.add_field(name="🧪 Pollutant Components", value="\n".join(components_text_parts), inline=False)
-            else:
-                embed.add_field(name="🧪 Pollutant Components", value="No specific component data available.", inline=False)
-
-            await interaction.edit_original_response(content=None, embed=embed)
+        if aqi_data:
+            embed = render.aqi_forecast_embed(aqi_data, effective_display, utc_offset)
+            if embed is None:
+                await utils.send_interaction_response(interaction, f"Could not find a suitable air quality forecast for **{effective_display}** in the API response.")
+                return
+            await utils.send_interaction_response(interaction, embed=embed)
         else:
             error_message_content = f"Could not retrieve air quality forecast for **{effective_display}**."
-            if aqi_data and "message" in aqi_data:
-                error_message_content += f" API Message: {aqi_data['message']}"
-            else:
-                error_message_content += " Please check bot logs for more details or try again later."
-            await interaction.edit_original_response(content=error_message_content, embed=None)
+            error_message_content += " Please check bot logs for more details or try again later."
+            await utils.send_interaction_response(interaction, error_message_content)
 
 
     @app_commands.command(name="weather", description="Fetches current weather.")
+    @app_commands.autocomplete(city=utils.city_autocomplete)
     async def weather_slash(self, interaction: discord.Interaction, city: str = None, state_code: str = None, country_code: str = None):
         """
         Fetches and displays current weather.
         Uses server-specific location if set, then global default, or provided location.
         """
+        started_at = time.monotonic()
         if not self.bot.config.OPENWEATHERMAP_API_KEY:
             await interaction.response.send_message(
                 "Sorry, the API key for OpenWeatherMap weather data is not configured. Please contact the bot administrator.",
@@ -256,116 +168,34 @@ class WeatherCog(commands.Cog):
             )
             return
 
-        target_lat, target_lon, effective_display, full_location_desc_or_error = await self._get_effective_location(
-            interaction, city, state_code, country_code
+        target_lat, target_lon, effective_display, full_location_desc_or_error = await utils.await_or_defer(
+            interaction, started_at, self._get_effective_location(interaction, city, state_code, country_code)
         )
 
         if target_lat is None or target_lon is None: # Error occurred in _get_effective_location
-            await interaction.response.send_message(full_location_desc_or_error, ephemeral=True)
+            await utils.send_interaction_response(interaction, full_location_desc_or_error, ephemeral=True)
             return
 
-        await interaction.response.send_message(f"Fetching current weather data for **{full_location_desc_or_error}**...", ephemeral=False)
-
         weather_params = {
             "lat": target_lat,
             "lon": target_lon,
             "appid": self.bot.config.OPENWEATHERMAP_API_KEY
         }
 
-        weather_data = await utils.make_api_request(self.bot.config.CURRENT_WEATHER_API_URL, weather_params)
+        weather_data = await utils.await_or_defer(interaction, started_at, utils.make_api_request(self.bot.config.CURRENT_WEATHER_API_URL, weather_params))
 
-        if weather_data and "main" in weather_data and "weather" in weather_data and weather_data["weather"]:
-            main_data = weather_data["main"]
-            weather_description_data = weather_data["weather"][0]
-            
-            description = weather_description_data.get("description", "N/A").capitalize()
-            icon_code = weather_description_data.get("icon")
-            icon_url = f"http://openweathermap.org/img/wn/{icon_code}@2x.png" if icon_code else None
-
-            temp_kelvin = main_data.get("temp", "N/A")
-            feels_like_kelvin = main_data.get("feels_like", "N/A")
-            humidity = main_data.get("humidity", "N/A")
-            pressure = main_data.get("pressure", "N/A") # hPa
-            wind_speed = weather_data.get("wind", {}).get("speed", "N/A") # m/s
-            visibility = weather_data.get("visibility", "N/A") # meters
-
-            dt_timestamp = weather_data.get("dt")
-            current_date_str = "N/A"
-            if dt_timestamp:
-                # Convert to local time for display
-                now_local = datetime.datetime.now().astimezone() # Get current local timezone
-                utc_datetime = datetime.datetime.fromtimestamp(dt_timestamp, tz=datetime.timezone.utc)
-                local_datetime_display = utc_datetime.astimezone(now_local.tzinfo)
-                current_date_str = local_datetime_display.strftime('%B %d, %Y at %I:%M %p %Z')
-
-            # convert Kelvin to Celsius and Fahrenheit for user convenience
-            temp_celsius, temp_fahrenheit = "N/A", "N/A"
-            if isinstance(temp_kelvin, (int, float)):
-                temp_celsius = temp_kelvin - 273.15
-                temp_fahrenheit = temp_celsius * 9/5 + 32
-            
-            feels_like_celsius, feels_like_fahrenheit = "N/A", "N/A"
-            if isinstance(feels_like_kelvin, (int, float)):
-                feels_like_celsius = feels_like_kelvin - 273.15
-                feels_like_fahrenheit = feels_like_celsius * 9/5 + 32
-
-            embed_color = discord.Color.blue()
-            # color based on weather condition
-            if isinstance(description, str):
-                weather_conditions = {
-                    "clear sky": discord.Color.from_rgb(135, 206, 235), # Sky blue
-                    "few clouds": discord.Color.from_rgb(173, 216, 230), # Light blue
-                    "scattered clouds": discord.Color.from_rgb(211, 211, 211), # Light gray
-                    "broken clouds": discord.Color.from_rgb(169, 169, 169), # Dark gray
-                    "shower rain": discord.Color.from_rgb(0, 191, 255), # Deep sky blue
-                    "rain": discord.Color.from_rgb(30, 144, 255), # Dodger blue
-                    "thunderstorm": discord.Color.from_rgb(255, 140, 0), # Dark orange
-                    "snow": discord.Color.from_rgb(240, 248, 255), # Alice blue
-                    "mist": discord.Color.from_rgb(192, 192, 192), # Silver
-                }
-                embed_color = weather_conditions.get(description.lower(), discord.Color.blue())
-
-            embed = discord.Embed(
-                title=f"Current Weather for {effective_display}",
-                description=f"*{description}*",            
-                color=embed_color
-            )
-            if icon_url:
-                embed.set_thumbnail(url=icon_url)
-            
-            embed.add_field(name="🌡️ Temperature", 
-                            value=(f"{temp_celsius:.1f}°C / {temp_fahrenheit:.1f}°F\n"
-                                   f"(Feels like: {feels_like_celsius:.1f}°C / {feels_like_fahrenheit:.1f}°F)" 
-                                   if isinstance(temp_celsius, float) else "N/A"), 
-                            inline=False)
-            embed.add_field(name="💧 Humidity", value=f"{humidity}%" if humidity != "N/A" else "N/A", inline=True)
-            embed.add_field(name="🌬️ Wind", value=f"{wind_speed} m/s" if wind_speed != "N/A" else "N/A", inline=True)
-            embed.add_field(name="📊 Pressure", value=f"{pressure} hPa" if pressure != "N/A" else "N/A", inline=True)
-            if visibility != "N/A":
-                 embed.add_field(name="👁️ Visibility", value=f"{visibility/1000:.1f} km" if isinstance(visibility, (int,float)) else "N/A", inline=True)
-
-            if "sunrise" in weather_data.get("sys", {}) and "sunset" in weather_data.get("sys", {}):
-                sunrise_ts = weather_data["sys"]["sunrise"]
-                sunset_ts = weather_data["sys"]["sunset"]
-                now_local = datetime.datetime.now().astimezone() 
-                sunrise_local = datetime.datetime.fromtimestamp(sunrise_ts, tz=datetime.timezone.utc).astimezone(now_local.tzinfo)
-                sunset_local = datetime.datetime.fromtimestamp(sunset_ts, tz=datetime.timezone.utc).astimezone(now_local.tzinfo)
-                embed.add_field(name="☀️ Sunrise", value=sunrise_local.strftime('%I:%M %p %Z'), inline=True)
-                embed.add_field(name="🌙 Sunset", value=sunset_local.strftime('%I:%M %p %Z'), inline=True)
-
-            embed.set_footer(text=f"Data observed around: {current_date_str}\nWeather data provided by OpenWeatherMap")
-            
-            await interaction.edit_original_response(content=None, embed=embed)
+        if weather_data:
+            embed = render.current_weather_embed(weather_data, effective_display, self._get_utc_offset(interaction, target_lat, target_lon))
+            await utils.send_interaction_response(interaction, embed=embed)
         else:
             error_message_content = f"Could not retrieve current weather data for **{effective_display}**."
-            if weather_data and "message" in weather_data:
-                error_message_content += f" API Message: {weather_data['message']}"
-            else:
-                error_message_content += " Please check bot logs for more details or try again later."
-            await interaction.edit_original_response(content=error_message_content, embed=None)
+            error_message_content += " Please check bot logs for more details or try again later."
+            await utils.send_interaction_response(interaction, error_message_content)
 
     @app_commands.command(name="weather_f", description="Fetches weather forecast (e.g., for tomorrow).")
+    @app_commands.autocomplete(city=utils.city_autocomplete)
     async def weather_forecast_slash(self, interaction: discord.Interaction, city: str = None, state_code: str = None, country_code: str = None):
+        started_at = time.monotonic()
         if not self.bot.config.OPENWEATHERMAP_API_KEY:
             await interaction.response.send_message(
                 "Sorry, the API key for OpenWeatherMap weather data is not configured. Please contact the bot administrator.",
@@ -373,143 +203,103 @@ class WeatherCog(commands.Cog):
             )
             return
 
-        target_lat, target_lon, effective_display, full_location_desc_or_error = await self._get_effective_location(
-            interaction, city, state_code, country_code
+        target_lat, target_lon, effective_display, full_location_desc_or_error = await utils.await_or_defer(
+            interaction, started_at, self._get_effective_location(interaction, city, state_code, country_code)
         )
 
         if target_lat is None or target_lon is None:
-            await interaction.response.send_message(full_location_desc_or_error, ephemeral=True)
+            await utils.send_interaction_response(interaction, full_location_desc_or_error, ephemeral=True)
             return
 
-        await interaction.response.send_message(f"Fetching weather forecast for **{full_location_desc_or_error}**...", ephemeral=False)
-
         weather_params = {
             "lat": target_lat,
             "lon": target_lon,
             "appid": self.bot.config.OPENWEATHERMAP_API_KEY
         }
 
-        forecast_response = await utils.make_api_request(self.bot.config.WEATHER_FORECAST_API_URL, weather_params)
+        forecast_response = await utils.await_or_defer(interaction, started_at, utils.make_api_request(self.bot.config.WEATHER_FORECAST_API_URL, weather_params))
 
-        if forecast_response and "list" in forecast_response and forecast_response["list"]:
-            now_local = datetime.datetime.now().astimezone()
-            tomorrow_local_date = (now_local + datetime.timedelta(days=1)).date()
-            
-            selected_forecast_entry = None
-            
-            for entry in forecast_response["list"]:
-                dt_timestamp = entry.get("dt")
-                if dt_timestamp:
-                    entry_datetime_utc = datetime.datetime.fromtimestamp(dt_timestamp, tz=datetime.timezone.utc)
-                    entry_datetime_local = entry_datetime_utc.astimezone(now_local.tzinfo)
-
-                    if entry_datetime_local.date() == tomorrow_local_date:
-                        if selected_forecast_entry is None: 
-                            selected_forecast_entry = entry
-                        else:
-                            current_selected_dt_local = datetime.datetime.fromtimestamp(
-                                selected_forecast_entry.get("dt"), tz=datetime.timezone.utc
-                            ).astimezone(now_local.tzinfo)
-                            if abs(entry_datetime_local.hour - 12) < abs(current_selected_dt_local.hour - 12):
-                                selected_forecast_entry = entry
-            
-            if not selected_forecast_entry:
-                for entry in forecast_response["list"]:
-                    dt_timestamp = entry.get("dt")
-                    if dt_timestamp:
-                        entry_datetime_utc = datetime.datetime.fromtimestamp(dt_timestamp, tz=datetime.timezone.utc)
-                        entry_datetime_local = entry_datetime_utc.astimezone(now_local.tzinfo)
-                        if entry_datetime_local.date() == tomorrow_local_date:
-                            selected_forecast_entry = entry
-                            break 
-            
-            if not selected_forecast_entry:
-                now_ts_utc = datetime.datetime.now(datetime.timezone.utc).timestamp()
-                future_entries = [e for e in forecast_response["list"] if e.get("dt", 0) > now_ts_utc]
-                if future_entries:
-                    selected_forecast_entry = future_entries[0]
-
-            if not selected_forecast_entry:
-                await interaction.edit_original_response(content=f"Could not find a suitable weather forecast entry for **{effective_display}** in the API response.")
+        if forecast_response:
+            embed = render.weather_forecast_embed(forecast_response, effective_display, self._get_utc_offset(interaction, target_lat, target_lon))
+            if embed is None:
+                await utils.send_interaction_response(interaction, f"Could not find a suitable weather forecast entry for **{effective_display}** in the API response.")
                 return
+            await utils.send_interaction_response(interaction, embed=embed)
+        else:
+            error_message_content = f"Could not retrieve weather forecast for **{effective_display}**."
+            error_message_content += " Please check bot logs for more details or try again later."
+            await utils.send_interaction_response(interaction, error_message_content)
 
-            main_data = selected_forecast_entry.get("main", {})
-            weather_list = selected_forecast_entry.get("weather", [])
-            weather_description_data = weather_list[0] if weather_list else {}
-            
-            wind_data = selected_forecast_entry.get("wind", {})
-            visibility_meters = selected_forecast_entry.get("visibility") 
-
-            description = weather_description_data.get("description", "N/A").capitalize()
-            icon_code = weather_description_data.get("icon")
-            icon_url = f"http://openweathermap.org/img/wn/{icon_code}@2x.png" if icon_code else None
-
-            temp_kelvin = main_data.get("temp")
-            feels_like_kelvin = main_data.get("feels_like")
-            humidity = main_data.get("humidity")
-            pressure = main_data.get("pressure")
-            wind_speed = wind_data.get("speed")
-
-            dt_timestamp = selected_forecast_entry.get("dt")
-            forecast_date_str = "N/A"
-            if dt_timestamp:
-                utc_datetime = datetime.datetime.fromtimestamp(dt_timestamp, tz=datetime.timezone.utc)
-                local_datetime_display = utc_datetime.astimezone(now_local.tzinfo)
-                forecast_date_str = local_datetime_display.strftime('%B %d, %Y at %I:%M %p %Z')
-            
-            temp_celsius, temp_fahrenheit = "N/A", "N/A"
-            if temp_kelvin is not None:
-                temp_celsius = temp_kelvin - 273.15
-                temp_fahrenheit = temp_celsius * 9/5 + 32
-            
-            feels_like_celsius, feels_like_fahrenheit = "N/A", "N/A"
-            if feels_like_kelvin is not None:
-                feels_like_celsius = feels_like_kelvin - 273.15
-                feels_like_fahrenheit = feels_like_celsius * 9/5 + 32
-
-            embed_color = discord.Color.blue()
-            if isinstance(description, str): 
-                weather_conditions = {
-                    "clear sky": discord.Color.from_rgb(135, 206, 235), "few clouds": discord.Color.from_rgb(173, 216, 230),
-                    "scattered clouds": discord.Color.from_rgb(211, 211, 211), "broken clouds": discord.Color.from_rgb(169, 169, 169),
-                    "shower rain": discord.Color.from_rgb(0, 191, 255), "rain": discord.Color.from_rgb(30, 144, 255),
-                    "thunderstorm": discord.Color.from_rgb(255, 140, 0), "snow": discord.Color.from_rgb(240, 248, 255),
-                    "mist": discord.Color.from_rgb(192, 192, 192),
-                }
-                embed_color = weather_conditions.get(description.lower(), discord.Color.blue())
-                    
-            embed = discord.Embed(
-                title=f"Weather Forecast for {effective_display}",
-                description=f"*{description}*",            
-                color=embed_color
+    # weather + AQI overview
+    @app_commands.command(name="dashboard", description="Fetches current weather, current AQI and both forecasts at once.")
+    @app_commands.autocomplete(city=utils.city_autocomplete)
+    async def dashboard_slash(self, interaction: discord.Interaction, city: str = None, state_code: str = None, country_code: str = None):
+        """
+        Resolves the location once and fetches all four data sets concurrently,
+        then shows them together as one multi-embed message.
+        """
+        started_at = time.monotonic()
+        if not self.bot.config.OPENWEATHERMAP_API_KEY:
+            await interaction.response.send_message(
+                "Sorry, the API key for OpenWeatherMap is not configured. Please contact the bot administrator.",
+                ephemeral=True
             )
-            if icon_url:
-                embed.set_thumbnail(url=icon_url)
-            
-            temp_display_value = "N/A"
-            if isinstance(temp_celsius, float):
-                temp_display_value = f"{temp_celsius:.1f}°C / {temp_fahrenheit:.1f}°F"
-                if isinstance(feels_like_celsius, float):
-                     temp_display_value += f"\n(Feels like: {feels_like_celsius:.1f}°C / {feels_like_fahrenheit:.1f}°F)"
-
-            embed.add_field(name="🌡️ Temperature", value=temp_display_value, inline=False)
-            embed.add_field(name="💧 Humidity", value=f"{humidity}%" if humidity is not None else "N/A", inline=True)
-            embed.add_field(name="🌬️ Wind", value=f"{wind_speed} m/s" if wind_speed is not None else "N/A", inline=True)
-            embed.add_field(name="📊 Pressure", value=f"{pressure} hPa" if pressure is not None else "N/A", inline=True)
-
-            embed.set_footer(text=f"Forecast for: {forecast_date_str}\nWeather data provided by OpenWeatherMap")
-                
-            await interaction.edit_original_response(content=None, embed=embed)
+            return
+
+        target_lat, target_lon, effective_display, full_location_desc_or_error = await utils.await_or_defer(
+            interaction, started_at, self._get_effective_location(interaction, city, state_code, country_code)
+        )
+
+        if target_lat is None or target_lon is None:
+            await utils.send_interaction_response(interaction, full_location_desc_or_error, ephemeral=True)
+            return
+
+        params = {
+            "lat": target_lat,
+            "lon": target_lon,
+            "appid": self.bot.config.OPENWEATHERMAP_API_KEY
+        }
+        weather_data, aqi_data, weather_forecast_data, aqi_forecast_data = await utils.await_or_defer(interaction, started_at, asyncio.gather(
+            utils.make_api_request(self.bot.config.CURRENT_WEATHER_API_URL, params),
+            utils.make_api_request(self.bot.config.AIR_POLLUTION_CURRENT_API_URL, params),
+            utils.make_api_request(self.bot.config.WEATHER_FORECAST_API_URL, params),
+            utils.make_api_request(self.bot.config.AIR_POLLUTION_FORECAST_API_URL, params)
+        ))
+
+        utc_offset = self._get_utc_offset(interaction, target_lat, target_lon)
+        embeds = []
+        missing = []
+        if weather_data:
+            embeds.append(render.current_weather_embed(weather_data, effective_display, utc_offset))
         else:
-            error_message_content = f"Could not retrieve weather forecast for **{effective_display}**."
-            if forecast_response and "message" in forecast_response:
-                api_msg = forecast_response['message']
-                error_message_content += f" API Message: {str(api_msg)}" 
-            elif forecast_response and "cod" in forecast_response: 
-                 error_message_content += f" API Code: {forecast_response['cod']}"
-            else:
-                error_message_content += " No detailed API message or unexpected response structure. Please check bot logs."
-            await interaction.edit_original_response(content=error_message_content, embed=None)
+            missing.append("current weather")
+        if aqi_data:
+            embeds.append(render.current_aqi_embed(aqi_data, effective_display, utc_offset))
+        else:
+            missing.append("current AQI")
+
+        weather_forecast_embed = None
+        if weather_forecast_data:
+            weather_forecast_embed = render.weather_forecast_embed(weather_forecast_data, effective_display, utc_offset)
+        if weather_forecast_embed:
+            embeds.append(weather_forecast_embed)
+        else:
+            missing.append("weather forecast")
+
+        aqi_forecast_embed = None
+        if aqi_forecast_data:
+            aqi_forecast_embed = render.aqi_forecast_embed(aqi_forecast_data, effective_display, utc_offset)
+        if aqi_forecast_embed:
+            embeds.append(aqi_forecast_embed)
+        else:
+            missing.append("AQI forecast")
+
+        if not embeds:
+            await utils.send_interaction_response(interaction, f"Could not retrieve weather or air quality data for **{effective_display}**.")
+            return
+
+        content = f"Could not retrieve {', '.join(missing)} for **{effective_display}**." if missing else None
+        await utils.send_interaction_response(interaction, content, embeds=embeds)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(WeatherCog(bot))
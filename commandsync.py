@@ -0,0 +1,62 @@
+# APP COMMAND SYNC STATE
+# Imports
+import asyncio
+import hashlib
+import json
+import os
+
+
+# HASHES THE COMMAND TREE
+def command_tree_hash(tree, guild=None):
+    """
+    SHA-256 of the payload tree.sync(guild=guild) would upload.
+    Commands are sorted by type and name so the hash doesn't depend on the order cogs were loaded in.
+    """
+    payload = sorted(
+        (command.to_dict(tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+# GETS SYNC TARGET KEY
+def sync_target(application_id: int, guild=None):
+    """Key a hash is stored under: one per application and per guild (or "global")."""
+    return f"{application_id}:{guild.id if guild is not None else 'global'}"
+
+
+# COMMAND SYNC STATE
+class CommandSyncState:
+    """Remembers the hash of the last successfully synced command tree for each sync target."""
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.hashes = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.file_path, 'r') as file:
+                data = json.load(file)
+            self.hashes = {str(target): str(tree_hash) for target, tree_hash in data.items()}
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, ValueError, AttributeError):
+            print(f"Error reading command sync file {self.file_path}. Commands will be synced.")
+
+    def _write(self, data):
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(data, file, indent=2)
+        os.replace(temp_path, self.file_path)
+
+    def is_current(self, target: str, tree_hash: str):
+        return self.hashes.get(target) == tree_hash
+
+    async def save(self, target: str, tree_hash: str):
+        """Records a successful sync and writes the file off the event loop."""
+        self.hashes[target] = tree_hash
+        try:
+            await asyncio.to_thread(self._write, dict(self.hashes))
+        except OSError as e:
+            print(f"Error saving command sync state to {self.file_path}: {e}")
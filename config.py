@@ -24,5 +24,128 @@ GEOCODING_API_URL = os.getenv('DIRECT_GEOCODING_API_URL', "http://api.openweathe
 CURRENT_WEATHER_API_URL = os.getenv('WEATHER_API_URL', "http://api.openweathermap.org/data/2.5/weather")
 WEATHER_FORECAST_API_URL = os.getenv('WEATHER_FORECAST_API_URL', "http://api.openweathermap.org/data/2.5/forecast") 
 
+# HTTP client settings (shared aiohttp session)
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', "10"))
+HTTP_POOL_LIMIT = int(os.getenv('HTTP_POOL_LIMIT', "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv('HTTP_POOL_LIMIT_PER_HOST', "20"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', "30"))
+
+# Response cache settings
+# coordinates are rounded to this many decimals when building cache keys (2 decimals is roughly 1 km)
+CACHE_COORD_PRECISION = int(os.getenv('CACHE_COORD_PRECISION', "2"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', "5000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# forecasts get their own budget so they never push current readings out (an AQI forecast is ~4 KB per location)
+FORECAST_CACHE_MAX_ENTRIES = int(os.getenv('FORECAST_CACHE_MAX_ENTRIES', "20000"))
+FORECAST_CACHE_MAX_BYTES = int(os.getenv('FORECAST_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# rendered embeds kept for reuse while their cached response is unchanged
+RENDER_CACHE_MAX_ENTRIES = int(os.getenv('RENDER_CACHE_MAX_ENTRIES', "2000"))
+RENDER_CACHE_TTL = int(os.getenv('RENDER_CACHE_TTL', "3600"))
+# seconds each endpoint's responses stay fresh; endpoints not listed here are not cached
+CACHE_TTLS = {
+    CURRENT_WEATHER_API_URL: int(os.getenv('CURRENT_WEATHER_CACHE_TTL', "600")),
+    AIR_POLLUTION_CURRENT_API_URL: int(os.getenv('AIR_POLLUTION_CURRENT_CACHE_TTL', "600")),
+    AIR_POLLUTION_FORECAST_API_URL: int(os.getenv('AIR_POLLUTION_FORECAST_CACHE_TTL', "3600")),
+    WEATHER_FORECAST_API_URL: int(os.getenv('WEATHER_FORECAST_CACHE_TTL', "10800")),
+    REVERSE_GEOCODING_API_URL: int(os.getenv('REVERSE_GEOCODING_CACHE_TTL', str(30 * 86400))),
+}
+# requests within this many km of a bundled / known place use the place's coordinates, so nearby
+# guild locations share one cache entry and one API call (0 disables snapping)
+CACHE_SNAP_KM = float(os.getenv('CACHE_SNAP_KM', "0"))
+
+# Geocoding cache settings
+GEOCODE_CACHE_FILE = os.getenv('GEOCODE_CACHE_FILE', "geocode_cache.sqlite3")
+# seconds a "location not found" result is remembered
+GEOCODE_NEGATIVE_TTL = int(os.getenv('GEOCODE_NEGATIVE_TTL', "900"))
+GEOCODE_CACHE_HOT_ENTRIES = int(os.getenv('GEOCODE_CACHE_HOT_ENTRIES', "10000"))
+# bundled city list (name,state,country,lat,lon) used for autocomplete and offline lookups
+CITIES_FILE = os.getenv('CITIES_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "cities.csv"))
+# coordinates within this many km of a known place are named after it without calling the reverse geocoding API
+REVERSE_GEOCODE_MAX_KM = float(os.getenv('REVERSE_GEOCODE_MAX_KM', "15"))
+
+# Retry / circuit breaker settings for API requests
+API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', "2"))
+API_RETRY_BASE_DELAY = float(os.getenv('API_RETRY_BASE_DELAY', "0.5"))
+API_RETRY_MAX_DELAY = float(os.getenv('API_RETRY_MAX_DELAY', "4"))
+# consecutive failed requests before an endpoint's circuit opens, and seconds it stays open
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', "30"))
+
+# Metrics: Prometheus text served on METRICS_HOST:METRICS_PORT/metrics (0 disables the endpoint)
+METRICS_HOST = os.getenv('METRICS_HOST', "127.0.0.1")
+METRICS_PORT = int(os.getenv('METRICS_PORT', "9108"))
+# seconds between event loop lag samples
+LOOP_LAG_INTERVAL = float(os.getenv('LOOP_LAG_INTERVAL', "0.5"))
+
+# Command responses
+# seconds a command waits for its data before deferring; Discord requires a first response within 3 seconds
+FAST_RESPONSE_DEADLINE = float(os.getenv('FAST_RESPONSE_DEADLINE', "2"))
+
+# /aqi_compare and /weather_compare
+COMPARE_MAX_LOCATIONS = int(os.getenv('COMPARE_MAX_LOCATIONS', "10"))
+# locations geocoded / fetched at the same time
+COMPARE_CONCURRENCY = int(os.getenv('COMPARE_CONCURRENCY', "10"))
+# rows shown in the table (matters for the owner-only "all guild locations" comparison)
+COMPARE_MAX_ROWS = int(os.getenv('COMPARE_MAX_ROWS', "25"))
+
+# Pre-warming of guild default locations
+PREWARM_ENABLED = os.getenv('PREWARM_ENABLED', "true").lower() == "true"
+# seconds between refresh passes, keep this below the current weather / AQI TTLs
+PREWARM_INTERVAL = int(os.getenv('PREWARM_INTERVAL', "300"))
+PREWARM_BATCH_SIZE = int(os.getenv('PREWARM_BATCH_SIZE', "10"))
+# share of this process's OWM_CALLS_PER_MINUTE a pass may use, the rest stays free for commands
+PREWARM_RATE_SHARE = float(os.getenv('PREWARM_RATE_SHARE', "0.5"))
+PREWARM_ENDPOINTS = [CURRENT_WEATHER_API_URL, AIR_POLLUTION_CURRENT_API_URL]
+
 # File for storing server locations
-LOCATIONS_FILE = "server_locations.json"
\ No newline at end of file
+LOCATIONS_DB_FILE = os.getenv('LOCATIONS_DB_FILE', "server_locations.sqlite3")
+# seconds changed server locations wait before being written in one batch
+LOCATIONS_WRITE_DELAY = float(os.getenv('LOCATIONS_WRITE_DELAY', "2"))
+# legacy JSON locations file, imported into LOCATIONS_DB_FILE on first start
+LOCATIONS_FILE = "server_locations.json"
+
+# AQI alert subscriptions, stored in LOCATIONS_DB_FILE
+ALERT_CHECK_INTERVAL = int(os.getenv('ALERT_CHECK_INTERVAL', "600"))
+# maximum number of alert messages sent to Discord at the same time
+ALERT_SEND_CONCURRENCY = int(os.getenv('ALERT_SEND_CONCURRENCY', "5"))
+ALERT_FETCH_CONCURRENCY = int(os.getenv('ALERT_FETCH_CONCURRENCY', "10"))
+
+# OpenWeatherMap rate limits (shared by every endpoint above)
+OWM_CALLS_PER_MINUTE = int(os.getenv('OWM_CALLS_PER_MINUTE', "60"))
+OWM_BURST = int(os.getenv('OWM_BURST', "10"))
+OWM_CALLS_PER_DAY = int(os.getenv('OWM_CALLS_PER_DAY', "33000"))
+# longest a request waits in the rate limiter queue before falling back to stale data
+RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', "5"))
+# once this fraction of the daily budget is left, cached data is served even if stale
+QUOTA_RESERVE_FRACTION = float(os.getenv('QUOTA_RESERVE_FRACTION', "0.1"))
+QUOTA_SAVE_EVERY = int(os.getenv('QUOTA_SAVE_EVERY', "20"))
+# daily call counter, kept next to the locations file
+QUOTA_FILE = os.path.join(os.path.dirname(LOCATIONS_DB_FILE), "api_quota.json")
+# App command sync
+# hash of the last synced command tree, kept next to the locations file; sync is skipped while it matches
+COMMAND_SYNC_FILE = os.getenv('COMMAND_SYNC_FILE', os.path.join(os.path.dirname(LOCATIONS_DB_FILE), "command_sync.json"))
+# sync on every start regardless, e.g. after commands were edited outside the bot
+FORCE_COMMAND_SYNC = os.getenv('FORCE_COMMAND_SYNC', "false").lower() == "true"
+
+# Sharding
+# worker processes app.py starts; each runs an AutoShardedBot for its share of the shards
+SHARD_PROCESSES = max(1, int(os.getenv('SHARD_PROCESSES', "1")))
+# total shards across all processes (0 uses Discord's recommended count)
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', "0"))
+# shards this process runs, set by the launcher for each worker (comma separated)
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv('SHARD_IDS', "").split(",") if shard_id.strip()] or None
+# seconds a crashed worker waits before being restarted
+WORKER_RESTART_DELAY = float(os.getenv('WORKER_RESTART_DELAY', "10"))
+# OpenWeatherMap responses and the daily call count shared by every process, kept next to the locations file
+SHARED_CACHE_FILE = os.getenv('SHARED_CACHE_FILE', os.path.join(os.path.dirname(LOCATIONS_DB_FILE), "shared_cache.sqlite3"))
+SHARED_CACHE_ENABLED = os.getenv('SHARED_CACHE_ENABLED', "true" if SHARD_PROCESSES > 1 else "false").lower() == "true"
+
+# AQI history
+# every current / past AQI sample for the servers' locations, in mapped segment files next to the locations file
+HISTORY_ENABLED = os.getenv('HISTORY_ENABLED', "true").lower() == "true"
+HISTORY_DIR = os.getenv('HISTORY_DIR', os.path.join(os.path.dirname(LOCATIONS_DB_FILE), "aqi_history"))
+# seconds between passes that record current AQI for every tracked location
+HISTORY_RECORD_INTERVAL = int(os.getenv('HISTORY_RECORD_INTERVAL', "3600"))
+HISTORY_FETCH_CONCURRENCY = int(os.getenv('HISTORY_FETCH_CONCURRENCY', "5"))
+# raw samples are deleted after this many days; hourly / daily rollups are kept
+HISTORY_RAW_RETENTION_DAYS = int(os.getenv('HISTORY_RAW_RETENTION_DAYS', "90"))
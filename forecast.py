@@ -0,0 +1,212 @@
+# FORECAST ENGINE
+# Parses forecast responses once into columns and answers day / hour queries over them.
+# Imports
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+
+SECONDS_PER_DAY = 86400
+
+# Shared table for text values (weather descriptions / icons); columns store 2-byte codes into it
+_text_table = [None]
+_text_codes = {None: 0}
+
+# GETS TEXT CODE
+def _text_code(text):
+    code = _text_codes.get(text)
+    if code is None:
+        code = len(_text_table)
+        _text_table.append(text)
+        _text_codes[text] = code
+    return code
+
+
+# REGULAR TIMESTAMPS
+class RegularTimestamps:
+    """
+    Read-only sequence of evenly spaced timestamps stored as (start, step, count).
+    Forecasts are almost always hourly / 3-hourly, so this replaces an 8 byte per entry array.
+    Supports len(), indexing and bisect.
+    """
+    __slots__ = ("start", "step", "count")
+    itemsize = 0
+
+    def __init__(self, start: int, step: int, count: int):
+        self.start = start
+        self.step = step
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index: int):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("timestamp index out of range")
+        return self.start + index * self.step
+
+    @classmethod
+    def compress(cls, timestamps):
+        """Returns a RegularTimestamps if the values are evenly spaced, otherwise the array unchanged."""
+        if len(timestamps) < 2:
+            return timestamps
+        step = timestamps[1] - timestamps[0]
+        if step <= 0:
+            return timestamps
+        for i in range(2, len(timestamps)):
+            if timestamps[i] - timestamps[i - 1] != step:
+                return timestamps
+        return cls(timestamps[0], step, len(timestamps))
+
+
+# Numeric columns pulled out of each response type
+AIR_POLLUTION_COLUMNS = ("aqi", "co", "no", "no2", "o3", "so2", "pm2_5", "pm10", "nh3")
+WEATHER_COLUMNS = ("temp", "feels_like", "humidity", "pressure", "wind_speed", "visibility")
+
+
+# FORECAST SERIES
+class ForecastSeries:
+    """
+    Columnar forecast: sorted timestamps plus one float32 array per value.
+    Missing values are stored as NaN. Text columns (weather description / icon) hold codes into a shared table.
+    This is the cached form of forecast responses; per-entry objects are only built when an embed needs one
+    (see models.AirQualitySample.from_series / models.CurrentWeather.from_series).
+    """
+    __slots__ = ("timestamps", "columns", "text_columns", "utc_offset")
+
+    def __init__(self, timestamps, columns: dict, text_columns: dict = None, utc_offset: int = None):
+        self.timestamps = RegularTimestamps.compress(timestamps)
+        self.columns = columns
+        self.text_columns = text_columns or {}
+        # offset reported by the API (weather forecast only), in seconds east of UTC
+        self.utc_offset = utc_offset
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self):
+        """Approximate memory used by the columns."""
+        size = self.timestamps.itemsize * len(self.timestamps)
+        size += sum(column.itemsize * len(column) for column in self.columns.values())
+        size += sum(column.itemsize * len(column) for column in self.text_columns.values())
+        return size
+
+    @classmethod
+    def from_air_pollution(cls, data: dict):
+        """Builds a series from an air pollution (forecast) response."""
+        entries = sorted((e for e in data.get("list", []) if e.get("dt")), key=lambda e: e["dt"])
+        timestamps = array('q', (e["dt"] for e in entries))
+        columns = {name: array('f') for name in AIR_POLLUTION_COLUMNS}
+        nan = math.nan
+        for entry in entries:
+            aqi = entry.get("main", {}).get("aqi")
+            columns["aqi"].append(aqi if aqi is not None else nan)
+            components = entry.get("components", {})
+            for name in AIR_POLLUTION_COLUMNS[1:]:
+                value = components.get(name)
+                columns[name].append(value if value is not None else nan)
+        return cls(timestamps, columns)
+
+    @classmethod
+    def from_weather(cls, data: dict):
+        """Builds a series from a 5 day / 3 hour weather forecast response."""
+        entries = sorted((e for e in data.get("list", []) if e.get("dt")), key=lambda e: e["dt"])
+        timestamps = array('q', (e["dt"] for e in entries))
+        columns = {name: array('f') for name in WEATHER_COLUMNS}
+        text_columns = {"description": array('H'), "icon": array('H')}
+        nan = math.nan
+        for entry in entries:
+            main_data = entry.get("main", {})
+            for name in ("temp", "feels_like", "humidity", "pressure"):
+                value = main_data.get(name)
+                columns[name].append(value if value is not None else nan)
+            wind_speed = entry.get("wind", {}).get("speed")
+            columns["wind_speed"].append(wind_speed if wind_speed is not None else nan)
+            visibility = entry.get("visibility")
+            columns["visibility"].append(visibility if visibility is not None else nan)
+            weather_list = entry.get("weather") or [{}]
+            text_columns["description"].append(_text_code(weather_list[0].get("description")))
+            text_columns["icon"].append(_text_code(weather_list[0].get("icon")))
+        return cls(timestamps, columns, text_columns, data.get("city", {}).get("timezone"))
+
+    # GETS A SINGLE VALUE
+    def value(self, column: str, index: int):
+        """Returns one value, or None if it is missing."""
+        if column in self.text_columns:
+            return _text_table[self.text_columns[column][index]]
+        value = self.columns[column][index]
+        return None if math.isnan(value) else value
+
+    # GETS DAY NUMBER
+    @staticmethod
+    def day_number(timestamp: float, utc_offset: int):
+        """Days since the epoch in the zone utc_offset seconds east of UTC."""
+        return int((timestamp + utc_offset) // SECONDS_PER_DAY)
+
+    # GETS INDEX RANGE FOR A DAY
+    def day_bounds(self, day: int, utc_offset: int):
+        """Returns (start, stop) indexes of the entries falling on `day` in the given zone."""
+        day_start = day * SECONDS_PER_DAY - utc_offset
+        start = bisect_left(self.timestamps, day_start)
+        stop = bisect_left(self.timestamps, day_start + SECONDS_PER_DAY, start)
+        return start, stop
+
+    # GETS FIRST FUTURE ENTRY
+    def first_after(self, timestamp: float):
+        """Returns the index of the first entry strictly after timestamp, or None."""
+        index = bisect_right(self.timestamps, timestamp)
+        return index if index < len(self.timestamps) else None
+
+    # GETS ENTRY CLOSEST TO AN HOUR OF A DAY
+    def nearest_to_hour(self, day: int, hour: int, utc_offset: int):
+        """Returns the index of the entry on `day` closest to `hour` local time, or None if the day has no entries."""
+        start, stop = self.day_bounds(day, utc_offset)
+        if start == stop:
+            return None
+        target = day * SECONDS_PER_DAY - utc_offset + hour * 3600
+        index = bisect_left(self.timestamps, target, start, stop)
+        candidates = [i for i in (index - 1, index) if start <= i < stop]
+        return min(candidates, key=lambda i: abs(self.timestamps[i] - target))
+
+    # SUMMARIZES EACH DAY
+    def daily_summary(self, column: str, utc_offset: int):
+        """
+        Returns one (day, min, mean, max, index_of_max) tuple per local day covered by the series.
+        Days are found by bisecting the timestamps, then each day's slice is reduced with builtins.
+        """
+        if not self.timestamps:
+            return []
+        values = self.columns[column]
+        first_day = self.day_number(self.timestamps[0], utc_offset)
+        last_day = self.day_number(self.timestamps[-1], utc_offset)
+        summary = []
+        for day in range(first_day, last_day + 1):
+            start, stop = self.day_bounds(day, utc_offset)
+            day_values = values[start:stop]
+            if any(math.isnan(v) for v in day_values):
+                day_values = array('f', (v for v in day_values if not math.isnan(v)))
+            if not day_values:
+                continue
+            day_max = max(day_values)
+            summary.append((
+                day,
+                min(day_values),
+                math.fsum(day_values) / len(day_values),
+                day_max,
+                start + values[start:stop].index(day_max)
+            ))
+        return summary
+
+    # SELECTS TOMORROW'S ENTRY
+    def select_tomorrow(self, now_ts: float, utc_offset: int, hour: int = 12):
+        """
+        Returns the index of the entry tomorrow closest to `hour`,
+        falling back to the next future entry, or None if there is none.
+        """
+        tomorrow = self.day_number(now_ts, utc_offset) + 1
+        index = self.nearest_to_hour(tomorrow, hour, utc_offset)
+        if index is None:
+            index = self.first_after(now_ts)
+        return index
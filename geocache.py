@@ -0,0 +1,111 @@
+# PERSISTENT GEOCODING CACHE
+# Imports
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# NORMALIZES GEOCODING QUERY
+def normalize_query(city: str, state_code: str = None, country_code: str = None):
+    """Builds a case/whitespace-insensitive key from the location parts."""
+    parts = [city, state_code, country_code]
+    return ",".join(" ".join(part.split()).lower() if part else "" for part in parts)
+
+
+# GEOCODING CACHE
+class GeocodeCache:
+    """
+    Maps normalized location queries to (lat, lon, display_name).
+    Backed by SQLite so results survive restarts, with an in-memory LRU layer on top.
+    Failed lookups are remembered for negative_ttl seconds so repeated typos skip the API.
+    """
+    def __init__(self, db_path: str, negative_ttl: float, hot_max_entries: int):
+        self.db_path = db_path
+        self.negative_ttl = negative_ttl
+        self.hot_max_entries = hot_max_entries
+        # query -> (lat, lon, display_name, error, created_at)
+        self._hot = OrderedDict()
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # WAL lets every shard process read while one of them writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                "query TEXT PRIMARY KEY, lat REAL, lon REAL, display_name TEXT, error TEXT, created_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _read(self, query):
+        with self._lock:
+            return self._connect().execute(
+                "SELECT lat, lon, display_name, error, created_at FROM geocode WHERE query = ?", (query,)
+            ).fetchone()
+
+    def _write(self, query, entry):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?, ?)", (query, *entry))
+            conn.commit()
+
+    def _remember(self, query, entry):
+        self._hot[query] = entry
+        self._hot.move_to_end(query)
+        while len(self._hot) > self.hot_max_entries:
+            self._hot.popitem(last=False)
+
+    def _is_fresh(self, entry):
+        # positive results never expire, negative ones only live for negative_ttl
+        return entry[3] is None or time.time() - entry[4] < self.negative_ttl
+
+    def _read_places(self):
+        with self._lock:
+            return self._connect().execute(
+                "SELECT DISTINCT display_name, lat, lon FROM geocode WHERE error IS NULL AND display_name IS NOT NULL"
+            ).fetchall()
+
+    async def load_places(self):
+        """Returns (display_name, lat, lon) for every successful lookup stored so far."""
+        return await asyncio.to_thread(self._read_places)
+
+    async def get(self, query: str):
+        """
+        Returns (lat, lon, display_name, error) for a cached query, or None on a miss.
+        For negative entries lat/lon/display_name are None and error holds the message.
+        """
+        entry = self._hot.get(query)
+        if entry is None:
+            entry = await asyncio.to_thread(self._read, query)
+            if entry is None:
+                return None
+            self._remember(query, entry)
+        else:
+            self._hot.move_to_end(query)
+
+        if not self._is_fresh(entry):
+            return None
+        return entry[:4]
+
+    async def set(self, query: str, lat: float, lon: float, display_name: str):
+        """Stores a successful lookup."""
+        entry = (lat, lon, display_name, None, time.time())
+        self._remember(query, entry)
+        await asyncio.to_thread(self._write, query, entry)
+
+    async def set_negative(self, query: str, error: str):
+        """Stores a failed lookup for negative_ttl seconds."""
+        entry = (None, None, None, error, time.time())
+        self._remember(query, entry)
+        await asyncio.to_thread(self._write, query, entry)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,343 @@
+# AIR QUALITY HISTORY STORE
+# Append-only time series per location, kept in memory-mapped files under one directory per series:
+#   meta.json            coordinates and the UTC offset local days are counted in
+#   raw-YYYYMM-NN.seg    samples: uint32 timestamp deltas from the month start + one float32 column per value
+#   hourly-YYYYMM.roll   one rollup slot per UTC hour of the month
+#   daily-YYYY.roll      one rollup slot per local day of the year
+# Rollups are updated on every append, so history queries read one slot per hour / day instead of raw samples.
+# Imports
+import calendar
+import datetime
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from forecast import SECONDS_PER_DAY
+from models import POLLUTANT_KEYS
+
+# Values stored per sample, in column order
+HISTORY_COLUMNS = ("aqi",) + POLLUTANT_KEYS
+# Values kept in the rollups, each as (count, sum, min, max)
+ROLLUP_COLUMNS = ("aqi", "pm2_5", "pm10")
+_ROLLUP_INDEXES = tuple(HISTORY_COLUMNS.index(column) for column in ROLLUP_COLUMNS)
+
+# magic, version, column / field count, base (month start timestamp or first day number), capacity, count
+_HEADER = struct.Struct("<4sHHqII")
+_HEADER_SIZE = 32
+_RAW_MAGIC = b"AQTS"
+_ROLLUP_MAGIC = b"AQRU"
+_VERSION = 1
+_SLOT = struct.Struct("<" + "f" * (4 * len(ROLLUP_COLUMNS)))
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+# SERIES KEY
+def series_key(lat, lon, precision: int):
+    """Directory name for a location, rounded like response cache keys so nearby requests share a series."""
+    return f"{round(float(lat), precision):.{precision}f}_{round(float(lon), precision):.{precision}f}"
+
+
+# Calendar helpers
+def _month_of(timestamp: int):
+    moment = datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+    return moment.year, moment.month
+
+def _month_start(year: int, month: int):
+    return calendar.timegm((year, month, 1, 0, 0, 0))
+
+def _year_of_day(day: int):
+    return datetime.date.fromordinal(day + _EPOCH_ORDINAL).year
+
+def _first_day_of_year(year: int):
+    return datetime.date(year, 1, 1).toordinal() - _EPOCH_ORDINAL
+
+
+# SERIES STATE
+@dataclass(slots=True)
+class _SeriesState:
+    utc_offset: int
+    last_timestamp: int
+    # newest raw segment file name, or None before the first sample
+    raw_name: str
+
+
+# HISTORY STORE
+class HistoryStore:
+    """
+    Appends air quality samples per series and answers hourly / daily rollup queries.
+    Appends are writes into mapped memory; only creating a month's files touches the disk directly.
+    Samples must arrive in time order per series; older or repeated timestamps are ignored.
+    Only one process may append to a directory; others can read its rollups concurrently.
+    """
+    RAW_SEGMENT_CAPACITY = 1024
+    MAX_OPEN_FILES = 128
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._series = {}
+        # path -> (file, mmap), least recently used first
+        self._open = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    # FILE MAPPING
+    def _map(self, path: str, size: int = 0, base: int = 0, fields: int = 0, magic: bytes = b""):
+        """Returns the mmap for path. Creates a zeroed file of `size` bytes if missing and size is given, else returns None."""
+        mapped = self._open.get(path)
+        if mapped is not None:
+            self._open.move_to_end(path)
+            return mapped[1]
+        if os.path.exists(path):
+            file = open(path, "r+b")
+        elif size:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            file = open(path, "w+b")
+            file.truncate(size)
+            capacity = (size - _HEADER_SIZE) // (4 * (fields + 1)) if magic == _RAW_MAGIC else (size - _HEADER_SIZE) // _SLOT.size
+            file.write(_HEADER.pack(magic, _VERSION, fields, base, capacity, 0))
+            file.flush()
+        else:
+            return None
+        mapped_file = mmap.mmap(file.fileno(), 0)
+        self._open[path] = (file, mapped_file)
+        while len(self._open) > self.MAX_OPEN_FILES:
+            _, (old_file, old_map) = self._open.popitem(last=False)
+            old_map.close()
+            old_file.close()
+        return mapped_file
+
+    def _close_path(self, path: str):
+        mapped = self._open.pop(path, None)
+        if mapped is not None:
+            mapped[1].close()
+            mapped[0].close()
+
+    # SERIES METADATA
+    def _series_dir(self, key: str):
+        return os.path.join(self.directory, key)
+
+    def _read_utc_offset(self, key: str):
+        try:
+            with open(os.path.join(self._series_dir(key), "meta.json"), "r") as file:
+                return int(json.load(file).get("utc_offset", 0))
+        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+            return 0
+
+    def _state(self, key: str):
+        state = self._series.get(key)
+        if state is not None:
+            return state
+        state = _SeriesState(self._read_utc_offset(key), 0, None)
+
+        # resume after the newest stored sample
+        raw_names = sorted(name for name in self._list_dir(key) if name.startswith("raw-"))
+        if raw_names:
+            state.raw_name = raw_names[-1]
+            mapped_file = self._map(os.path.join(self._series_dir(key), state.raw_name))
+            _, _, _, base, _, count = _HEADER.unpack_from(mapped_file, 0)
+            if count:
+                state.last_timestamp = base + struct.unpack_from("<I", mapped_file, _HEADER_SIZE + (count - 1) * 4)[0]
+        self._series[key] = state
+        return state
+
+    def _list_dir(self, key: str):
+        try:
+            return os.listdir(self._series_dir(key))
+        except FileNotFoundError:
+            return []
+
+    def track(self, key: str, lat: float, lon: float, utc_offset: int):
+        """Creates or updates a series' metadata. Daily rollups count days in utc_offset's local time."""
+        with self._lock:
+            state = self._state(key)
+            meta_path = os.path.join(self._series_dir(key), "meta.json")
+            if state.utc_offset == utc_offset and os.path.exists(meta_path):
+                return
+            os.makedirs(self._series_dir(key), exist_ok=True)
+            temp_path = meta_path + ".tmp"
+            with open(temp_path, "w") as file:
+                json.dump({"lat": lat, "lon": lon, "utc_offset": utc_offset}, file)
+            os.replace(temp_path, meta_path)
+            state.utc_offset = utc_offset
+
+    def utc_offset(self, key: str):
+        """The offset a series' daily rollups use, read from disk so readers in other processes see the writer's changes."""
+        return self._read_utc_offset(key)
+
+    # APPENDS A SAMPLE
+    def append(self, key: str, sample):
+        """Stores an AirQualitySample. Returns False if it isn't newer than the series' last sample."""
+        if not sample.timestamp:
+            return False
+        timestamp = int(sample.timestamp)
+        values = [getattr(sample, column) for column in HISTORY_COLUMNS]
+        values = [float(value) if value is not None else math.nan for value in values]
+        with self._lock:
+            state = self._state(key)
+            if timestamp <= state.last_timestamp:
+                return False
+            self._append_raw(key, state, timestamp, values)
+            self._add_to_rollups(key, state, timestamp, values)
+            state.last_timestamp = timestamp
+            return True
+
+    def _append_raw(self, key: str, state: _SeriesState, timestamp: int, values: list):
+        year, month = _month_of(timestamp)
+        month_prefix = f"raw-{year:04d}{month:02d}-"
+        capacity = self.RAW_SEGMENT_CAPACITY
+        size = _HEADER_SIZE + capacity * 4 * (len(HISTORY_COLUMNS) + 1)
+
+        if state.raw_name is None or not state.raw_name.startswith(month_prefix):
+            state.raw_name = f"{month_prefix}00.seg"
+        path = os.path.join(self._series_dir(key), state.raw_name)
+        mapped_file = self._map(path, size, _month_start(year, month), len(HISTORY_COLUMNS), _RAW_MAGIC)
+        _, _, _, base, capacity, count = _HEADER.unpack_from(mapped_file, 0)
+        if count >= capacity:
+            # segment full: continue in the month's next one
+            state.raw_name = f"{month_prefix}{int(state.raw_name[-6:-4]) + 1:02d}.seg"
+            path = os.path.join(self._series_dir(key), state.raw_name)
+            mapped_file = self._map(path, size, _month_start(year, month), len(HISTORY_COLUMNS), _RAW_MAGIC)
+            _, _, _, base, capacity, count = _HEADER.unpack_from(mapped_file, 0)
+
+        struct.pack_into("<I", mapped_file, _HEADER_SIZE + count * 4, timestamp - base)
+        for column_index, value in enumerate(values):
+            struct.pack_into("<f", mapped_file, _HEADER_SIZE + capacity * 4 * (column_index + 1) + count * 4, value)
+        # the count is written last, so a crash mid-append leaves the sample out rather than half written
+        struct.pack_into("<I", mapped_file, _HEADER.size - 4, count + 1)
+
+    def _add_to_rollups(self, key: str, state: _SeriesState, timestamp: int, values: list):
+        year, month = _month_of(timestamp)
+        month_start = _month_start(year, month)
+        hours = calendar.monthrange(year, month)[1] * 24
+        hourly = self._map(
+            os.path.join(self._series_dir(key), f"hourly-{year:04d}{month:02d}.roll"),
+            _HEADER_SIZE + hours * _SLOT.size, month_start, _SLOT.size // 4, _ROLLUP_MAGIC
+        )
+        self._add_to_slot(hourly, (timestamp - month_start) // 3600, values)
+
+        day = (timestamp + state.utc_offset) // SECONDS_PER_DAY
+        day_year = _year_of_day(day)
+        first_day = _first_day_of_year(day_year)
+        daily = self._map(
+            os.path.join(self._series_dir(key), f"daily-{day_year:04d}.roll"),
+            _HEADER_SIZE + 366 * _SLOT.size, first_day, _SLOT.size // 4, _ROLLUP_MAGIC
+        )
+        self._add_to_slot(daily, day - first_day, values)
+
+    def _add_to_slot(self, mapped_file, slot: int, values: list):
+        offset = _HEADER_SIZE + slot * _SLOT.size
+        fields = list(_SLOT.unpack_from(mapped_file, offset))
+        for rollup_index, value_index in enumerate(_ROLLUP_INDEXES):
+            value = values[value_index]
+            if math.isnan(value):
+                continue
+            count, total, low, high = fields[rollup_index * 4:rollup_index * 4 + 4]
+            fields[rollup_index * 4:rollup_index * 4 + 4] = (
+                count + 1, total + value, value if not count else min(low, value), value if not count else max(high, value)
+            )
+        _SLOT.pack_into(mapped_file, offset, *fields)
+
+    # READS ROLLUPS
+    def _read_slots(self, path: str, first_slot: int, stop_slot: int):
+        """Returns [(slot, {column: (count, mean, min, max)})] for slots with data, [] if the file doesn't exist."""
+        mapped_file = self._map(path)
+        if mapped_file is None:
+            return []
+        slot_count = _HEADER.unpack_from(mapped_file, 0)[4]
+        rows = []
+        for slot in range(max(first_slot, 0), min(stop_slot, slot_count)):
+            fields = _SLOT.unpack_from(mapped_file, _HEADER_SIZE + slot * _SLOT.size)
+            columns = {}
+            for rollup_index, column in enumerate(ROLLUP_COLUMNS):
+                count, total, low, high = fields[rollup_index * 4:rollup_index * 4 + 4]
+                if count:
+                    columns[column] = (int(count), total / count, low, high)
+            if columns:
+                rows.append((slot, columns))
+        return rows
+
+    def daily(self, key: str, first_day: int, last_day: int):
+        """Returns [(day, {column: (count, mean, min, max)})] for local days first_day..last_day that have data."""
+        rows = []
+        with self._lock:
+            for year in range(_year_of_day(first_day), _year_of_day(last_day) + 1):
+                year_first_day = _first_day_of_year(year)
+                path = os.path.join(self._series_dir(key), f"daily-{year:04d}.roll")
+                for slot, columns in self._read_slots(path, first_day - year_first_day, last_day - year_first_day + 1):
+                    rows.append((year_first_day + slot, columns))
+        return rows
+
+    def hourly(self, key: str, start: int, end: int):
+        """Returns [(hour_start, {column: (count, mean, min, max)})] for UTC hours in [start, end) that have data."""
+        rows = []
+        with self._lock:
+            year, month = _month_of(start)
+            while _month_start(year, month) < end:
+                month_start = _month_start(year, month)
+                path = os.path.join(self._series_dir(key), f"hourly-{year:04d}{month:02d}.roll")
+                first_slot = (start - month_start) // 3600
+                stop_slot = -(-(end - month_start) // 3600)
+                for slot, columns in self._read_slots(path, first_slot, stop_slot):
+                    rows.append((month_start + slot * 3600, columns))
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return rows
+
+    # READS RAW SAMPLES
+    def samples(self, key: str, start: int, end: int):
+        """Returns [(timestamp, [values in HISTORY_COLUMNS order])] for samples in [start, end); NaN marks missing values."""
+        results = []
+        with self._lock:
+            for name in sorted(name for name in self._list_dir(key) if name.startswith("raw-")):
+                mapped_file = self._map(os.path.join(self._series_dir(key), name))
+                _, _, column_count, base, capacity, count = _HEADER.unpack_from(mapped_file, 0)
+                if not count or base >= end:
+                    continue
+                deltas = array("I", mapped_file[_HEADER_SIZE:_HEADER_SIZE + count * 4])
+                columns = []
+                for column_index in range(column_count):
+                    offset = _HEADER_SIZE + capacity * 4 * (column_index + 1)
+                    columns.append(array("f", mapped_file[offset:offset + count * 4]))
+                if sys.byteorder != "little":
+                    for column in [deltas, *columns]:
+                        column.byteswap()
+                for index, delta in enumerate(deltas):
+                    if start <= base + delta < end:
+                        results.append((base + delta, [column[index] for column in columns]))
+        return results
+
+    # MAINTENANCE
+    def prune_raw(self, before: int):
+        """Deletes raw segments of months that ended before `before`. Rollups are kept."""
+        removed = 0
+        with self._lock:
+            for key in os.listdir(self.directory):
+                for name in self._list_dir(key):
+                    if not name.startswith("raw-"):
+                        continue
+                    year, month = int(name[4:8]), int(name[8:10])
+                    next_month_start = _month_start(year + 1, 1) if month == 12 else _month_start(year, month + 1)
+                    if next_month_start < before:
+                        path = os.path.join(self._series_dir(key), name)
+                        self._close_path(path)
+                        os.remove(path)
+                        removed += 1
+        return removed
+
+    def flush(self):
+        """Writes mapped pages back to disk."""
+        with self._lock:
+            for _, mapped_file in self._open.values():
+                mapped_file.flush()
+
+    def close(self):
+        with self._lock:
+            for path in list(self._open):
+                self._open[path][1].flush()
+                self._close_path(path)
@@ -0,0 +1,205 @@
+# SERVER LOCATION STORAGE
+# Imports
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+import utils
+from models import GuildLocation
+
+
+# SQLITE LOCATION STORE
+class LocationStore:
+    """
+    Stores one GuildLocation row per guild in SQLite (WAL mode), so saving a guild's location is a single-row
+    upsert in its own transaction instead of a rewrite of every guild's settings.
+    AQI alert subscriptions are kept the same way, one JSON row per guild, so shard processes sharing the
+    database each write only their own guilds' rows.
+    All disk I/O runs in a worker thread.
+    """
+    COLUMNS = ("lat", "lon", "display_name", "set_by_user_id", "set_at", "utc_offset")
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS server_locations ("
+                "guild_id INTEGER PRIMARY KEY, lat REAL NOT NULL, lon REAL NOT NULL, display_name TEXT, "
+                "set_by_user_id INTEGER, set_at TEXT, utc_offset INTEGER)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS alert_subscriptions (guild_id INTEGER PRIMARY KEY, subscription TEXT NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _load_all(self):
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT guild_id, {', '.join(self.COLUMNS)} FROM server_locations"
+            ).fetchall()
+        return {row[0]: GuildLocation.from_record(dict(zip(self.COLUMNS, row[1:]))) for row in rows}
+
+    def _write_batch(self, upserts, deletes):
+        rows = []
+        for guild_id, location in upserts:
+            record = location.to_record()
+            rows.append((guild_id, *(record[column] for column in self.COLUMNS)))
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if rows:
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO server_locations (guild_id, {', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * (len(self.COLUMNS) + 1))})",
+                        rows
+                    )
+                if deletes:
+                    conn.executemany("DELETE FROM server_locations WHERE guild_id = ?", [(guild_id,) for guild_id in deletes])
+
+    def _count(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM server_locations").fetchone()[0]
+
+    def _load_alert_subscriptions(self):
+        with self._lock:
+            rows = self._connect().execute("SELECT guild_id, subscription FROM alert_subscriptions").fetchall()
+        return {guild_id: json.loads(subscription) for guild_id, subscription in rows}
+
+    def _write_alert_subscriptions(self, upserts, deletes):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                if upserts:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO alert_subscriptions (guild_id, subscription) VALUES (?, ?)",
+                        [(guild_id, json.dumps(subscription)) for guild_id, subscription in upserts]
+                    )
+                if deletes:
+                    conn.executemany("DELETE FROM alert_subscriptions WHERE guild_id = ?", [(guild_id,) for guild_id in deletes])
+
+    async def load_all(self):
+        """Returns every stored location as {guild_id: GuildLocation}."""
+        return await asyncio.to_thread(self._load_all)
+
+    async def write_batch(self, upserts, deletes=()):
+        """Writes (or replaces) the given (guild_id, GuildLocation) pairs and deletes guild ids, in one transaction."""
+        await asyncio.to_thread(self._write_batch, list(upserts), list(deletes))
+
+    async def migrate_from_json(self, json_path: str):
+        """Imports locations from the old JSON file the first time the store is opened."""
+        if await asyncio.to_thread(self._count) > 0:
+            return
+        legacy_locations = await asyncio.to_thread(utils.load_server_locations_from_file, json_path)
+        if legacy_locations:
+            await self.write_batch((guild_id, GuildLocation.from_record(record)) for guild_id, record in legacy_locations.items())
+            print(f"Migrated {len(legacy_locations)} server location(s) from {json_path} to {self.db_path}")
+
+    async def load_alert_subscriptions(self):
+        """Returns every stored alert subscription as {guild_id: subscription dict}."""
+        return await asyncio.to_thread(self._load_alert_subscriptions)
+
+    async def save_alert_subscription(self, guild_id: int, subscription: dict = None):
+        """Writes one guild's alert subscription, or deletes it when subscription is None."""
+        if subscription is None:
+            await asyncio.to_thread(self._write_alert_subscriptions, [], [guild_id])
+        else:
+            await asyncio.to_thread(self._write_alert_subscriptions, [(guild_id, dict(subscription))], [])
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# WRITE-BEHIND PERSISTER
+class LocationWriteBehind:
+    """
+    Collects guild ids whose location changed and writes them to the LocationStore in one batch
+    after debounce_seconds, so commands never wait on the disk.
+    Records are read from the in-memory locations dict at flush time; guilds missing from it are deleted.
+    """
+    def __init__(self, store: LocationStore, locations: dict, debounce_seconds: float):
+        self.store = store
+        self.locations = locations
+        self.debounce_seconds = debounce_seconds
+        self._dirty = set()
+        self._flush_task = None
+        self._flush_lock = asyncio.Lock()
+        # metrics
+        self.flush_count = 0
+        self.flushed_records = 0
+        self.failed_flushes = 0
+        self.last_flush_size = 0
+        self.last_flush_seconds = 0.0
+        self.oldest_pending_at = None
+
+    @property
+    def pending_count(self):
+        return len(self._dirty)
+
+    def mark_dirty(self, guild_id: int):
+        """Queues a guild's record to be written on the next flush."""
+        if not self._dirty:
+            self.oldest_pending_at = time.monotonic()
+        self._dirty.add(guild_id)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_after_delay())
+
+    async def _flush_after_delay(self):
+        await asyncio.sleep(self.debounce_seconds)
+        await self.flush()
+
+    async def flush(self):
+        """Writes every pending guild in one transaction."""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+            self.oldest_pending_at = None
+            upserts = [(guild_id, self.locations[guild_id]) for guild_id in dirty if guild_id in self.locations]
+            deletes = [guild_id for guild_id in dirty if guild_id not in self.locations]
+
+            started_at = time.monotonic()
+            try:
+                await self.store.write_batch(upserts, deletes)
+            except sqlite3.Error as e:
+                print(f"Error saving {len(dirty)} server location(s) to {self.store.db_path}: {e}")
+                self.failed_flushes += 1
+                # put them back and try again after another delay
+                if not self._dirty:
+                    self.oldest_pending_at = time.monotonic()
+                self._dirty |= dirty
+                self._flush_task = asyncio.create_task(self._flush_after_delay())
+                return
+            self.last_flush_seconds = time.monotonic() - started_at
+            self.last_flush_size = len(dirty)
+            self.flush_count += 1
+            self.flushed_records += len(dirty)
+
+    async def close(self):
+        """Flushes whatever is left and cancels the pending timer."""
+        await self.flush()
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+
+    def stats(self):
+        """Returns counters for logging / diagnostics."""
+        return {
+            "pending": self.pending_count,
+            "oldest_pending_seconds": time.monotonic() - self.oldest_pending_at if self.oldest_pending_at else 0.0,
+            "flushes": self.flush_count,
+            "flushed_records": self.flushed_records,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_size": self.last_flush_size,
+            "last_flush_seconds": self.last_flush_seconds
+        }
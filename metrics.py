@@ -0,0 +1,200 @@
+# IN-PROCESS METRICS
+# Counters and fixed-bucket latency histograms, exported as Prometheus text and read by /botstats.
+# Recording is a dict lookup plus a bisect over ~12 bucket bounds, cheap enough to leave on.
+# Imports
+import asyncio
+import math
+import time
+from bisect import bisect_left
+
+from aiohttp import web
+
+# Upper bounds (seconds) of the latency buckets, the last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# LATENCY HISTOGRAM
+class Histogram:
+    """Counts observations per bucket and keeps their sum, like a Prometheus histogram."""
+    __slots__ = ("bounds", "counts", "total", "count", "max")
+
+    def __init__(self, bounds: tuple = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float):
+        """Estimates the q-quantile by interpolating inside its bucket. Returns None with no observations."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[index - 1] if index > 0 else 0.0
+                upper = min(self.bounds[index], self.max) if index < len(self.bounds) else self.max
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+
+# METRICS REGISTRY
+class MetricsRegistry:
+    """
+    Holds counters and histograms keyed by (name, labels), where labels is a tuple of (key, value) pairs.
+    Collectors are callables returning (name, labels, value) gauges read at export time, used for stats
+    other modules already keep (cache counters, quota, pending writes).
+    """
+    def __init__(self):
+        self.started_at = time.time()
+        self.counters = {}
+        self.histograms = {}
+        self.help = {}
+        self._collectors = []
+
+    def describe(self, name: str, text: str):
+        self.help[name] = text
+
+    def inc(self, name: str, labels: tuple = (), value: float = 1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def add_collector(self, collector):
+        self._collectors.append(collector)
+
+    def collect_gauges(self):
+        """Returns [(name, labels, value)] from every collector; a failing collector is skipped."""
+        gauges = []
+        for collector in self._collectors:
+            try:
+                gauges.extend(collector())
+            except Exception as e:
+                print(f"Metrics collector {collector!r} failed: {e}")
+        return gauges
+
+    def counter(self, name: str, labels: tuple = ()):
+        return self.counters.get((name, labels), 0)
+
+    def histograms_named(self, name: str):
+        """Returns {labels: Histogram} for one histogram name."""
+        return {labels: histogram for (hist_name, labels), histogram in self.histograms.items() if hist_name == name}
+
+    # EXPORTS PROMETHEUS TEXT
+    def render_prometheus(self):
+        """Renders every metric in the Prometheus text exposition format."""
+        lines = []
+        typed = set()
+
+        def header(name, kind):
+            if name in typed:
+                return
+            typed.add(name)
+            if name in self.help:
+                lines.append(f"# HELP {name} {self.help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in sorted(self.counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+            header(name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.bounds + (math.inf,), histogram.counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram.total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        for name, labels, value in sorted(self.collect_gauges(), key=lambda gauge: (gauge[0], gauge[1])):
+            header(name, "gauge")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        header("bot_uptime_seconds", "gauge")
+        lines.append(f"bot_uptime_seconds {time.time() - self.started_at}")
+        return "\n".join(lines) + "\n"
+
+
+# FORMATS PROMETHEUS LABELS
+def _format_labels(labels: tuple):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels) + "}"
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Shared registry
+registry = MetricsRegistry()
+registry.describe("bot_command_total", "App command invocations by command and outcome.")
+registry.describe("bot_command_seconds", "Time from receiving an app command to the handler finishing.")
+registry.describe("owm_request_total", "OpenWeatherMap HTTP requests by endpoint and status.")
+registry.describe("owm_request_seconds", "OpenWeatherMap HTTP request latency by endpoint.")
+registry.describe("discord_response_seconds", "Latency of Discord interaction responses, deferrals and followups.")
+registry.describe("shared_cache_total", "Cross-process response cache lookups by result (hit, stale, miss).")
+registry.describe("event_loop_lag_seconds", "How late the event loop ran a timer that should have fired immediately.")
+
+
+# EVENT LOOP LAG MONITOR
+class EventLoopLagMonitor:
+    """Sleeps for `interval` in a loop and records how much later than requested it woke up."""
+    def __init__(self, registry: MetricsRegistry, interval: float):
+        self.registry = registry
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, loop.time() - expected)
+            self.registry.observe("event_loop_lag_seconds", self.last_lag)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# STARTS METRICS ENDPOINT
+async def start_metrics_server(host: str, port: int):
+    """Serves GET /metrics as Prometheus text on host:port. Returns the AppRunner, or None if it can't bind."""
+    async def handle_metrics(request):
+        return web.Response(text=registry.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, host, port).start()
+    except OSError as e:
+        print(f"Could not start metrics endpoint on {host}:{port}: {e}")
+        await runner.cleanup()
+        return None
+    print(f"Metrics available at http://{host}:{port}/metrics")
+    return runner
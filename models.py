@@ -0,0 +1,177 @@
+# TYPED MODELS FOR API RESPONSES AND STORED RECORDS
+# Built once per response / load, then shared by the embeds and the caches.
+# Imports
+import datetime
+import sys
+from dataclasses import dataclass, fields
+
+from forecast import ForecastSeries
+
+POLLUTANT_KEYS = ("co", "no", "no2", "o3", "so2", "pm2_5", "pm10", "nh3")
+
+
+# ESTIMATES MODEL SIZE
+def _slotted_size(obj):
+    """Approximate memory used by a slotted dataclass and its field values."""
+    return sys.getsizeof(obj) + sum(sys.getsizeof(getattr(obj, field.name)) for field in fields(obj))
+
+
+# CURRENT WEATHER
+@dataclass(slots=True, frozen=True)
+class CurrentWeather:
+    """Current weather response. Temperatures are in Kelvin; missing values are None."""
+    description: str
+    icon: str
+    temp: float
+    feels_like: float
+    humidity: int
+    pressure: int
+    wind_speed: float
+    visibility: int
+    observed_at: int
+    sunrise: int
+    sunset: int
+    utc_offset: int
+
+    @classmethod
+    def from_response(cls, data: dict):
+        """Returns a CurrentWeather, or None if the response has no weather data."""
+        if not data or "main" not in data or not data.get("weather"):
+            return None
+        main_data = data["main"]
+        weather_description_data = data["weather"][0]
+        sys_data = data.get("sys", {})
+        return cls(
+            description=weather_description_data.get("description"),
+            icon=weather_description_data.get("icon"),
+            temp=main_data.get("temp"),
+            feels_like=main_data.get("feels_like"),
+            humidity=main_data.get("humidity"),
+            pressure=main_data.get("pressure"),
+            wind_speed=data.get("wind", {}).get("speed"),
+            visibility=data.get("visibility"),
+            observed_at=data.get("dt"),
+            sunrise=sys_data.get("sunrise"),
+            sunset=sys_data.get("sunset"),
+            utc_offset=data.get("timezone")
+        )
+
+    @classmethod
+    def from_series(cls, series: ForecastSeries, index: int):
+        """Builds one weather forecast entry back out of a columnar ForecastSeries."""
+        humidity = series.value("humidity", index)
+        pressure = series.value("pressure", index)
+        visibility = series.value("visibility", index)
+        return cls(
+            description=series.value("description", index),
+            icon=series.value("icon", index),
+            temp=series.value("temp", index),
+            feels_like=series.value("feels_like", index),
+            humidity=int(humidity) if humidity is not None else None,
+            pressure=int(pressure) if pressure is not None else None,
+            wind_speed=series.value("wind_speed", index),
+            visibility=int(visibility) if visibility is not None else None,
+            observed_at=series.timestamps[index],
+            sunrise=None,
+            sunset=None,
+            utc_offset=series.utc_offset
+        )
+
+    @property
+    def nbytes(self):
+        return _slotted_size(self)
+
+
+# AIR QUALITY SAMPLE
+@dataclass(slots=True, frozen=True)
+class AirQualitySample:
+    """One air pollution reading. Components are in µg/m³; missing values are None."""
+    timestamp: int
+    aqi: int
+    co: float
+    no: float
+    no2: float
+    o3: float
+    so2: float
+    pm2_5: float
+    pm10: float
+    nh3: float
+
+    @classmethod
+    def from_entry(cls, entry: dict):
+        """Builds a sample from one entry of an air pollution response's "list"."""
+        components = entry.get("components", {})
+        return cls(entry.get("dt"), entry.get("main", {}).get("aqi"), *(components.get(key) for key in POLLUTANT_KEYS))
+
+    @classmethod
+    def from_response(cls, data: dict):
+        """Returns the first (current) sample of an air pollution response, or None if it has none."""
+        if not data or not data.get("list"):
+            return None
+        return cls.from_entry(data["list"][0])
+
+    @classmethod
+    def from_series(cls, series: ForecastSeries, index: int):
+        """Builds one air pollution forecast entry back out of a columnar ForecastSeries."""
+        aqi = series.value("aqi", index)
+        return cls(series.timestamps[index], int(aqi) if aqi is not None else None, *(series.value(key, index) for key in POLLUTANT_KEYS))
+
+    def components(self):
+        """Returns the pollutant values as {key: value}."""
+        return {key: getattr(self, key) for key in POLLUTANT_KEYS}
+
+    @property
+    def nbytes(self):
+        return _slotted_size(self)
+
+
+# FORECAST PARSERS
+def parse_air_pollution_forecast(data: dict):
+    """Returns a ForecastSeries for an air pollution forecast response, or None if it has no entries."""
+    if not data or not data.get("list"):
+        return None
+    return ForecastSeries.from_air_pollution(data)
+
+def parse_weather_forecast(data: dict):
+    """Returns a ForecastSeries for a 5 day / 3 hour forecast response, or None if it has no entries."""
+    if not data or not data.get("list"):
+        return None
+    return ForecastSeries.from_weather(data)
+
+
+# GUILD LOCATION
+@dataclass(slots=True)
+class GuildLocation:
+    """A server's /setlocation record. set_at is a Unix timestamp."""
+    lat: float
+    lon: float
+    display_name: str
+    set_by_user_id: int = None
+    set_at: float = None
+    utc_offset: int = None
+
+    @classmethod
+    def from_record(cls, record: dict):
+        """Builds a GuildLocation from a stored dict (set_at may be an ISO string)."""
+        set_at = record.get("set_at")
+        if isinstance(set_at, str):
+            set_at = datetime.datetime.fromisoformat(set_at).timestamp()
+        return cls(
+            lat=record["lat"],
+            lon=record["lon"],
+            display_name=record.get("display_name"),
+            set_by_user_id=record.get("set_by_user_id"),
+            set_at=set_at,
+            utc_offset=record.get("utc_offset")
+        )
+
+    def to_record(self):
+        """Returns the dict form used for storage (set_at as an ISO string)."""
+        return {
+            "lat": self.lat,
+            "lon": self.lon,
+            "display_name": self.display_name,
+            "set_by_user_id": self.set_by_user_id,
+            "set_at": datetime.datetime.fromtimestamp(self.set_at).isoformat() if self.set_at is not None else None,
+            "utc_offset": self.utc_offset
+        }
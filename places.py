@@ -0,0 +1,188 @@
+# OFFLINE PLACE INDEX
+# Imports
+import csv
+import math
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+
+EARTH_RADIUS_KM = 6371.0
+
+
+# NORMALIZES PLACE TEXT
+def normalize_place(text: str):
+    """Lowercases, strips accents and collapses whitespace, so "São  Paulo" and "sao paulo" match."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.lower().split())
+
+
+# FORMATS PLACE NAME
+def format_place_name(name: str, state: str = None, country: str = None):
+    """Builds "City, State, CC" the same way geocoding results are displayed."""
+    return ", ".join(filter(None, [name, state, country]))
+
+
+# PLACE
+@dataclass(slots=True, frozen=True)
+class Place:
+    display_name: str
+    lat: float
+    lon: float
+
+
+# CONVERTS COORDINATES TO A UNIT VECTOR
+def _unit_vector(lat: float, lon: float):
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+    return (math.cos(lat_rad) * math.cos(lon_rad), math.cos(lat_rad) * math.sin(lon_rad), math.sin(lat_rad))
+
+
+# NEAREST PLACE INDEX
+class NearestPlaceIndex:
+    """
+    k-d tree over places stored as 3D unit vectors, so distances stay correct across the antimeridian
+    and near the poles. Building is O(n log n) and a nearest lookup visits O(log n) nodes.
+    Places added after the last build are scanned linearly until REBUILD_THRESHOLD of them pile up.
+    """
+    REBUILD_THRESHOLD = 64
+
+    def __init__(self):
+        self._places = []
+        self._points = []
+        # (index, axis, left, right) nodes over self._places[:self._built_count]
+        self._tree = None
+        self._built_count = 0
+
+    def __len__(self):
+        return len(self._places)
+
+    def add(self, place):
+        self._places.append(place)
+        self._points.append(_unit_vector(place.lat, place.lon))
+
+    def _build(self, indexes: list, depth: int = 0):
+        if not indexes:
+            return None
+        axis = depth % 3
+        indexes.sort(key=lambda index: self._points[index][axis])
+        middle = len(indexes) // 2
+        return (
+            indexes[middle], axis,
+            self._build(indexes[:middle], depth + 1),
+            self._build(indexes[middle + 1:], depth + 1)
+        )
+
+    def _rebuild(self):
+        self._built_count = len(self._places)
+        self._tree = self._build(list(range(self._built_count)))
+
+    def nearest(self, lat: float, lon: float):
+        """Returns (place, distance_km) for the closest place, or (None, None) if the index is empty."""
+        if not self._places:
+            return None, None
+        if len(self._places) - self._built_count >= self.REBUILD_THRESHOLD or self._tree is None:
+            self._rebuild()
+
+        target = _unit_vector(lat, lon)
+        best = [math.inf, None]
+
+        def visit(node):
+            if node is None:
+                return
+            index, axis, left, right = node
+            point = self._points[index]
+            distance = (point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2 + (point[2] - target[2]) ** 2
+            if distance < best[0]:
+                best[0], best[1] = distance, index
+            difference = target[axis] - point[axis]
+            near, far = (left, right) if difference < 0 else (right, left)
+            visit(near)
+            # the other side can only hold something closer if the splitting plane is within range
+            if difference * difference < best[0]:
+                visit(far)
+
+        visit(self._tree)
+        for index in range(self._built_count, len(self._places)):
+            point = self._points[index]
+            distance = (point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2 + (point[2] - target[2]) ** 2
+            if distance < best[0]:
+                best[0], best[1] = distance, index
+
+        # chord length between unit vectors -> great-circle distance
+        chord = math.sqrt(best[0])
+        return self._places[best[1]], 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+# PREFIX INDEX
+class PlaceIndex:
+    """
+    Place names kept in a sorted array of normalized keys, searched by prefix with bisect.
+    Lookups are O(log n) with no I/O, so they fit well inside Discord's autocomplete deadline.
+    Also answers exact name lookups, so a name picked from autocomplete needs no geocoding request,
+    and nearest-place lookups through a NearestPlaceIndex over the same places.
+    """
+    def __init__(self):
+        self._keys = []
+        self._places = []
+        # normalized full name -> Place
+        self._by_name = {}
+        # normalized "city, country" -> Place, or None when several places share it
+        self._aliases = {}
+        self._nearest = NearestPlaceIndex()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, display_name: str, lat: float, lon: float, country: str = None):
+        """Adds a place unless one with the same name is already indexed. Returns the indexed Place."""
+        key = normalize_place(display_name)
+        existing = self._by_name.get(key)
+        if existing is not None:
+            return existing
+        place = Place(display_name, lat, lon)
+        position = bisect_left(self._keys, key)
+        self._keys.insert(position, key)
+        self._places.insert(position, place)
+        self._by_name[key] = place
+        self._nearest.add(place)
+        # "London, GB" for "London, England, GB"
+        if country:
+            alias = normalize_place(format_place_name(display_name.split(",")[0], None, country))
+            if alias != key:
+                self._aliases[alias] = place if alias not in self._aliases else None
+        return place
+
+    def load_csv(self, path: str):
+        """Adds every row of a name,state,country,lat,lon CSV file. Returns the number of rows read."""
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                rows = list(csv.DictReader(f))
+        except FileNotFoundError:
+            print(f"Place list {path} not found, autocomplete will only offer previously geocoded names.")
+            return 0
+        for row in rows:
+            self.add(
+                format_place_name(row["name"], row.get("state"), row.get("country")),
+                float(row["lat"]), float(row["lon"]), row.get("country")
+            )
+        return len(rows)
+
+    def search(self, prefix: str, limit: int = 25):
+        """Returns up to limit places whose name starts with prefix, in alphabetical order."""
+        key = normalize_place(prefix)
+        results = []
+        position = bisect_left(self._keys, key)
+        while position < len(self._keys) and len(results) < limit and self._keys[position].startswith(key):
+            results.append(self._places[position])
+            position += 1
+        return results
+
+    def nearest(self, lat: float, lon: float):
+        """Returns (place, distance_km) for the indexed place closest to lat/lon, or (None, None)."""
+        return self._nearest.nearest(float(lat), float(lon))
+
+    def resolve(self, name: str):
+        """Returns the Place with exactly this name (or an unambiguous "city, country" alias), or None."""
+        key = normalize_place(name)
+        return self._by_name.get(key) or self._aliases.get(key)
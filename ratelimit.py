@@ -0,0 +1,138 @@
+# CLIENT-SIDE RATE LIMITING FOR OPENWEATHERMAP
+# Imports
+import asyncio
+import datetime
+import json
+import os
+import sqlite3
+import time
+
+
+# TOKEN BUCKET
+class TokenBucket:
+    """
+    Token bucket shared by every OpenWeatherMap endpoint.
+    Refills at rate_per_minute and allows bursts up to `burst` calls.
+    Waiters are served in FIFO order.
+    """
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, max_wait: float = None):
+        """
+        Takes one token, sleeping until one is available.
+        Returns False without taking a token if that would take longer than max_wait seconds.
+        """
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        try:
+            await asyncio.wait_for(self._lock.acquire(), max_wait)
+        except asyncio.TimeoutError:
+            return False
+        try:
+            self._refill()
+            if self.tokens < 1:
+                wait = (1 - self.tokens) / self.rate
+                if deadline is not None and time.monotonic() + wait > deadline:
+                    return False
+                await asyncio.sleep(wait)
+                self._refill()
+            self.tokens -= 1
+            return True
+        finally:
+            self._lock.release()
+
+
+# DAILY QUOTA COUNTER
+class DailyQuota:
+    """
+    Counts API calls per UTC day and persists the count so restarts don't reset it.
+    The last reserve_fraction of the budget is kept for requests that have no cached fallback.
+    With a shared_cache (sharedcache.SharedCache) the count is kept there instead of in file_path,
+    so every shard process draws from one budget; each save adds this process's calls and reads back the total.
+    """
+    def __init__(self, file_path: str, daily_limit: int, reserve_fraction: float, save_every: int, shared_cache=None):
+        self.file_path = file_path
+        self.shared_cache = shared_cache
+        self.daily_limit = daily_limit
+        self.reserve_fraction = reserve_fraction
+        self.save_every = save_every
+        self.day = self._today()
+        self.count = 0
+        self._unsaved = 0
+        self._load()
+
+    @staticmethod
+    def _today():
+        return datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+
+    def _load(self):
+        if self.shared_cache is not None:
+            self.count = self.shared_cache.read_calls(self.day)
+            return
+        try:
+            with open(self.file_path, 'r') as file:
+                data = json.load(file)
+            if data.get("day") == self.day:
+                self.count = int(data.get("count", 0))
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, ValueError, AttributeError):
+            print(f"Error reading API quota file {self.file_path}. Starting today's count from 0.")
+
+    def _write(self, data):
+        temp_path = self.file_path + ".tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(data, file)
+        os.replace(temp_path, self.file_path)
+
+    def _roll_over(self):
+        today = self._today()
+        if today != self.day:
+            self.day = today
+            self.count = 0
+            self._unsaved = 0
+
+    def remaining(self):
+        self._roll_over()
+        return max(0, self.daily_limit - self.count)
+
+    def is_exhausted(self):
+        return self.remaining() <= 0
+
+    def is_nearly_exhausted(self):
+        return self.remaining() <= self.daily_limit * self.reserve_fraction
+
+    async def record(self):
+        """Counts one API call, saving to disk every save_every calls."""
+        self._roll_over()
+        self.count += 1
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            await self.save()
+
+    async def save(self):
+        """Writes the current count to disk off the event loop."""
+        unsaved, self._unsaved = self._unsaved, 0
+        if self.shared_cache is not None:
+            try:
+                total = await self.shared_cache.add_calls(self.day, unsaved)
+            except sqlite3.Error as e:
+                print(f"Error saving API quota to {self.shared_cache.db_path}: {e}")
+                self._unsaved += unsaved
+                return
+            # calls recorded while the write was running are still unsaved
+            self.count = total + self._unsaved
+            return
+        try:
+            await asyncio.to_thread(self._write, {"day": self.day, "count": self.count})
+        except OSError as e:
+            print(f"Error saving API quota to {self.file_path}: {e}")
@@ -0,0 +1,353 @@
+# EMBED RENDERING
+# Static tables and the static /aqi_info embed are built once at import.
+# Data embeds are memoized per (command, cached data object, location display, timezone), so repeat
+# lookups of the same cached response reuse the embed that was already built.
+# Imports
+import datetime
+import time
+
+import discord
+
+import cache
+import config
+import forecast
+import metrics
+import utils
+from models import AirQualitySample, CurrentWeather, ForecastSeries
+
+# AQI index -> embed color
+AQI_COLORS = {
+    1: discord.Color.green(),
+    2: discord.Color.yellow(),
+    3: discord.Color.orange(),
+    4: discord.Color.red(),
+    5: discord.Color.purple()
+}
+
+# pollutant key -> label, short form for current readings and long form for forecasts
+POLLUTANT_SHORT_NAMES = {
+    "co": "CO", "no": "NO", "no2": "NO₂", "o3": "O₃",
+    "so2": "SO₂", "pm2_5": "PM₂.₅", "pm10": "PM₁₀", "nh3": "NH₃"
+}
+POLLUTANT_LONG_NAMES = {
+    "co": "CO (Carbon Monoxide)",
+    "no": "NO (Nitrogen Monoxide)",
+    "no2": "NO₂ (Nitrogen Dioxide)",
+    "o3": "O₃ (Ozone)",
+    "so2": "SO₂ (Sulphur Dioxide)",
+    "pm2_5": "PM₂.₅ (Fine Particles)",
+    "pm10": "PM₁₀ (Coarse Particles)",
+    "nh3": "NH₃ (Ammonia)"
+}
+POLLUTANT_UNIT = "µg/m³"
+
+# weather description (lowercase) -> embed color
+WEATHER_CONDITION_COLORS = {
+    "clear sky": discord.Color.from_rgb(135, 206, 235), # Sky blue
+    "few clouds": discord.Color.from_rgb(173, 216, 230), # Light blue
+    "scattered clouds": discord.Color.from_rgb(211, 211, 211), # Light gray
+    "broken clouds": discord.Color.from_rgb(169, 169, 169), # Dark gray
+    "shower rain": discord.Color.from_rgb(0, 191, 255), # Deep sky blue
+    "rain": discord.Color.from_rgb(30, 144, 255), # Dodger blue
+    "thunderstorm": discord.Color.from_rgb(255, 140, 0), # Dark orange
+    "snow": discord.Color.from_rgb(240, 248, 255), # Alice blue
+    "mist": discord.Color.from_rgb(192, 192, 192), # Silver
+}
+
+
+# BUILDS AQI INFO EMBED
+def _build_aqi_info_embed():
+    embed = discord.Embed(
+        title="Air Quality Index (AQI) Categories",
+        description="Understanding AQI values and their health implications.",
+        color=discord.Color.blue()
+    )
+    embed.add_field(name="1 - Good", value="Air quality is considered satisfactory, and air pollution poses little or no risk.", inline=False)
+    embed.add_field(name="2 - Fair", value="Air quality is acceptable; however, some pollutants may be a concern for a small number of people.", inline=False)
+    embed.add_field(name="3 - Moderate", value="Air quality is acceptable; however, some pollutants may be a concern for a small number of people.", inline=False)
+    embed.add_field(name="4 - Poor", value="Everyone may begin to experience health effects; members of sensitive groups may experience more serious health effects.", inline=False)
+    embed.add_field(name="5 - Very Poor", value="Everyone may begin to experience health effects; members of sensitive groups may experience more serious health effects.", inline=False)
+    embed.set_footer(text="Categories based on OpenWeatherMap AQI scale.")
+    return embed
+
+AQI_INFO_EMBED = _build_aqi_info_embed()
+
+# Rendered embeds, value is (source data, embed); bounded by entry count only
+render_cache = cache.TTLCache(config.RENDER_CACHE_MAX_ENTRIES, max_bytes=0)
+
+
+metrics.registry.add_collector(
+    lambda: [(f"cache_{stat}", (("cache", "render"),), value) for stat, value in render_cache.stats().items()]
+)
+
+
+# GETS OR BUILDS AN EMBED
+def _memoized(command: str, data, key_parts: tuple, builder, *args):
+    """
+    Returns the embed previously built by `command` for this exact data object, or builds and stores it.
+    The cached data object is kept alongside the embed, so a refreshed response (a new object) never matches.
+    """
+    key = (command, id(data)) + key_parts
+    entry = render_cache.get(key)
+    if entry is not None and entry[0] is data:
+        return entry[1]
+    embed = builder(data, *args)
+    if embed is not None:
+        render_cache.set(key, (data, embed), config.RENDER_CACHE_TTL)
+    return embed
+
+
+# FORMATS POLLUTANT COMPONENTS
+def _components_field(embed: discord.Embed, components: dict, names: dict):
+    components_text_parts = []
+    for key, name in names.items():
+        value = components.get(key)
+        if value is not None:
+            components_text_parts.append(f"**{name}**: {value:.2f} {POLLUTANT_UNIT}")
+
+    if components_text_parts:
+        embed.add_field(name="🧪 Pollutant Components", value="\n".join(components_text_parts), inline=False)
+    else:
+        embed.add_field(name="🧪 Pollutant Components", value="No specific component data available.", inline=False)
+
+
+# FORMATS TEMPERATURE
+def _temperature_value(temp_kelvin, feels_like_kelvin):
+    """Returns the "°C / °F" temperature field text (with feels-like when known)."""
+    if temp_kelvin is None:
+        return "N/A"
+    temp_celsius = temp_kelvin - 273.15
+    temp_display_value = f"{temp_celsius:.1f}°C / {temp_celsius * 9/5 + 32:.1f}°F"
+    if feels_like_kelvin is not None:
+        feels_like_celsius = feels_like_kelvin - 273.15
+        temp_display_value += f"\n(Feels like: {feels_like_celsius:.1f}°C / {feels_like_celsius * 9/5 + 32:.1f}°F)"
+    return temp_display_value
+
+
+# FORMATS DAY LABEL
+def _day_label(day: int):
+    return datetime.datetime.fromtimestamp(day * forecast.SECONDS_PER_DAY, tz=datetime.timezone.utc).strftime('%a, %b %d')
+
+
+# BUILDS CURRENT AQI EMBED
+def _build_current_aqi_embed(sample: AirQualitySample, effective_display: str, utc_offset: int):
+    aqi_index = sample.aqi if sample.aqi is not None else "N/A"
+
+    current_date_str = "N/A"
+    if sample.timestamp:
+        local_datetime = datetime.datetime.fromtimestamp(sample.timestamp, tz=utils.get_timezone(utc_offset))
+        current_date_str = local_datetime.strftime('%B %d, %Y')
+
+    embed = discord.Embed(
+        title=f"Current Air Pollution for {effective_display}",
+        description=f"Air Quality Index for Today ({current_date_str})",
+        color=AQI_COLORS.get(aqi_index, discord.Color.blue())
+    )
+    embed.set_footer(text="Air quality data provided by OpenWeatherMap")
+    embed.add_field(name="💨 Air Quality Index (AQI)", value=f"{aqi_index} - {utils.get_aqi_category(aqi_index)}", inline=False)
+    _components_field(embed, sample.components(), POLLUTANT_SHORT_NAMES)
+    return embed
+
+def current_aqi_embed(sample: AirQualitySample, effective_display: str, utc_offset: int):
+    """Embed for a current air pollution reading."""
+    return _memoized("aqi_c", sample, (effective_display, utc_offset), _build_current_aqi_embed, effective_display, utc_offset)
+
+
+# BUILDS AQI FORECAST EMBED
+def _build_aqi_forecast_embed(series: ForecastSeries, effective_display: str, utc_offset: int):
+    location_timezone = utils.get_timezone(utc_offset)
+
+    # entry closest to noon tomorrow (location time), or the next available future entry
+    selected_index = series.select_tomorrow(time.time(), utc_offset)
+    if selected_index is None:
+        return None
+
+    # only the selected entry is turned back into an object
+    sample = AirQualitySample.from_series(series, selected_index)
+    aqi_index = sample.aqi if sample.aqi is not None else "N/A"
+
+    # Convert to the location's time for display
+    local_datetime_display = datetime.datetime.fromtimestamp(sample.timestamp, tz=location_timezone)
+    forecast_date_str = local_datetime_display.strftime('%B %d, %Y at %I:%M %p %Z')
+
+    embed = discord.Embed(
+        title=f"Air Pollution Forecast for {effective_display}",
+        description=f"Forecast for: {forecast_date_str}",
+        color=AQI_COLORS.get(aqi_index, discord.Color.blue())
+    )
+    embed.set_footer(text="Air quality data provided by OpenWeatherMap")
+    embed.add_field(name="💨 Air Quality Index (AQI)", value=f"{aqi_index} - {utils.get_aqi_category(aqi_index)}", inline=False)
+    _components_field(embed, sample.components(), POLLUTANT_LONG_NAMES)
+
+    # per-day outlook for the whole forecast window
+    outlook_lines = []
+    pm2_5_by_day = {day: (low, mean, high) for day, low, mean, high, _ in series.daily_summary("pm2_5", utc_offset)}
+    for day, _, _, worst_aqi, worst_index in series.daily_summary("aqi", utc_offset):
+        worst_time = datetime.datetime.fromtimestamp(series.timestamps[worst_index], tz=location_timezone)
+        line = f"**{_day_label(day)}**: worst AQI {int(worst_aqi)} ({utils.get_aqi_category(int(worst_aqi))}) around {worst_time.strftime('%I %p')}"
+        if day in pm2_5_by_day:
+            low, mean, high = pm2_5_by_day[day]
+            line += f" · PM₂.₅ {low:.1f}/{mean:.1f}/{high:.1f} µg/m³"
+        outlook_lines.append(line)
+    if outlook_lines:
+        embed.add_field(name="📅 Daily Outlook (PM₂.₅ min/avg/max)", value="\n".join(outlook_lines), inline=False)
+    return embed
+
+def aqi_forecast_embed(series: ForecastSeries, effective_display: str, utc_offset: int):
+    """Embed for an air pollution forecast, or None if no suitable entry is found."""
+    # the selected entry depends on what "tomorrow" is at the location
+    today = ForecastSeries.day_number(time.time(), utc_offset)
+    return _memoized("aqi_f", series, (effective_display, utc_offset, today), _build_aqi_forecast_embed, effective_display, utc_offset)
+
+
+# BUILDS CURRENT WEATHER EMBED
+def _build_current_weather_embed(weather: CurrentWeather, effective_display: str, utc_offset: int):
+    location_timezone = utils.get_timezone(weather.utc_offset if weather.utc_offset is not None else utc_offset)
+
+    description = (weather.description or "N/A").capitalize()
+    icon_url = f"http://openweathermap.org/img/wn/{weather.icon}@2x.png" if weather.icon else None
+
+    current_date_str = "N/A"
+    if weather.observed_at:
+        # Convert to the location's time for display
+        local_datetime_display = datetime.datetime.fromtimestamp(weather.observed_at, tz=location_timezone)
+        current_date_str = local_datetime_display.strftime('%B %d, %Y at %I:%M %p %Z')
+
+    embed = discord.Embed(
+        title=f"Current Weather for {effective_display}",
+        description=f"*{description}*",
+        color=WEATHER_CONDITION_COLORS.get(description.lower(), discord.Color.blue())
+    )
+    if icon_url:
+        embed.set_thumbnail(url=icon_url)
+
+    embed.add_field(name="🌡️ Temperature", value=_temperature_value(weather.temp, weather.feels_like), inline=False)
+    embed.add_field(name="💧 Humidity", value=f"{weather.humidity}%" if weather.humidity is not None else "N/A", inline=True)
+    embed.add_field(name="🌬️ Wind", value=f"{weather.wind_speed} m/s" if weather.wind_speed is not None else "N/A", inline=True)
+    embed.add_field(name="📊 Pressure", value=f"{weather.pressure} hPa" if weather.pressure is not None else "N/A", inline=True)
+    if weather.visibility is not None:
+        embed.add_field(name="👁️ Visibility", value=f"{weather.visibility/1000:.1f} km", inline=True)
+
+    if weather.sunrise is not None and weather.sunset is not None:
+        sunrise_local = datetime.datetime.fromtimestamp(weather.sunrise, tz=location_timezone)
+        sunset_local = datetime.datetime.fromtimestamp(weather.sunset, tz=location_timezone)
+        embed.add_field(name="☀️ Sunrise", value=sunrise_local.strftime('%I:%M %p %Z'), inline=True)
+        embed.add_field(name="🌙 Sunset", value=sunset_local.strftime('%I:%M %p %Z'), inline=True)
+
+    embed.set_footer(text=f"Data observed around: {current_date_str}\nWeather data provided by OpenWeatherMap")
+    return embed
+
+def current_weather_embed(weather: CurrentWeather, effective_display: str, utc_offset: int):
+    """Embed for current weather. Times are shown in the location's timezone."""
+    return _memoized("weather", weather, (effective_display, utc_offset), _build_current_weather_embed, effective_display, utc_offset)
+
+
+# BUILDS WEATHER FORECAST EMBED
+def _build_weather_forecast_embed(series: ForecastSeries, effective_display: str, utc_offset: int):
+    location_timezone = utils.get_timezone(utc_offset)
+
+    # entry closest to noon tomorrow (location time), or the next available future entry
+    selected_index = series.select_tomorrow(time.time(), utc_offset)
+    if selected_index is None:
+        return None
+
+    # only the selected entry is turned back into an object
+    entry = CurrentWeather.from_series(series, selected_index)
+    description = (entry.description or "N/A").capitalize()
+    icon_url = f"http://openweathermap.org/img/wn/{entry.icon}@2x.png" if entry.icon else None
+
+    local_datetime_display = datetime.datetime.fromtimestamp(entry.observed_at, tz=location_timezone)
+    forecast_date_str = local_datetime_display.strftime('%B %d, %Y at %I:%M %p %Z')
+
+    embed = discord.Embed(
+        title=f"Weather Forecast for {effective_display}",
+        description=f"*{description}*",
+        color=WEATHER_CONDITION_COLORS.get(description.lower(), discord.Color.blue())
+    )
+    if icon_url:
+        embed.set_thumbnail(url=icon_url)
+
+    embed.add_field(name="🌡️ Temperature", value=_temperature_value(entry.temp, entry.feels_like), inline=False)
+    embed.add_field(name="💧 Humidity", value=f"{entry.humidity}%" if entry.humidity is not None else "N/A", inline=True)
+    embed.add_field(name="🌬️ Wind", value=f"{entry.wind_speed} m/s" if entry.wind_speed is not None else "N/A", inline=True)
+    embed.add_field(name="📊 Pressure", value=f"{entry.pressure} hPa" if entry.pressure is not None else "N/A", inline=True)
+
+    # per-day outlook for the whole forecast window
+    outlook_lines = []
+    humidity_by_day = {day: mean for day, _, mean, _, _ in series.daily_summary("humidity", utc_offset)}
+    for day, low, mean, high, _ in series.daily_summary("temp", utc_offset):
+        line = f"**{_day_label(day)}**: {low - 273.15:.1f}°C – {high - 273.15:.1f}°C (avg {mean - 273.15:.1f}°C)"
+        if day in humidity_by_day:
+            line += f" · 💧 {humidity_by_day[day]:.0f}%"
+        outlook_lines.append(line)
+    if outlook_lines:
+        embed.add_field(name="📅 Daily Outlook", value="\n".join(outlook_lines), inline=False)
+
+    embed.set_footer(text=f"Forecast for: {forecast_date_str}\nWeather data provided by OpenWeatherMap")
+    return embed
+
+def weather_forecast_embed(series: ForecastSeries, effective_display: str, utc_offset: int):
+    """Embed for a 5 day / 3 hour forecast, or None if no suitable entry is found."""
+    # the forecast response carries the location's own offset
+    if series.utc_offset is not None:
+        utc_offset = series.utc_offset
+    today = ForecastSeries.day_number(time.time(), utc_offset)
+    return _memoized("weather_f", series, (effective_display, utc_offset, today), _build_weather_forecast_embed, effective_display, utc_offset)
+
+
+# BUILDS AQI HISTORY EMBED
+def aqi_history_embed(daily_rows: list, hourly_rows: list, effective_display: str, first_day: int, last_day: int, utc_offset: int):
+    """
+    Embed for /aqi_history from a history store's rollups: daily_rows are (day, {column: (count, mean, min, max)})
+    for local days first_day..last_day, hourly_rows the same per UTC hour over that period.
+    Not memoized, the rollups change with every recorded sample.
+    """
+    day_count = last_day - first_day + 1
+    location_timezone = utils.get_timezone(utc_offset)
+
+    # period average, weighted by the number of samples each day
+    aqi_samples = sum(columns["aqi"][0] for _, columns in daily_rows if "aqi" in columns)
+    aqi_total = sum(columns["aqi"][0] * columns["aqi"][1] for _, columns in daily_rows if "aqi" in columns)
+    pm2_5_samples = sum(columns["pm2_5"][0] for _, columns in daily_rows if "pm2_5" in columns)
+    pm2_5_total = sum(columns["pm2_5"][0] * columns["pm2_5"][1] for _, columns in daily_rows if "pm2_5" in columns)
+    average_aqi = aqi_total / aqi_samples if aqi_samples else None
+
+    embed = discord.Embed(
+        title=f"Air Quality History for {effective_display}",
+        color=AQI_COLORS.get(round(average_aqi) if average_aqi is not None else None, discord.Color.blue())
+    )
+
+    # one line per day, gaps included so missing days stand out
+    rows_by_day = dict(daily_rows)
+    table_lines = [f"{'Day':<11} {'AQI avg/max':>11}  {'PM2.5 avg/max':>13}"]
+    for day in range(first_day, last_day + 1):
+        columns = rows_by_day.get(day, {})
+        aqi_text = f"{columns['aqi'][1]:.1f} / {columns['aqi'][3]:.0f}" if "aqi" in columns else "–"
+        pm2_5_text = f"{columns['pm2_5'][1]:.1f} / {columns['pm2_5'][3]:.1f}" if "pm2_5" in columns else "–"
+        table_lines.append(f"{_day_label(day):<11} {aqi_text:>11}  {pm2_5_text:>13}")
+    embed.description = f"Last {day_count} days ({POLLUTANT_UNIT})\n```\n" + "\n".join(table_lines) + "\n```"
+
+    if average_aqi is not None:
+        embed.add_field(
+            name="💨 Average AQI",
+            value=f"{average_aqi:.1f} - {utils.get_aqi_category(round(average_aqi))}",
+            inline=True
+        )
+    if pm2_5_samples:
+        embed.add_field(name="🧪 Average PM₂.₅", value=f"{pm2_5_total / pm2_5_samples:.1f} {POLLUTANT_UNIT}", inline=True)
+
+    aqi_hours = [(columns["aqi"][3], hour_start) for hour_start, columns in hourly_rows if "aqi" in columns]
+    if aqi_hours:
+        # the most recent of the worst hours
+        worst_aqi, worst_hour = max(aqi_hours)
+        worst_time = datetime.datetime.fromtimestamp(worst_hour, tz=location_timezone)
+        embed.add_field(
+            name="⚠️ Worst Hour",
+            value=f"AQI {worst_aqi:.0f} ({utils.get_aqi_category(int(worst_aqi))}) on {worst_time.strftime('%b %d at %I %p')}",
+            inline=False
+        )
+        poor_hours = sum(1 for aqi, _ in aqi_hours if aqi >= 4)
+        embed.add_field(name="🔴 Hours Poor or Worse", value=str(poor_hours), inline=True)
+    embed.add_field(name="📈 Coverage", value=f"{len(hourly_rows)} of {day_count * 24} hours recorded", inline=True)
+    embed.set_footer(text="Recorded from OpenWeatherMap air quality data")
+    return embed
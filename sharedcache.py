@@ -0,0 +1,123 @@
+# CROSS-PROCESS RESPONSE CACHE
+# Imports
+import asyncio
+import sqlite3
+import threading
+import time
+
+
+# SHARED CACHE
+class SharedCache:
+    """
+    Second-level response cache in one SQLite file (WAL mode) shared by every shard process.
+    Stores the raw JSON body of cacheable OpenWeatherMap responses with a wall-clock expiry, so a response
+    fetched by one process is parsed into the in-process cache of another instead of being fetched again.
+    Also holds the day's combined API call count for the shared daily quota.
+    All disk I/O runs in a worker thread.
+    """
+    # expired rows are kept this long as stale fallbacks, then purged
+    STALE_KEEP_SECONDS = 86400
+    PURGE_EVERY_WRITES = 500
+    READ_BATCH_SIZE = 500
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # a lost cache write after a power cut only costs a refetch
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, body TEXT NOT NULL, expires_at REAL NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS api_calls (day TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def make_key(cache_key: tuple):
+        """Turns an in-process cache key (url, lat, lon) into the text key stored in SQLite."""
+        return "|".join(str(part) for part in cache_key)
+
+    def _read(self, key):
+        with self._lock:
+            return self._connect().execute("SELECT body, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+
+    def _read_many(self, keys):
+        rows = {}
+        with self._lock:
+            conn = self._connect()
+            # stay under SQLite's bound parameter limit
+            for start in range(0, len(keys), self.READ_BATCH_SIZE):
+                batch = keys[start:start + self.READ_BATCH_SIZE]
+                rows.update((key, (body, expires_at)) for key, body, expires_at in conn.execute(
+                    f"SELECT key, body, expires_at FROM responses WHERE key IN ({', '.join('?' * len(batch))})", batch
+                ))
+        return rows
+
+    def _write(self, key, body, expires_at):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, body, expires_at, time.time()))
+                self._writes += 1
+                if self._writes % self.PURGE_EVERY_WRITES == 0:
+                    conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time() - self.STALE_KEEP_SECONDS,))
+
+    def _add_calls(self, day, count):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT INTO api_calls VALUES (?, ?) ON CONFLICT(day) DO UPDATE SET count = count + excluded.count",
+                    (day, count)
+                )
+                conn.execute("DELETE FROM api_calls WHERE day < ?", (day,))
+                return conn.execute("SELECT count FROM api_calls WHERE day = ?", (day,)).fetchone()[0]
+
+    def read_calls(self, day: str):
+        """Returns the combined API call count recorded for day. Blocking, meant for startup."""
+        with self._lock:
+            row = self._connect().execute("SELECT count FROM api_calls WHERE day = ?", (day,)).fetchone()
+        return row[0] if row else 0
+
+    async def get(self, cache_key: tuple):
+        """Returns (body, expires_at) for a stored response, expired or not, or None if it isn't stored."""
+        try:
+            return await asyncio.to_thread(self._read, self.make_key(cache_key))
+        except sqlite3.Error as e:
+            print(f"Error reading shared cache {self.db_path}: {e}")
+            return None
+
+    async def get_many(self, cache_keys: list):
+        """Returns {cache_key: (body, expires_at)} for the stored responses among cache_keys, expired or not."""
+        keys = {self.make_key(cache_key): cache_key for cache_key in cache_keys}
+        try:
+            rows = await asyncio.to_thread(self._read_many, list(keys))
+        except sqlite3.Error as e:
+            print(f"Error reading shared cache {self.db_path}: {e}")
+            return {}
+        return {keys[key]: row for key, row in rows.items()}
+
+    async def set(self, cache_key: tuple, body: str, ttl: float):
+        """Stores a response body for ttl seconds."""
+        try:
+            await asyncio.to_thread(self._write, self.make_key(cache_key), body, time.time() + ttl)
+        except sqlite3.Error as e:
+            print(f"Error writing shared cache {self.db_path}: {e}")
+
+    async def add_calls(self, day: str, count: int):
+        """Adds count API calls to day's shared total and returns the new total."""
+        return await asyncio.to_thread(self._add_calls, day, count)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,85 @@
+import unittest
+from unittest import mock
+
+import cache
+
+
+class TTLCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("cache.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = cache.TTLCache(max_entries=3, max_bytes=100)
+
+    def test_entries_expire_after_their_ttl(self):
+        self.cache.set("a", 1, ttl=10)
+        self.now += 9.5
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertAlmostEqual(self.cache.expires_in("a"), 0.5)
+        self.now += 0.5
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_expired_entries_stay_readable_as_stale(self):
+        self.cache.set("a", 1, ttl=10)
+        self.now += 60
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.get_stale("a"), 1)
+        self.assertEqual(self.cache.peek("a"), 1)
+        self.assertLess(self.cache.expires_in("a"), 0)
+        self.assertEqual(self.cache.stats()["stale_hits"], 1)
+        self.assertIsNone(self.cache.get_stale("missing"))
+        self.assertIsNone(self.cache.expires_in("missing"))
+
+    def test_setting_a_key_again_replaces_value_and_expiry(self):
+        self.cache.set("a", 1, ttl=10, size=40)
+        self.now += 8
+        self.cache.set("a", 2, ttl=10, size=30)
+        self.now += 8
+        self.assertEqual(self.cache.get("a"), 2)
+        self.assertEqual(self.cache.current_bytes, 30)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_least_recently_used_entry_is_evicted_over_the_entry_cap(self):
+        for key in "abc":
+            self.cache.set(key, key, ttl=60)
+        # reading "a" makes "b" the least recently used
+        self.cache.get("a")
+        self.cache.set("d", "d", ttl=60)
+        self.assertIsNone(self.cache.peek("b"))
+        self.assertEqual([key for key in "acd" if self.cache.peek(key) is not None], ["a", "c", "d"])
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_peek_does_not_change_eviction_order(self):
+        for key in "abc":
+            self.cache.set(key, key, ttl=60)
+        self.cache.peek("a")
+        self.cache.set("d", "d", ttl=60)
+        self.assertIsNone(self.cache.peek("a"))
+
+    def test_byte_cap_evicts_until_the_new_entry_fits(self):
+        self.cache.set("a", 1, ttl=60, size=40)
+        self.cache.set("b", 2, ttl=60, size=40)
+        self.cache.set("c", 3, ttl=60, size=50)
+        self.assertIsNone(self.cache.peek("a"))
+        self.assertEqual(self.cache.current_bytes, 90)
+        self.cache.set("d", 4, ttl=60, size=100)
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.current_bytes, 100)
+        self.assertEqual(self.cache.evictions, 3)
+
+    def test_entry_larger_than_the_byte_cap_is_not_stored(self):
+        self.cache.set("a", 1, ttl=60, size=10)
+        self.cache.set("big", 2, ttl=60, size=101)
+        self.assertIsNone(self.cache.peek("big"))
+        self.assertEqual(self.cache.peek("a"), 1)
+
+    def test_location_keys_round_coordinates(self):
+        self.assertEqual(cache.make_location_key("url", 37.30221, -120.4829, 2), ("url", 37.3, -120.48))
+        self.assertEqual(cache.make_location_key("url", "37.299", "-120.481", 2), cache.make_location_key("url", 37.3, -120.48, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from unittest import mock
+
+import circuit
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("circuit.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = circuit.CircuitBreaker("weather", failure_threshold=3, reset_timeout=30)
+
+    def open_breaker(self):
+        with mock.patch("builtins.print"):
+            for _ in range(3):
+                self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        with mock.patch("builtins.print"):
+            self.breaker.record_failure()
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, circuit.CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+        self.open_breaker()
+        self.assertEqual(self.breaker.state, circuit.CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_success_resets_the_failure_count(self):
+        with mock.patch("builtins.print"):
+            self.breaker.record_failure()
+            self.breaker.record_failure()
+            self.breaker.record_success()
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, circuit.CircuitBreaker.CLOSED)
+
+    def test_half_open_lets_one_trial_through_after_the_timeout(self):
+        self.open_breaker()
+        self.now += 29
+        self.assertFalse(self.breaker.allow_request())
+        self.now += 1
+        self.assertTrue(self.breaker.allow_request())
+        self.assertEqual(self.breaker.state, circuit.CircuitBreaker.HALF_OPEN)
+        self.assertFalse(self.breaker.allow_request())
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, circuit.CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_failed_trial_opens_the_circuit_again(self):
+        self.open_breaker()
+        self.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        with mock.patch("builtins.print"):
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, circuit.CircuitBreaker.OPEN)
+        # the timeout starts over from the failed trial
+        self.now += 29
+        self.assertFalse(self.breaker.allow_request())
+        self.now += 1
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_cancelled_trial_frees_the_slot(self):
+        self.open_breaker()
+        self.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.cancel_request()
+        self.assertEqual(self.breaker.state, circuit.CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+
+
+class BackoffDelayTest(unittest.TestCase):
+    def test_delay_grows_exponentially_up_to_the_cap(self):
+        with mock.patch("circuit.random.uniform", side_effect=lambda low, high: high):
+            self.assertEqual([circuit.backoff_delay(attempt, 0.5, 5) for attempt in range(6)], [0.5, 1, 2, 4, 5, 5])
+        for attempt in range(6):
+            self.assertTrue(0 <= circuit.backoff_delay(attempt, 0.5, 5) <= 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import calendar
+import unittest
+
+import forecast
+from forecast import ForecastSeries
+
+HOUR = 3600
+DAY = 86400
+
+
+def air_pollution_response(start, count, step=HOUR, aqi=lambda index: index % 5 + 1):
+    return {"list": [
+        {"dt": start + index * step, "main": {"aqi": aqi(index)}, "components": {"pm2_5": float(index)}}
+        for index in range(count)
+    ]}
+
+
+class ForecastSeriesTest(unittest.TestCase):
+    def setUp(self):
+        self.start = calendar.timegm((2024, 3, 10, 0, 0, 0))
+        self.day = self.start // DAY
+        # four days of hourly entries from midnight UTC
+        self.series = ForecastSeries.from_air_pollution(air_pollution_response(self.start, 96))
+
+    def test_regular_timestamps_are_compressed(self):
+        self.assertIsInstance(self.series.timestamps, forecast.RegularTimestamps)
+        self.assertEqual(self.series.timestamps[-1], self.start + 95 * HOUR)
+        irregular = ForecastSeries.from_air_pollution({"list": [{"dt": self.start}, {"dt": self.start + HOUR}, {"dt": self.start + 3 * HOUR}]})
+        self.assertNotIsInstance(irregular.timestamps, forecast.RegularTimestamps)
+
+    def test_day_number_follows_the_local_date(self):
+        six_am_utc = self.start + 6 * HOUR
+        self.assertEqual(ForecastSeries.day_number(six_am_utc, 0), self.day)
+        self.assertEqual(ForecastSeries.day_number(six_am_utc, -7 * HOUR), self.day - 1)
+        self.assertEqual(ForecastSeries.day_number(six_am_utc, -6 * HOUR), self.day)
+        self.assertEqual(ForecastSeries.day_number(self.start + 20 * HOUR, 5 * HOUR + 1800), self.day + 1)
+
+    def test_day_bounds_across_utc_offsets(self):
+        self.assertEqual(self.series.day_bounds(self.day, 0), (0, 24))
+        # local midnight at UTC-7 is 07:00 UTC
+        self.assertEqual(self.series.day_bounds(self.day, -7 * HOUR), (7, 31))
+        # local midnight at UTC+9 is 15:00 UTC the day before, before the series starts
+        self.assertEqual(self.series.day_bounds(self.day, 9 * HOUR), (0, 15))
+        self.assertEqual(self.series.day_bounds(self.day + 1, 9 * HOUR), (15, 39))
+        # the last local day is cut off where the series ends
+        self.assertEqual(self.series.day_bounds(self.day + 3, -7 * HOUR), (79, 96))
+        self.assertEqual(self.series.day_bounds(self.day + 5, 0), (96, 96))
+
+    def test_select_tomorrow_picks_local_noon(self):
+        now = self.start + 20 * HOUR
+        cases = [
+            (0, calendar.timegm((2024, 3, 11, 12, 0, 0))),
+            # 13:00 on the 10th locally, so tomorrow is the 11th and noon is 19:00 UTC
+            (-7 * HOUR, calendar.timegm((2024, 3, 11, 19, 0, 0))),
+            # already 05:00 on the 11th locally, so tomorrow is the 12th and noon is 03:00 UTC
+            (9 * HOUR, calendar.timegm((2024, 3, 12, 3, 0, 0))),
+        ]
+        for utc_offset, expected in cases:
+            with self.subTest(utc_offset=utc_offset):
+                index = self.series.select_tomorrow(now, utc_offset)
+                self.assertEqual(self.series.timestamps[index], expected)
+
+    def test_select_tomorrow_with_a_half_hour_offset_uses_the_nearest_entry(self):
+        now = self.start + 20 * HOUR
+        index = self.series.select_tomorrow(now, 5 * HOUR + 1800)
+        # local noon on the 12th is 06:30 UTC, half an hour from either hourly entry
+        self.assertEqual(abs(self.series.timestamps[index] - calendar.timegm((2024, 3, 12, 6, 30, 0))), 1800)
+        self.assertEqual(ForecastSeries.day_number(self.series.timestamps[index], 5 * HOUR + 1800), self.day + 2)
+
+    def test_select_tomorrow_on_three_hourly_entries(self):
+        series = ForecastSeries.from_air_pollution(air_pollution_response(self.start, 40, step=3 * HOUR))
+        # local noon at UTC-5 is 17:00 UTC, between the 15:00 and 18:00 entries
+        index = series.select_tomorrow(self.start + 12 * HOUR, -5 * HOUR)
+        self.assertEqual(series.timestamps[index], calendar.timegm((2024, 3, 11, 18, 0, 0)))
+
+    def test_select_tomorrow_falls_back_to_the_next_entry(self):
+        series = ForecastSeries.from_air_pollution(air_pollution_response(self.start, 20))
+        self.assertEqual(series.select_tomorrow(self.start + 5 * HOUR + 1, 0), 6)
+        self.assertIsNone(series.select_tomorrow(self.start + 30 * HOUR, 0))
+
+    def test_daily_summary_groups_by_local_day(self):
+        series = ForecastSeries.from_air_pollution(air_pollution_response(self.start, 48, aqi=lambda index: 4 if index == 5 else 1))
+        utc_days = [(day, low, high, worst) for day, low, _, high, worst in series.daily_summary("aqi", 0)]
+        self.assertEqual(utc_days, [(self.day, 1, 4, 5), (self.day + 1, 1, 1, 24)])
+        # at UTC-7 the 05:00 UTC reading belongs to the 9th
+        local_days = [(day, high, worst) for day, _, _, high, worst in series.daily_summary("aqi", -7 * HOUR)]
+        self.assertEqual(local_days, [(self.day - 1, 4, 5), (self.day, 1, 7), (self.day + 1, 1, 31)])
+
+    def test_daily_summary_skips_missing_values(self):
+        response = air_pollution_response(self.start, 24)
+        for entry in response["list"][:12]:
+            del entry["main"]["aqi"]
+        series = ForecastSeries.from_air_pollution(response)
+        self.assertIsNone(series.value("aqi", 0))
+        day, low, mean, high, worst = series.daily_summary("aqi", 0)[0]
+        expected = [index % 5 + 1 for index in range(12, 24)]
+        self.assertEqual((low, high), (min(expected), max(expected)))
+        self.assertAlmostEqual(mean, sum(expected) / 12)
+        self.assertGreaterEqual(worst, 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import calendar
+import math
+import os
+import struct
+import tempfile
+import unittest
+
+import history
+from models import AirQualitySample
+
+HOUR = 3600
+DAY = 86400
+
+
+def sample(timestamp, aqi=2, pm2_5=10.0, pm10=20.0, no=1.5):
+    return AirQualitySample(timestamp, aqi, 200.0, no, 5.0, 60.0, 1.0, pm2_5, pm10, 0.5)
+
+
+class HistoryStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+        self.store = history.HistoryStore(self.directory)
+        self.key = history.series_key(37.3022, -120.483, 2)
+        self.start = calendar.timegm((2024, 3, 10, 0, 0, 0))
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def reopen(self):
+        self.store.close()
+        self.store = history.HistoryStore(self.directory)
+        return self.store
+
+    def test_series_key_rounds_like_cache_keys(self):
+        self.assertEqual(self.key, "37.30_-120.48")
+        self.assertEqual(history.series_key(37.299, -120.4801, 2), self.key)
+
+    def test_samples_round_trip_with_missing_values(self):
+        self.store.append(self.key, sample(self.start, aqi=3, pm2_5=12.5))
+        self.store.append(self.key, sample(self.start + 600, aqi=None, no=None))
+
+        rows = self.reopen().samples(self.key, self.start, self.start + HOUR)
+        self.assertEqual([timestamp for timestamp, _ in rows], [self.start, self.start + 600])
+        first = dict(zip(history.HISTORY_COLUMNS, rows[0][1]))
+        self.assertEqual(first["aqi"], 3.0)
+        self.assertEqual(first["pm2_5"], 12.5)
+        second = dict(zip(history.HISTORY_COLUMNS, rows[1][1]))
+        self.assertTrue(math.isnan(second["aqi"]))
+        self.assertTrue(math.isnan(second["no"]))
+        self.assertEqual(second["pm10"], 20.0)
+
+    def test_old_and_repeated_timestamps_are_ignored(self):
+        self.assertTrue(self.store.append(self.key, sample(self.start + HOUR)))
+        self.assertFalse(self.store.append(self.key, sample(self.start + HOUR)))
+        self.assertFalse(self.store.append(self.key, sample(self.start)))
+        self.assertEqual(len(self.store.samples(self.key, 0, self.start + DAY)), 1)
+
+    def test_hourly_and_daily_rollups(self):
+        self.store.track(self.key, 37.3, -120.48, -7 * HOUR)
+        readings = [(self.start + 6 * HOUR, 1, 5.0), (self.start + 6 * HOUR + 1800, 4, 35.0), (self.start + 8 * HOUR, 2, 12.0)]
+        for timestamp, aqi, pm2_5 in readings:
+            self.store.append(self.key, sample(timestamp, aqi=aqi, pm2_5=pm2_5))
+        # AQI is missing here, so it only counts towards PM2.5 / PM10
+        self.store.append(self.key, sample(self.start + 8 * HOUR + 600, aqi=None, pm2_5=20.0))
+
+        hourly = dict(self.reopen().hourly(self.key, self.start, self.start + DAY))
+        self.assertEqual(sorted(hourly), [self.start + 6 * HOUR, self.start + 8 * HOUR])
+        count, mean, low, high = hourly[self.start + 6 * HOUR]["aqi"]
+        self.assertEqual((count, mean, low, high), (2, 2.5, 1.0, 4.0))
+        self.assertEqual(hourly[self.start + 8 * HOUR]["aqi"][0], 1)
+        self.assertEqual(hourly[self.start + 8 * HOUR]["pm2_5"][:2], (2, 16.0))
+
+        # 06:00 UTC is 23:00 the previous local day at UTC-7; 08:00 UTC is 01:00 on the 10th
+        day = self.start // DAY
+        daily = dict(self.store.daily(self.key, day - 1, day))
+        self.assertEqual(daily[day - 1]["aqi"], (2, 2.5, 1.0, 4.0))
+        self.assertEqual(daily[day]["aqi"], (1, 2.0, 2.0, 2.0))
+        self.assertEqual(daily[day]["pm10"], (2, 20.0, 20.0, 20.0))
+
+    def test_rollups_span_month_and_year_boundaries(self):
+        new_year = calendar.timegm((2025, 1, 1, 0, 0, 0))
+        for timestamp in range(new_year - 2 * HOUR, new_year + 2 * HOUR, HOUR):
+            self.store.append(self.key, sample(timestamp, aqi=3))
+
+        hourly = self.store.hourly(self.key, new_year - DAY, new_year + DAY)
+        self.assertEqual([hour for hour, _ in hourly], list(range(new_year - 2 * HOUR, new_year + 2 * HOUR, HOUR)))
+        day = new_year // DAY
+        daily = dict(self.store.daily(self.key, day - 1, day))
+        self.assertEqual(daily[day - 1]["aqi"][0], 2)
+        self.assertEqual(daily[day]["aqi"][0], 2)
+        self.assertEqual(len(self.store.samples(self.key, 0, new_year + DAY)), 4)
+
+    def test_full_segments_roll_over_and_resume(self):
+        self.store.RAW_SEGMENT_CAPACITY = 4
+        for index in range(6):
+            self.store.append(self.key, sample(self.start + index * 600, aqi=index % 5 + 1))
+
+        names = sorted(name for name in os.listdir(os.path.join(self.directory, self.key)) if name.startswith("raw-"))
+        self.assertEqual(names, ["raw-202403-00.seg", "raw-202403-01.seg"])
+
+        store = self.reopen()
+        store.RAW_SEGMENT_CAPACITY = 4
+        self.assertFalse(store.append(self.key, sample(self.start + 5 * 600)))
+        self.assertTrue(store.append(self.key, sample(self.start + 6 * 600)))
+        timestamps = [timestamp for timestamp, _ in store.samples(self.key, 0, self.start + DAY)]
+        self.assertEqual(timestamps, [self.start + index * 600 for index in range(7)])
+        self.assertEqual(store.hourly(self.key, self.start, self.start + HOUR)[0][1]["aqi"][0], 6)
+
+    def test_partly_written_sample_is_ignored_on_resume(self):
+        self.store.append(self.key, sample(self.start))
+        self.store.append(self.key, sample(self.start + 600))
+        self.store.close()
+
+        # a crash after writing the third sample's timestamp but before its count update
+        path = os.path.join(self.directory, self.key, "raw-202403-00.seg")
+        with open(path, "r+b") as file:
+            file.seek(32 + 2 * 4)
+            file.write(struct.pack("<I", self.start + 1200 - calendar.timegm((2024, 3, 1, 0, 0, 0))))
+
+        store = history.HistoryStore(self.directory)
+        self.store = store
+        self.assertEqual([timestamp for timestamp, _ in store.samples(self.key, 0, self.start + DAY)], [self.start, self.start + 600])
+        # the torn slot is overwritten by the next append
+        self.assertTrue(store.append(self.key, sample(self.start + 900)))
+        self.assertEqual(store.samples(self.key, 0, self.start + DAY)[-1][0], self.start + 900)
+
+    def test_prune_removes_old_raw_segments_and_keeps_rollups(self):
+        february = calendar.timegm((2024, 2, 15, 12, 0, 0))
+        self.store.append(self.key, sample(february))
+        self.store.append(self.key, sample(self.start))
+
+        removed = self.store.prune_raw(calendar.timegm((2024, 3, 5, 0, 0, 0)))
+        self.assertEqual(removed, 1)
+        self.assertEqual([timestamp for timestamp, _ in self.store.samples(self.key, 0, self.start + DAY)], [self.start])
+        self.assertEqual(len(self.store.hourly(self.key, february, february + HOUR)), 1)
+        self.assertIn(february // DAY, dict(self.store.daily(self.key, february // DAY, february // DAY)))
+        # the current month's segment is never removed
+        self.assertEqual(self.store.prune_raw(self.start), 0)
+
+    def test_reader_sees_writer_appends(self):
+        reader = history.HistoryStore(self.directory)
+        try:
+            self.assertEqual(reader.hourly(self.key, self.start, self.start + DAY), [])
+            self.store.track(self.key, 37.3, -120.48, 3600)
+            self.store.append(self.key, sample(self.start))
+            self.assertEqual(reader.utc_offset(self.key), 3600)
+            self.assertEqual(len(reader.hourly(self.key, self.start, self.start + DAY)), 1)
+            self.store.append(self.key, sample(self.start + 600, aqi=4))
+            self.assertEqual(reader.hourly(self.key, self.start, self.start + DAY)[0][1]["aqi"][:2], (2, 3.0))
+        finally:
+            reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import math
+import random
+import unittest
+
+import places
+from places import NearestPlaceIndex, Place
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * places.EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def brute_force_nearest(place_list, lat, lon):
+    return min((haversine_km(lat, lon, place.lat, place.lon), place) for place in place_list)
+
+
+class NearestPlaceIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(20)
+        self.places = [
+            Place(f"place {index}", self.random.uniform(-90, 90), self.random.uniform(-180, 180)) for index in range(2000)
+        ]
+        self.index = NearestPlaceIndex()
+        for place in self.places:
+            self.index.add(place)
+
+    def assert_matches_brute_force(self, lat, lon, place_list=None):
+        place, distance = self.index.nearest(lat, lon)
+        expected_distance, expected_place = brute_force_nearest(place_list or self.places, lat, lon)
+        self.assertIs(place, expected_place, f"nearest to ({lat}, {lon})")
+        self.assertAlmostEqual(distance, expected_distance, delta=0.01)
+
+    def test_empty_index(self):
+        self.assertEqual(NearestPlaceIndex().nearest(10, 20), (None, None))
+
+    def test_matches_brute_force_for_random_queries(self):
+        for _ in range(300):
+            self.assert_matches_brute_force(self.random.uniform(-90, 90), self.random.uniform(-180, 180))
+
+    def test_exact_place_is_its_own_nearest(self):
+        for place in self.places[:50]:
+            found, distance = self.index.nearest(place.lat, place.lon)
+            self.assertIs(found, place)
+            self.assertLess(distance, 0.001)
+
+    def test_antimeridian_and_poles(self):
+        index = NearestPlaceIndex()
+        fiji = Place("Suva, FJ", -18.14, 178.44)
+        samoa = Place("Apia, WS", -13.83, -171.76)
+        alert = Place("Alert, CA", 82.5, -62.35)
+        for place in (fiji, samoa, Place("Auckland, NZ", -36.85, 174.76), alert, Place("Longyearbyen, SJ", 78.22, 15.65)):
+            index.add(place)
+        # east of the antimeridian, but Fiji is a couple of degrees away across it, not 358
+        self.assertIs(index.nearest(-14.0, -179.5)[0], fiji)
+        self.assertIs(index.nearest(-14.0, -175.0)[0], samoa)
+        # near the pole longitude barely matters
+        self.assertIs(index.nearest(89.9, 120.0)[0], alert)
+
+    def test_places_added_after_a_build_are_found(self):
+        self.index.nearest(0, 0)
+        extra = [Place(f"extra {index}", self.random.uniform(-90, 90), self.random.uniform(-180, 180)) for index in range(10)]
+        for place in extra:
+            self.index.add(place)
+        # fewer than REBUILD_THRESHOLD new places are scanned, not built into the tree yet
+        for place in extra:
+            self.assertIs(self.index.nearest(place.lat, place.lon)[0], place)
+        self.assertEqual(self.index._built_count, len(self.places))
+        for _ in range(50):
+            self.assert_matches_brute_force(self.random.uniform(-90, 90), self.random.uniform(-180, 180), self.places + extra)
+
+    def test_tree_is_rebuilt_after_enough_additions(self):
+        self.index.nearest(0, 0)
+        extra = [Place(f"extra {index}", self.random.uniform(-90, 90), self.random.uniform(-180, 180))
+                 for index in range(NearestPlaceIndex.REBUILD_THRESHOLD)]
+        for place in extra:
+            self.index.add(place)
+        self.assert_matches_brute_force(12.5, -45.0, self.places + extra)
+        self.assertEqual(self.index._built_count, len(self.places) + len(extra))
+
+
+if __name__ == "__main__":
+    unittest.main()
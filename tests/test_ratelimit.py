@@ -0,0 +1,56 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+import ratelimit
+
+
+class TokenBucketTest(unittest.IsolatedAsyncioTestCase):
+    async def test_burst_is_served_without_waiting(self):
+        bucket = ratelimit.TokenBucket(rate_per_minute=60, burst=3)
+        started_at = time.monotonic()
+        for _ in range(3):
+            self.assertTrue(await bucket.acquire(max_wait=0.01))
+        self.assertLess(time.monotonic() - started_at, 0.5)
+
+    async def test_empty_bucket_gives_up_after_max_wait_without_taking_a_token(self):
+        bucket = ratelimit.TokenBucket(rate_per_minute=60, burst=1)
+        self.assertTrue(await bucket.acquire())
+        self.assertFalse(await bucket.acquire(max_wait=0.05))
+        self.assertLess(bucket.tokens, 1)
+        self.assertGreaterEqual(bucket.tokens, 0)
+
+    async def test_empty_bucket_waits_for_the_refill(self):
+        # 20 tokens a second, so the next one is 50 ms away
+        bucket = ratelimit.TokenBucket(rate_per_minute=1200, burst=1)
+        self.assertTrue(await bucket.acquire())
+        started_at = time.monotonic()
+        self.assertTrue(await bucket.acquire(max_wait=1))
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.04)
+
+    async def test_waiters_are_served_in_order(self):
+        bucket = ratelimit.TokenBucket(rate_per_minute=1200, burst=1)
+        served = []
+
+        async def take(index):
+            await bucket.acquire()
+            served.append(index)
+
+        await asyncio.gather(*(take(index) for index in range(4)))
+        self.assertEqual(served, [0, 1, 2, 3])
+
+    def test_refill_is_capped_at_the_burst_size(self):
+        with mock.patch("ratelimit.time.monotonic", return_value=1000.0):
+            bucket = ratelimit.TokenBucket(rate_per_minute=60, burst=5)
+            bucket.tokens = 0
+        with mock.patch("ratelimit.time.monotonic", return_value=1002.0):
+            bucket._refill()
+        self.assertEqual(bucket.tokens, 2)
+        with mock.patch("ratelimit.time.monotonic", return_value=2000.0):
+            bucket._refill()
+        self.assertEqual(bucket.tokens, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
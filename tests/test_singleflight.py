@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import utils
+
+# not a cacheable endpoint, so every call that isn't shared goes to _fetch_json
+URL = "https://api.example.invalid/data"
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.fetches = []
+        self.release = asyncio.Event()
+
+        async def fetch_json(url, params, cache_key):
+            self.fetches.append(params)
+            await self.release.wait()
+            return {"q": params["q"]}
+
+        for patcher in (mock.patch.object(utils, "_fetch_json", fetch_json), mock.patch.object(utils, "shared_cache", None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_concurrent_identical_requests_share_one_fetch(self):
+        calls = [asyncio.ensure_future(utils.make_api_request(URL, {"q": "a", "appid": "k"})) for _ in range(5)]
+        # parameter order doesn't make a different request
+        calls.append(asyncio.ensure_future(utils.make_api_request(URL, {"appid": "k", "q": "a"})))
+        await asyncio.sleep(0)
+        self.release.set()
+        results = await asyncio.gather(*calls)
+
+        self.assertEqual(len(self.fetches), 1)
+        self.assertEqual(results, [{"q": "a"}] * 6)
+        self.assertIs(results[0], results[-1])
+        self.assertEqual(utils._inflight_requests, {})
+
+    async def test_different_params_are_fetched_separately(self):
+        calls = [asyncio.ensure_future(utils.make_api_request(URL, {"q": q})) for q in ("a", "b", "a")]
+        await asyncio.sleep(0)
+        self.release.set()
+        results = await asyncio.gather(*calls)
+
+        self.assertEqual(sorted(params["q"] for params in self.fetches), ["a", "b"])
+        self.assertEqual(results, [{"q": "a"}, {"q": "b"}, {"q": "a"}])
+
+    async def test_finished_request_is_not_reused(self):
+        self.release.set()
+        await utils.make_api_request(URL, {"q": "a"})
+        await utils.make_api_request(URL, {"q": "a"})
+        self.assertEqual(len(self.fetches), 2)
+
+    async def test_cancelled_caller_does_not_cancel_the_shared_fetch(self):
+        first = asyncio.ensure_future(utils.make_api_request(URL, {"q": "a"}))
+        second = asyncio.ensure_future(utils.make_api_request(URL, {"q": "a"}))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+
+        self.assertEqual(await second, {"q": "a"})
+        self.assertTrue(first.cancelled())
+        self.assertEqual(len(self.fetches), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,35 +1,453 @@
 # HOLDS HELPER FUNCTIONS
 # Imports
-import requests
+import aiohttp
+import asyncio
+import discord
+from discord import app_commands
 import json
 import datetime
+import time
 import config
+import cache
+import geocache
+import ratelimit
+import circuit
+import metrics
+import models
+import places
+import sharedcache
+
+# Shared HTTP session, opened in MyBot.setup_hook and closed in MyBot.close
+_http_session = None
+
+# OPENS SHARED HTTP SESSION
+async def open_http_session():
+    """
+    Creates the pooled aiohttp session used by every API request.
+    Connections are kept alive and limited per host so bursts of commands reuse sockets.
+    """
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=config.HTTP_POOL_LIMIT,
+            limit_per_host=config.HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=300,
+            keepalive_timeout=config.HTTP_KEEPALIVE_TIMEOUT
+        )
+        timeout = aiohttp.ClientTimeout(total=config.HTTP_TIMEOUT)
+        _http_session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    return _http_session
+
+# CLOSES SHARED HTTP SESSION
+async def close_http_session():
+    """Closes the shared aiohttp session, if one is open."""
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+# Response cache for weather / air pollution lookups
+response_cache = cache.TTLCache(config.RESPONSE_CACHE_MAX_ENTRIES, config.RESPONSE_CACHE_MAX_BYTES)
+# Forecast series (columnar, see forecast.py) are kept in their own fixed budget
+forecast_cache = cache.TTLCache(config.FORECAST_CACHE_MAX_ENTRIES, config.FORECAST_CACHE_MAX_BYTES)
+_forecast_urls = {config.AIR_POLLUTION_FORECAST_API_URL, config.WEATHER_FORECAST_API_URL}
+
+# GETS CACHE FOR AN ENDPOINT
+def get_response_cache(url):
+    """Returns the TTLCache that holds responses from url."""
+    return forecast_cache if url in _forecast_urls else response_cache
+
+# Second-level cache shared by every shard process (see config.SHARED_CACHE_ENABLED), or None
+shared_cache = sharedcache.SharedCache(config.SHARED_CACHE_FILE) if config.SHARED_CACHE_ENABLED else None
+# Pending background writes to the shared cache
+_shared_cache_writes = set()
+
+# Callbacks run with (url, cache_key, data) for each new response of a cacheable endpoint, e.g. the history recorder
+response_listeners = []
+
+# NOTIFIES RESPONSE LISTENERS
+def _notify_response_listeners(url, cache_key, data):
+    """Passes a newly loaded response to each listener. A failing listener is logged and doesn't fail the request."""
+    for listener in response_listeners:
+        try:
+            listener(url, cache_key, data)
+        except Exception as e:
+            print(f"Error in response listener {getattr(listener, '__qualname__', listener)}: {e}")
+
+# Persistent cache for direct geocoding lookups
+geocode_cache = geocache.GeocodeCache(
+    config.GEOCODE_CACHE_FILE, config.GEOCODE_NEGATIVE_TTL, config.GEOCODE_CACHE_HOT_ENTRIES
+)
+
+# Bundled city names plus every name geocoded so far, for autocomplete and offline lookups
+place_index = places.PlaceIndex()
+place_index.load_csv(config.CITIES_FILE)
+
+# LOADS PREVIOUSLY GEOCODED PLACES
+async def load_geocoded_places():
+    """Adds names from the geocoding cache to the place index. Returns how many places the index holds."""
+    for display_name, lat, lon in await geocode_cache.load_places():
+        place_index.add(display_name, lat, lon, display_name.rsplit(",", 1)[-1].strip() if "," in display_name else None)
+    return len(place_index)
+
+# SUGGESTS CITY NAMES
+async def city_autocomplete(interaction, current: str):
+    """Autocomplete for city parameters, answered from the local place index without any network call."""
+    if not current.strip():
+        return []
+    return [
+        app_commands.Choice(name=place.display_name, value=place.display_name)
+        for place in place_index.search(current, 25)
+    ]
+
+# Endpoints whose JSON is parsed into a model once, before caching
+RESPONSE_PARSERS = {
+    config.CURRENT_WEATHER_API_URL: models.CurrentWeather.from_response,
+    config.AIR_POLLUTION_CURRENT_API_URL: models.AirQualitySample.from_response,
+    config.AIR_POLLUTION_FORECAST_API_URL: models.parse_air_pollution_forecast,
+    config.WEATHER_FORECAST_API_URL: models.parse_weather_forecast,
+}
+
+# Short endpoint names used as metric labels
+ENDPOINT_NAMES = {
+    config.CURRENT_WEATHER_API_URL: "current_weather",
+    config.WEATHER_FORECAST_API_URL: "weather_forecast",
+    config.AIR_POLLUTION_CURRENT_API_URL: "air_pollution",
+    config.AIR_POLLUTION_FORECAST_API_URL: "air_pollution_forecast",
+    config.GEOCODING_API_URL: "geocoding",
+    config.REVERSE_GEOCODING_API_URL: "reverse_geocoding",
+}
+
+# GETS RESPONSE CACHE KEY
+def get_response_cache_key(url, params):
+    """Returns the cache key for a request, or None if the endpoint is not cacheable."""
+    if url not in config.CACHE_TTLS or "lat" not in params or "lon" not in params:
+        return None
+    lat, lon = snap_coordinates(url, params["lat"], params["lon"])
+    return cache.make_location_key(url, lat, lon, config.CACHE_COORD_PRECISION)
+
+# SNAPS COORDINATES TO A NEARBY PLACE
+def snap_coordinates(url, lat, lon):
+    """
+    Returns the coordinates of the indexed place within CACHE_SNAP_KM of lat/lon, or lat/lon unchanged.
+    Used for both the cache key and the request itself, so the cached data matches its key.
+    """
+    if config.CACHE_SNAP_KM <= 0 or url == config.REVERSE_GEOCODING_API_URL:
+        return lat, lon
+    place, distance_km = place_index.nearest(lat, lon)
+    if place is None or distance_km > config.CACHE_SNAP_KM:
+        return lat, lon
+    return place.lat, place.lon
+
+# Client-side limits shared by every OpenWeatherMap endpoint
+# each shard process gets an equal share of the per-minute limit; the daily quota is counted in the shared cache
+rate_limiter = ratelimit.TokenBucket(
+    config.OWM_CALLS_PER_MINUTE / config.SHARD_PROCESSES, max(1, config.OWM_BURST // config.SHARD_PROCESSES)
+)
+api_quota = ratelimit.DailyQuota(
+    config.QUOTA_FILE, config.OWM_CALLS_PER_DAY, config.QUOTA_RESERVE_FRACTION, config.QUOTA_SAVE_EVERY, shared_cache
+)
+
+# One circuit breaker per endpoint URL, created on first use
+_circuit_breakers = {}
+
+# GETS CIRCUIT BREAKER
+def get_circuit_breaker(url):
+    """Returns the circuit breaker for an endpoint."""
+    breaker = _circuit_breakers.get(url)
+    if breaker is None:
+        breaker = circuit.CircuitBreaker(url, config.CIRCUIT_FAILURE_THRESHOLD, config.CIRCUIT_RESET_TIMEOUT)
+        _circuit_breakers[url] = breaker
+    return breaker
+
+# In-flight requests, keyed by URL + params, shared by concurrent identical calls
+_inflight_requests = {}
+
+# GETS SINGLE-FLIGHT KEY
+def get_inflight_key(url, params):
+    """Returns a hashable key identifying a request by its URL and parameters."""
+    return (url, tuple(sorted((str(k), str(v)) for k, v in params.items())))
 
 # MAKES API REQUESTS
-async def make_api_request(url, params):
+async def make_api_request(url, params, force_refresh: bool = False):
     """
-    Makes an API request and returns the JSON response.
-    Returns None if the request fails.
+    Makes an API request and returns the JSON response, or for endpoints in RESPONSE_PARSERS
+    the parsed model (CurrentWeather, AirQualitySample, ForecastSeries).
+    Returns None if the request fails or the response has no usable data.
     Includes basic error handling and prints to console.
+    Weather and air pollution responses are served from the response cache while fresh.
+    Concurrent calls with the same URL and params share a single HTTP request.
+    When the daily quota is nearly used up, stale cached responses are served instead of calling the API.
+    force_refresh skips the fresh-cache lookup so the cached entry gets replaced.
     """
-    prepared_request = requests.Request('GET', url, params=params).prepare()
-    session = requests.Session() # Use a session for potentially better performance
+    if config.CACHE_SNAP_KM > 0 and url in config.CACHE_TTLS and "lat" in params and "lon" in params:
+        lat, lon = snap_coordinates(url, params["lat"], params["lon"])
+        params = {**params, "lat": lat, "lon": lon}
+    cache_key = get_response_cache_key(url, params)
+    url_cache = get_response_cache(url)
+    if cache_key is not None and not force_refresh:
+        cached_data = url_cache.get(cache_key)
+        if cached_data is not None:
+            return cached_data
+        if api_quota.is_nearly_exhausted():
+            stale_data = url_cache.get_stale(cache_key)
+            if stale_data is not None:
+                return stale_data
 
+    inflight_key = get_inflight_key(url, params)
+    inflight = _inflight_requests.get(inflight_key)
+    if inflight is None:
+        inflight = asyncio.ensure_future(_load_response(url, params, cache_key, force_refresh))
+        _inflight_requests[inflight_key] = inflight
+        inflight.add_done_callback(lambda _: _inflight_requests.pop(inflight_key, None))
+    # shield so one cancelled interaction doesn't cancel the request for everyone else
+    return await asyncio.shield(inflight)
+
+# LOADS A RESPONSE
+async def _load_response(url, params, cache_key, force_refresh: bool):
+    """
+    Serves a response another shard process already stored in the shared cache, otherwise fetches it.
+    Runs once per in-flight request, so concurrent callers share the shared-cache lookup too.
+    """
+    if shared_cache is not None and cache_key is not None:
+        shared_data = await _load_shared_response(url, cache_key, force_refresh)
+        if shared_data is not None:
+            return shared_data
+        # an expired shared entry was just copied in as a stale fallback
+        if not force_refresh and api_quota.is_nearly_exhausted():
+            stale_data = _stale_or_none(url, cache_key)
+            if stale_data is not None:
+                return stale_data
+    return await _fetch_json(url, params, cache_key)
+
+# LOADS A RESPONSE FROM THE SHARED CACHE
+async def _load_shared_response(url, cache_key, force_refresh: bool):
+    """
+    Parses a shared cache entry into this process's cache and returns it while it is fresh.
+    Expired entries are only stored locally (as stale fallbacks) and None is returned.
+    With force_refresh, only an entry another process refreshed recently counts: it must expire later than
+    the local copy and have at least half its TTL left.
+    """
+    row = await shared_cache.get(cache_key)
+    if row is None:
+        metrics.registry.inc("shared_cache_total", (("result", "miss"),))
+        return None
+    body, expires_at = row
+    ttl = expires_at - time.time()
+    url_cache = get_response_cache(url)
+    if force_refresh:
+        local_ttl = url_cache.expires_in(cache_key) or 0
+        if ttl <= max(local_ttl, config.CACHE_TTLS[url] / 2):
+            metrics.registry.inc("shared_cache_total", (("result", "miss"),))
+            return None
+    if ttl <= 0 and url_cache.peek(cache_key) is not None:
+        metrics.registry.inc("shared_cache_total", (("result", "stale"),))
+        return None
+
+    return _cache_shared_body(url, cache_key, body, ttl)
+
+# COPIES A SHARED CACHE ENTRY INTO THIS PROCESS
+def _cache_shared_body(url, cache_key, body: str, ttl: float):
+    """Parses a shared cache body into the local cache for ttl seconds. Returns the data while it is fresh, else None."""
     try:
-        response = session.send(prepared_request, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.HTTPError as http_err:
-        print(f"HTTP error occurred: {http_err} - URL: {prepared_request.url} - Params: {params}")
-    except requests.exceptions.ConnectionError as conn_err:
-        print(f"Connection error occurred: {conn_err} - URL: {prepared_request.url}")
-    except requests.exceptions.Timeout as timeout_err:
-        print(f"Timeout error occurred: {timeout_err} - URL: {prepared_request.url}")
-    except requests.exceptions.RequestException as err:
-        print(f"An error occurred during API request: {err} - URL: {prepared_request.url}")
-    finally:
-        session.close()
-    return None
+        data = json.loads(body)
+    except json.JSONDecodeError:
+        return None
+    parser = RESPONSE_PARSERS.get(url)
+    if parser is not None:
+        data = parser(data)
+        if data is None:
+            return None
+    get_response_cache(url).set(cache_key, data, ttl, size=getattr(data, "nbytes", len(body)))
+    metrics.registry.inc("shared_cache_total", (("result", "hit" if ttl > 0 else "stale"),))
+    if ttl <= 0:
+        return None
+    _notify_response_listeners(url, cache_key, data)
+    return data
+
+# LOADS MANY SHARED CACHE ENTRIES
+async def load_shared_responses(requests: list):
+    """
+    Copies the shared cache entries for [(url, cache_key)] that this process doesn't hold into its cache,
+    fresh or expired, with one batched read. Lets cache-only readers see what other shard processes fetched.
+    """
+    if shared_cache is None:
+        return
+    missing = {cache_key: url for url, cache_key in requests if cache_key is not None and get_response_cache(url).peek(cache_key) is None}
+    if not missing:
+        return
+    rows = await shared_cache.get_many(list(missing))
+    now = time.time()
+    for cache_key, url in missing.items():
+        row = rows.get(cache_key)
+        if row is None:
+            metrics.registry.inc("shared_cache_total", (("result", "miss"),))
+            continue
+        body, expires_at = row
+        _cache_shared_body(url, cache_key, body, expires_at - now)
+
+# STORES A RESPONSE IN THE SHARED CACHE
+def _store_shared_response(url, cache_key, body: str):
+    """Writes the raw body to the shared cache in the background, so the caller doesn't wait on the disk."""
+    task = asyncio.ensure_future(shared_cache.set(cache_key, body, config.CACHE_TTLS[url]))
+    _shared_cache_writes.add(task)
+    task.add_done_callback(_shared_cache_writes.discard)
+
+# CLOSES THE SHARED CACHE
+async def close_shared_cache():
+    """Waits for pending shared cache writes and closes its connection."""
+    if shared_cache is None:
+        return
+    if _shared_cache_writes:
+        await asyncio.gather(*_shared_cache_writes, return_exceptions=True)
+    shared_cache.close()
+
+# GETS STALE FALLBACK
+def _stale_or_none(url, cache_key):
+    """Returns the last cached response for cache_key, if any, when a fresh one can't be fetched."""
+    return get_response_cache(url).get_stale(cache_key) if cache_key is not None else None
+
+# FETCHES JSON
+async def _fetch_json(url, params, cache_key):
+    """
+    Performs the HTTP request for make_api_request and stores cacheable results.
+    Connection errors, timeouts, 429s and 5xx responses are retried with jittered exponential backoff.
+    If the endpoint's circuit is open the request fails fast, serving stale cached data if available.
+    """
+    breaker = get_circuit_breaker(url)
+    if not breaker.allow_request():
+        print(f"Circuit open, skipping request - URL: {url}")
+        return _stale_or_none(url, cache_key)
+
+    session = await open_http_session()
+    endpoint = ENDPOINT_NAMES.get(url, url)
+
+    for attempt in range(config.API_MAX_RETRIES + 1):
+        if api_quota.is_exhausted():
+            print(f"Daily OpenWeatherMap quota of {api_quota.daily_limit} calls used up - URL: {url}")
+            breaker.cancel_request()
+            return _stale_or_none(url, cache_key)
+        if not await rate_limiter.acquire(config.RATE_LIMIT_MAX_WAIT):
+            print(f"Rate limit queue full, skipping request - URL: {url}")
+            breaker.cancel_request()
+            return _stale_or_none(url, cache_key)
+        await api_quota.record()
+
+        retry_after = None
+        # metric label: HTTP status, or what went wrong before one was received
+        outcome = "error"
+        request_started_at = time.perf_counter()
+        try:
+            async with session.get(url, params=params) as response:
+                outcome = str(response.status)
+                if response.status == 429:
+                    retry_after = response.headers.get("Retry-After")
+                response.raise_for_status()
+                body = await response.text()
+            data = json.loads(body)
+            breaker.record_success()
+            parser = RESPONSE_PARSERS.get(url)
+            if parser is not None:
+                data = parser(data)
+                if data is None:
+                    print(f"API response had no usable data - URL: {url} - Body: {body[:200]}")
+                    return None
+            if cache_key is not None:
+                get_response_cache(url).set(cache_key, data, config.CACHE_TTLS[url], size=getattr(data, "nbytes", len(body)))
+                if shared_cache is not None:
+                    _store_shared_response(url, cache_key, body)
+                _notify_response_listeners(url, cache_key, data)
+            return data
+        except aiohttp.ClientResponseError as http_err:
+            print(f"HTTP error occurred: {http_err.status} {http_err.message} - URL: {http_err.request_info.real_url} - Params: {params}")
+            if http_err.status < 500 and http_err.status != 429:
+                # client errors (bad key, bad params) won't succeed on retry and aren't an outage
+                breaker.record_success()
+                return None
+        except aiohttp.ClientConnectionError as conn_err:
+            print(f"Connection error occurred: {conn_err} - URL: {url}")
+            outcome = "connection_error"
+        except asyncio.TimeoutError as timeout_err:
+            print(f"Timeout error occurred: {timeout_err!r} - URL: {url}")
+            outcome = "timeout"
+        except (aiohttp.ClientError, json.JSONDecodeError) as err:
+            print(f"An error occurred during API request: {err} - URL: {url}")
+            outcome = "invalid_json" if isinstance(err, json.JSONDecodeError) else "client_error"
+            break
+        finally:
+            metrics.registry.inc("owm_request_total", (("endpoint", endpoint), ("status", outcome)))
+            metrics.registry.observe("owm_request_seconds", time.perf_counter() - request_started_at, (("endpoint", endpoint),))
+
+        if attempt < config.API_MAX_RETRIES:
+            delay = circuit.backoff_delay(attempt, config.API_RETRY_BASE_DELAY, config.API_RETRY_MAX_DELAY)
+            if retry_after is not None and retry_after.isdigit():
+                delay = min(float(retry_after), config.API_RETRY_MAX_DELAY)
+            await asyncio.sleep(delay)
+
+    breaker.record_failure()
+    return _stale_or_none(url, cache_key)
+
+# WAITS FOR A RESULT OR DEFERS THE INTERACTION
+async def await_or_defer(interaction, started_at: float, awaitable):
+    """
+    Returns the awaitable's result. If it isn't ready within FAST_RESPONSE_DEADLINE seconds of started_at
+    (time.monotonic()), the interaction is deferred first, so slow lookups end in a single followup and
+    fast (cached) ones are answered directly.
+    The defer is public; send_interaction_response replaces it if the answer turns out to be ephemeral.
+    """
+    task = asyncio.ensure_future(awaitable)
+    if not interaction.response.is_done():
+        remaining = config.FAST_RESPONSE_DEADLINE - (time.monotonic() - started_at)
+        # a cache hit finishes on its first step, so even a zero timeout catches it
+        await asyncio.wait({task}, timeout=max(remaining, 0.0))
+        if not task.done():
+            sent_at = time.perf_counter()
+            await interaction.response.defer(thinking=True)
+            interaction.extras["public_defer"] = True
+            metrics.registry.observe("discord_response_seconds", time.perf_counter() - sent_at, (("kind", "defer"),))
+    return await task
+
+# SENDS A COMMAND'S ONLY MESSAGE
+async def send_interaction_response(interaction, content: str = None, embed=None, embeds: list = None, ephemeral: bool = False):
+    """
+    Sends the message as the interaction response, or as the followup if the interaction was deferred.
+    The first followup after a public defer would take over the visible "thinking" message, so an ephemeral
+    message deletes that placeholder first and is sent as a separate ephemeral followup.
+    """
+    kwargs = {"ephemeral": ephemeral}
+    if content is not None:
+        kwargs["content"] = content
+    if embed is not None:
+        kwargs["embed"] = embed
+    if embeds is not None:
+        kwargs["embeds"] = embeds
+    sent_at = time.perf_counter()
+    if interaction.response.is_done():
+        if ephemeral and interaction.extras.pop("public_defer", False):
+            try:
+                await interaction.delete_original_response()
+            except discord.HTTPException as e:
+                print(f"Error deleting deferred response before an ephemeral followup: {e}")
+        await interaction.followup.send(**kwargs)
+        kind = "followup"
+    else:
+        await interaction.response.send_message(**kwargs)
+        kind = "response"
+    metrics.registry.observe("discord_response_seconds", time.perf_counter() - sent_at, (("kind", kind),))
+
+# COLLECTS CACHE / QUOTA METRICS
+def collect_metrics():
+    """Gauges for the response caches, the daily quota and the circuit breakers."""
+    gauges = []
+    for cache_name, stats in (("response", response_cache.stats()), ("forecast", forecast_cache.stats())):
+        for stat, value in stats.items():
+            gauges.append((f"cache_{stat}", (("cache", cache_name),), value))
+    gauges.append(("owm_quota_remaining", (), api_quota.remaining()))
+    for url, breaker in _circuit_breakers.items():
+        gauges.append(("owm_circuit_open", (("endpoint", ENDPOINT_NAMES.get(url, url)),), int(breaker.state != breaker.CLOSED)))
+    return gauges
+
+metrics.registry.add_collector(collect_metrics)
 
 # GETS AQI CATEGORY
 def get_aqi_category(aqi_index):
@@ -58,29 +476,108 @@ def load_server_locations_from_file(file_path: str):
         print(f"Error decoding JSON from {file_path}. Starting with an empty cache.")
         return {}
 
-# SAVES SERVER LOCATIONS
-def save_server_locations_to_file(server_locations_data: dict, file_path: str):
-    """Saves current server locations to the specified file."""
-    try:
-        with open(file_path, 'w') as file:
-            json.dump(server_locations_data, file, indent=4)
-        print(f"Saved server locations to {file_path}")
-    except IOError as e:
-        print(f"Error saving server locations to {file_path}: {e}")
+# Timezone objects by offset, so repeated lookups don't rebuild them
+_timezones = {}
+
+# GETS TIMEZONE FOR AN OFFSET
+def get_timezone(utc_offset: int):
+    """Returns a datetime.timezone for an offset in seconds east of UTC."""
+    timezone = _timezones.get(utc_offset)
+    if timezone is None:
+        timezone = datetime.timezone(datetime.timedelta(seconds=utc_offset))
+        _timezones[utc_offset] = timezone
+    return timezone
+
+def _known_utc_offset(lat, lon, location_record: models.GuildLocation = None):
+    cache_key = get_response_cache_key(config.CURRENT_WEATHER_API_URL, {"lat": lat, "lon": lon})
+    if cache_key is not None:
+        weather = response_cache.peek(cache_key)
+        if weather is not None and weather.utc_offset is not None:
+            return weather.utc_offset
+    if location_record is not None and location_record.utc_offset is not None:
+        return location_record.utc_offset
+    return None
+
+# GETS UTC OFFSET FOR A LOCATION
+def get_utc_offset(lat, lon, location_record: models.GuildLocation = None):
+    """
+    Returns a location's offset from UTC in seconds.
+    Prefers the offset from a cached current weather response (it follows DST), then the offset
+    stored with the server's /setlocation record, then an estimate from the longitude.
+    """
+    utc_offset = _known_utc_offset(lat, lon, location_record)
+    if utc_offset is None:
+        return int(round(float(lon) / 15)) * 3600
+    return utc_offset
+
+# LOADS UTC OFFSET FOR A LOCATION
+async def load_utc_offset(lat, lon, location_record: models.GuildLocation = None):
+    """
+    Like get_utc_offset, but when neither a cached current weather response nor the location record knows
+    the offset, loads current weather for lat/lon first (cached and single-flighted like any request).
+    The longitude estimate is only used if that request fails.
+    """
+    utc_offset = _known_utc_offset(lat, lon, location_record)
+    if utc_offset is not None:
+        return utc_offset
+    weather = await make_api_request(config.CURRENT_WEATHER_API_URL, {"lat": lat, "lon": lon, "appid": config.OPENWEATHERMAP_API_KEY})
+    if weather is not None and weather.utc_offset is not None:
+        return weather.utc_offset
+    return int(round(float(lon) / 15)) * 3600
+
+# GETS PLACE NAME FOR COORDINATES
+async def get_place_name(lat, lon, api_key: str, reverse_geo_url: str):
+    """
+    Returns a display name for coordinates: the nearest known place if it is within REVERSE_GEOCODE_MAX_KM,
+    otherwise the reverse geocoding API's answer (which is then added to the place index).
+    Returns None if neither knows the location.
+    """
+    place, distance_km = place_index.nearest(lat, lon)
+    if place is not None and distance_km <= config.REVERSE_GEOCODE_MAX_KM:
+        return place.display_name
+
+    reverse_params = {"lat": lat, "lon": lon, "limit": 1, "appid": api_key}
+    reverse_data_list = await make_api_request(reverse_geo_url, reverse_params)
+    if not isinstance(reverse_data_list, list) or len(reverse_data_list) == 0:
+        return None
+
+    reverse_data = reverse_data_list[0]
+    display_name = places.format_place_name(reverse_data.get("name"), reverse_data.get("state"), reverse_data.get("country"))
+    if not display_name:
+        return None
+    if reverse_data.get("lat") is not None and reverse_data.get("lon") is not None:
+        place_index.add(display_name, reverse_data["lat"], reverse_data["lon"], reverse_data.get("country"))
+    return display_name
 
 # GETS SERVER DEFAULT LOCATION
 def get_server_default_location(guild_id: int, server_locations_data: dict):
     """
     Retrieves & returns lat, long, display name for a guild from the provided cache.
     """
-    location_data = server_locations_data.get(guild_id)
-    if location_data:
-        return location_data["lat"], location_data["lon"], location_data["display_name"]
+    location = server_locations_data.get(guild_id)
+    if location:
+        return location.lat, location.lon, location.display_name
     return None, None, None
 
 # GETS COORDINATES FROM API
 async def get_coordinates_from_api(city: str, state_code: str, country_code: str, api_key: str, geo_url: str):
-    """Helper to fetch coordinates for a given location string from OpenWeatherMap."""
+    """
+    Helper to fetch coordinates for a given location string from OpenWeatherMap.
+    Results (including "not found") are served from the geocoding cache when possible,
+    and exact place names (e.g. picked from autocomplete) are resolved locally without a request.
+    """
+    place = place_index.resolve(places.format_place_name(city, state_code, country_code))
+    if place is not None:
+        return place.lat, place.lon, place.display_name
+
+    cache_query = geocache.normalize_query(city, state_code, country_code)
+    cached = await geocode_cache.get(cache_query)
+    if cached is not None:
+        lat, lon, display_name, error = cached
+        if error is not None:
+            return None, None, error
+        return lat, lon, display_name
+
     location_parts = [city]
     if state_code:
         location_parts.append(state_code)
@@ -95,9 +592,15 @@ async def get_coordinates_from_api(city: str, state_code: str, country_code: str
     }
     geo_data_list = await make_api_request(geo_url, geo_params)
 
-    if not geo_data_list or not isinstance(geo_data_list, list) or len(geo_data_list) == 0:
+    if geo_data_list is None:
+        # request failed, don't remember it as a bad location
         return None, None, f"Could not find location '{query_location}'."
 
+    if not isinstance(geo_data_list, list) or len(geo_data_list) == 0:
+        error = f"Could not find location '{query_location}'."
+        await geocode_cache.set_negative(cache_query, error)
+        return None, None, error
+
     geo_data = geo_data_list[0]
     lat = geo_data.get("lat")
     lon = geo_data.get("lon")
@@ -114,6 +617,10 @@ async def get_coordinates_from_api(city: str, state_code: str, country_code: str
     final_display_name = ", ".join(filter(None, display_name_parts))
 
     if lat is None or lon is None:
-        return None, None, f"Found '{final_display_name}' but could not retrieve coordinates."
+        error = f"Found '{final_display_name}' but could not retrieve coordinates."
+        await geocode_cache.set_negative(cache_query, error)
+        return None, None, error
 
+    await geocode_cache.set(cache_query, lat, lon, final_display_name)
+    place_index.add(final_display_name, lat, lon, found_country)
     return lat, lon, final_display_name
\ No newline at end of file